@@ -0,0 +1,125 @@
+# launcher.py
+# Runs the bot as several processes: one ledger (modules/ledger.py) that owns
+# the data files, and AURA_PROCESSES bot processes (main.py) that split
+# AURA_SHARDS gateway shards between them.
+#
+#   python launcher.py
+#
+# A bot process that exits is started again after AURA_RESTART_DELAY seconds.
+# If the ledger exits, everything stops. On Ctrl+C / SIGTERM the bots stop
+# first, so their last changes reach the ledger before it writes them out.
+# Children run in their own sessions, so a terminal Ctrl+C only reaches the
+# launcher and the shutdown order above holds.
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from modules.ledger import ADDRESS, _parse
+from modules.utils import log, LOG_FILE
+
+load_dotenv()
+
+PROCESSES: int = int(os.getenv("AURA_PROCESSES", str(os.cpu_count() or 1)))
+SHARDS: int = int(os.getenv("AURA_SHARDS", str(PROCESSES)))
+RESTART_DELAY: float = float(os.getenv("AURA_RESTART_DELAY", "5"))
+
+
+def shard_groups(shards: int, processes: int) -> list[list[int]]:
+    """Spread shard ids over the processes: process i gets i, i + processes, ..."""
+    return [group for group in (list(range(i, shards, processes)) for i in range(processes)) if group]
+
+
+def wait_for_ledger(ledger: subprocess.Popen, timeout: float = 30.0) -> None:
+    kind, target = _parse(ADDRESS)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if ledger.poll() is not None:
+            raise SystemExit(f"Ledger exited with {ledger.returncode}")
+        sock = socket.socket(socket.AF_UNIX if kind == "unix" else socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.connect(target)
+            return
+        except OSError:
+            time.sleep(0.2)
+        finally:
+            sock.close()
+    raise SystemExit(f"Ledger didn't start listening on {ADDRESS}")
+
+
+def start_bot(shard_ids: list[int]) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        AURA_LEDGER=ADDRESS,
+        AURA_SHARD_COUNT=str(SHARDS),
+        AURA_SHARD_IDS=",".join(map(str, shard_ids)),
+    )
+    log(f"Starting bot process for shards {shard_ids}", "SUCCESS")
+    return subprocess.Popen([sys.executable, "main.py"], env=env, start_new_session=True)
+
+
+def stop(processes: list[subprocess.Popen], timeout: float = 30.0) -> None:
+    for process in processes:
+        if process.poll() is None:
+            process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main() -> None:
+    groups = shard_groups(SHARDS, PROCESSES)
+    # The ledger logs to a file of its own, next to the launcher's
+    root, ext = os.path.splitext(LOG_FILE)
+    ledger_env = dict(os.environ, AURA_LOG_FILE=f"{root}.ledger{ext}" if LOG_FILE else "")
+    ledger = subprocess.Popen(
+        [sys.executable, "-m", "modules.ledger", ADDRESS], env=ledger_env, start_new_session=True
+    )
+    wait_for_ledger(ledger)
+
+    bots: dict[int, subprocess.Popen] = {}
+    restart_at: dict[int, float] = {}
+    stopping = False
+
+    def request_stop(*_) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    for i, group in enumerate(groups):
+        bots[i] = start_bot(group)
+    log(f"{len(groups)} bot processes running {SHARDS} shards", "SUCCESS")
+
+    try:
+        while not stopping:
+            time.sleep(1)
+            if ledger.poll() is not None:
+                log(f"Ledger exited with {ledger.returncode}, stopping", "ERROR")
+                break
+            now = time.monotonic()
+            for i, process in bots.items():
+                if process.poll() is None:
+                    continue
+                if i not in restart_at:
+                    log(f"Bot process for shards {groups[i]} exited with {process.returncode}", "ERROR")
+                    restart_at[i] = now + RESTART_DELAY
+                elif now >= restart_at[i]:
+                    del restart_at[i]
+                    bots[i] = start_bot(groups[i])
+    finally:
+        # Bots first: their last changes go to the ledger, which then writes everything
+        stop(list(bots.values()))
+        stop([ledger])
+        log("All processes stopped", "SUCCESS")
+
+
+if __name__ == "__main__":
+    main()
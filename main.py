@@ -1,29 +1,40 @@
 import os
+import signal
 from modules.bot_setup import bot
+import discord
 from modules.aura_manager import (
-    load_aura,
-    load_history,
-    ensure_today,
-    save_json,
-    load_aura_count,
-    HISTORY_FILE,
+    DATA_DIR,
+    CONFIG_FILE,
+    adopt_legacy,
+    legacy_files,
+    flush,
+    flush_loop,
+    register_flush,
+    set_ledger,
 )
-from modules.utils import log
+from modules.storage import load_json
+from modules.utils import log, monitor_loop_lag
+from modules import escrow, file_io, ledger, metrics, reactions, scheduler, sessions, shards, user_directory
 from modules.daily_tasks import (
-    load_config,
     daily_aura_snapshot,
     post_daily_leaderboard,
     spawn_aura_button,
     spawn_golden_button,
 )
 
-# Load data into memory before registering commands/events
-load_config()
-load_aura()
-load_aura_count()
-history = load_history()
-ensure_today(history)
-save_json(HISTORY_FILE, history)
+# Started by launcher.py: the ledger process owns the guild data
+ledger_client = ledger.LedgerClient(os.environ["AURA_LEDGER"]) if os.getenv("AURA_LEDGER") else None
+if ledger_client is not None:
+    set_ledger(ledger_client)
+
+# Load shared data into memory before registering commands/events.
+# Guild data is loaded on first use (see aura_manager.partition()).
+user_directory.load()
+reactions.counted.load()
+register_flush(user_directory.flush)
+register_flush(reactions.counted.flush)
+register_flush(sessions.flush)
+register_flush(scheduler.flush)
 
 # Import commands and events so they register with the bot
 import modules.commands  # noqa: E402,F401
@@ -31,18 +42,75 @@ import modules.events  # noqa: E402,F401
 import modules.games
 
 
+async def legacy_guild() -> int | None:
+    """
+    The server that owns data from before guilds had partitions: AURA_LEGACY_GUILD,
+    else the server of the old event channel, else the bot's only server.
+    """
+    if os.getenv("AURA_LEGACY_GUILD"):
+        return int(os.getenv("AURA_LEGACY_GUILD"))
+    channel_id = load_json(os.path.join(DATA_DIR, CONFIG_FILE)).get("channel_id")
+    if channel_id:
+        try:
+            channel = await bot.fetch_channel(channel_id)
+            return channel.guild.id
+        except discord.HTTPException as e:
+            log(f"Couldn't look up old event channel {channel_id}: {e}", "WARNING")
+    guilds = [guild async for guild in bot.fetch_guilds(limit=2)]
+    return guilds[0].id if len(guilds) == 1 else None
+
+
 async def setup_hook():
     """Called automatically by discord.py when bot is ready to start background tasks."""
-    bot.loop.create_task(daily_aura_snapshot())
-    bot.loop.create_task(post_daily_leaderboard())
-    bot.loop.create_task(spawn_aura_button())
-    bot.loop.create_task(spawn_golden_button())
+    # Move single-server data into its server's partition (once)
+    guild_id = None
+    if legacy_files():
+        guild_id = await legacy_guild()
+        if guild_id is None:
+            log("Can't tell which server owns the data in data/; set AURA_LEGACY_GUILD", "ERROR")
+        elif shards.owns(guild_id):
+            adopt_legacy(guild_id)
+    # Games cut off by the last restart (settles their bets)
+    sessions.load(guild_id)
+
+    # Background jobs, run by one timer. Missed daily posts (bot was down at
+    # 09:29/09:30) run as soon as it's back; see modules/scheduler.py
+    scheduler.load()
+    scheduler.add("daily_snapshot", scheduler.Daily(9, 29), daily_aura_snapshot, catch_up=True)
+    scheduler.add(
+        "daily_leaderboard", scheduler.Daily(9, 30), post_daily_leaderboard,
+        catch_up=True, after="daily_snapshot",
+    )
+    scheduler.add("aura_button", scheduler.Every(25 * 60), spawn_aura_button)
+    scheduler.add("golden_button", scheduler.DailyWindow(9, 21), spawn_golden_button)
+    bot.loop.create_task(scheduler.scheduler_loop())
+    bot.loop.create_task(flush_loop())
+    bot.loop.create_task(reactions.reaction_loop())
+    bot.loop.create_task(sessions.session_timer())
+    bot.loop.create_task(monitor_loop_lag())
+    bot.loop.create_task(metrics.serve())
     log("Background tasks scheduled", "SUCCESS")
 
 
 # Assign proper coroutine function
 bot.setup_hook = setup_hook
 
+def stop_on_sigterm(signum, frame):
+    # Shut down like Ctrl+C, so the flush below runs (launcher.py stops bots with SIGTERM)
+    raise KeyboardInterrupt
+
+
+signal.signal(signal.SIGTERM, stop_on_sigterm)
+
 # Run bot
 log("Bot is starting...", "SUCCESS")
-bot.run(os.getenv("DISCORD_TOKEN"))
+try:
+    bot.run(os.getenv("DISCORD_TOKEN"))
+finally:
+    # Apply queued reactions, then write anything still pending in the write-behind buffer
+    reactions.drain()
+    flush()
+    file_io.drain()
+    if ledger_client is not None:
+        ledger_client.close()
+    log("Pending data flushed on shutdown", "SUCCESS")
@@ -1,110 +1,453 @@
 # modules/aura_manager.py
-import json
+import asyncio
 import os
-from typing import Dict, Any
-
-from modules.utils import log
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Callable
+
+from modules.utils import log, log_enabled
+from modules.rank_index import RankIndex
+from modules import file_io, metrics, pages, shards
+from modules.storage import load_json
+from modules.guild_store import (  # noqa: F401  (file names are used across modules)
+    GuildStore,
+    AURA_FILE,
+    HISTORY_FILE,
+    HISTORY_DIR,
+    AURACOUNTER_FILE,
+    CONFIG_FILE,
+    WINSTREAK_FILE,
+    ESCROW_FILE,
+    JOURNAL_FILE,
+    DB_FILE,
+    FLUSH_INTERVAL,
+    GUILD_IDLE,
+)
 
 # Ensure data directory exists
 DATA_DIR: str = "data"
 os.makedirs(DATA_DIR, exist_ok=True)
 
-# Files (inside data/)
-AURA_FILE: str = os.path.join(DATA_DIR, "aura.json")
-HISTORY_FILE: str = os.path.join(DATA_DIR, "auraHistory.json")
-AURACOUNTER_FILE: str = os.path.join(DATA_DIR, "auraCount.json")
-CONFIG_FILE: str = os.path.join(DATA_DIR, "config.json")
-WINSTREAK_FILE = os.path.join(DATA_DIR, "winstreaks.json")
+# Every guild gets its own partition: data/guilds/<guild_id>/
+GUILDS_DIR: str = os.path.join(DATA_DIR, "guilds")
+
+# Flush functions of other stores that ride along with every flush
+_flush_hooks: list[Callable[[], None]] = []
+# Functions run with a guild selected, right after its partition is loaded
+_load_hooks: list[Callable[[], None]] = []
+
+# Ledger client (see modules/ledger.py) when the tables are owned by the
+# ledger process; None keeps them in this process (GuildStore)
+_ledger = None
+
+
+class NoGuild(RuntimeError):
+    """Guild data was used outside of a guild (a DM, or a task that never selected one)."""
+
+
+class GuildData:
+    """
+    Everything one guild owns: aura, sender counts, winstreaks and open
+    escrows (held by its store), leaderboard indexes, config and user locks.
+    """
+
+    def __init__(self, guild_id: int):
+        self.guild_id = guild_id
+        self.directory = os.path.join(GUILDS_DIR, str(guild_id))
+        os.makedirs(self.directory, exist_ok=True)
+
+        # The tables: on disk through a GuildStore, or in the ledger process
+        self.store = _ledger.store(guild_id) if _ledger is not None else GuildStore(guild_id, self.directory)
+
+        # Leaderboard indexes, kept in sync with the tables.
+        # pos_rank/neg_rank/streak_rank only hold users with a value above 0.
+        self.aura_rank: RankIndex = RankIndex()
+        self.pos_rank: RankIndex = RankIndex()
+        self.neg_rank: RankIndex = RankIndex()
+        self.streak_rank: RankIndex = RankIndex()
+
+        # Config (config.json)
+        self.OWNER_IDS: list[int] = []
+        self.CHANNEL_ID: int | None = None
+
+        # One asyncio.Lock per user (see user_lock())
+        self.locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+        self.last_used: float = time.monotonic()
+        self.closed: bool = False
+
+    @property
+    def aura_data(self) -> Dict[str, int]:
+        return self.store.aura_data
+
+    @property
+    def user_aura_count(self) -> Dict[str, Dict[str, int]]:
+        return self.store.user_aura_count
+
+    @property
+    def winstreakData(self) -> Dict[str, int]:
+        return self.store.winstreakData
+
+    @property
+    def escrows(self) -> Dict[str, Dict[str, Any]]:
+        return self.store.escrows
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+
+# guild_id -> loaded partition
+partitions: Dict[int, GuildData] = {}
+
+# The guild the running task works on; set per command/event (see use())
+_current: ContextVar[GuildData | None] = ContextVar("guild", default=None)
+
+AURA_CHANGES = metrics.Counter("aura_changes", "Aura changes committed, by reason", ("reason",))
+metrics.Gauge("aura_guilds_loaded", "Guild partitions in memory", read=lambda: len(partitions))
+
+
+# ---- Guild partitions ----
+def current() -> GuildData:
+    """The selected guild's data. Raises NoGuild if none was selected."""
+    state = _current.get()
+    if state is None:
+        raise NoGuild("No guild selected")
+    if state.closed:
+        # Unloaded while this task was waiting; pick up the reloaded partition
+        state = use(state.guild_id)
+    return state
+
+
+def partition(guild_id: int) -> GuildData:
+    """A guild's data, loaded from disk the first time it is needed."""
+    guild_id = int(guild_id)
+    state = partitions.get(guild_id)
+    if state is None:
+        state = GuildData(guild_id)
+        partitions[guild_id] = state
+        with _selected(state):
+            load_config()
+            load_aura()
+            for hook in _load_hooks:
+                hook()
+        log(f"Loaded guild {guild_id} ({len(partitions)} in memory)", "SUCCESS")
+    state.last_used = time.monotonic()
+    return state
+
+
+async def preload(guild_id: int) -> None:
+    """
+    With a ledger, fetch an unloaded guild's tables on the I/O thread, so the
+    partition() that follows doesn't hold up the event loop (and the gateway
+    heartbeat) while the ledger answers. Local partitions load as before.
+    """
+    guild_id = int(guild_id)
+    if _ledger is None or guild_id in partitions:
+        return
+    data = await file_io.run(_ledger.request, "load", guild_id)
+    # Loaded by another task meanwhile, and maybe changed since: this copy is stale
+    if guild_id not in partitions:
+        _ledger.prefetched[guild_id] = data
+
+
+def use(guild_id: int) -> GuildData:
+    """Select a guild for the running task (and tasks it starts from now on)."""
+    state = partition(guild_id)
+    _current.set(state)
+    return state
+
+
+@contextmanager
+def using(guild_id: int):
+    """Select a guild for the length of a block."""
+    with _selected(partition(guild_id)) as state:
+        yield state
+
+
+@contextmanager
+def _selected(state: GuildData):
+    token = _current.set(state)
+    try:
+        yield state
+    finally:
+        _current.reset(token)
+
+
+def guild_ids() -> list[int]:
+    """Every guild of this process's shards with a partition, loaded or not."""
+    found = set(partitions)
+    if os.path.isdir(GUILDS_DIR):
+        found.update(int(name) for name in os.listdir(GUILDS_DIR) if name.isdigit())
+    return sorted(g for g in found if shards.owns(g))
+
+
+def guild_channels() -> Dict[int, int]:
+    """{guild_id: event channel} for every guild that has set one, without loading their data."""
+    channels: Dict[int, int] = {}
+    for guild_id in guild_ids():
+        state = partitions.get(guild_id)
+        if state is not None:
+            channel_id = state.CHANNEL_ID
+        else:
+            channel_id = load_json(os.path.join(GUILDS_DIR, str(guild_id), CONFIG_FILE)).get("channel_id")
+        if channel_id:
+            channels[guild_id] = int(channel_id)
+    return channels
+
+
+def register_load(hook: Callable[[], None]) -> None:
+    """Run `hook` (with the guild selected) each time a partition is loaded."""
+    _load_hooks.append(hook)
+
+
+def evict(guild_id: int) -> bool:
+    """
+    Write out a guild's partition and drop it from memory. Refused while a
+    user of that guild holds a lock (a game or transfer is running).
+    """
+    state = partitions.get(guild_id)
+    if state is None or any(lock.locked() for lock in state.locks.values()):
+        return False
+    del partitions[guild_id]
+    state.closed = True
+    state.store.close()
+    pages.drop_guild(guild_id)
+    log(f"Unloaded idle guild {guild_id} ({len(partitions)} in memory)", "INFO")
+    return True
+
+
+def evict_idle() -> None:
+    """Unload every partition unused for GUILD_IDLE seconds."""
+    cutoff = time.monotonic() - GUILD_IDLE
+    for guild_id, state in list(partitions.items()):
+        if state.last_used < cutoff:
+            evict(guild_id)
+
+
+@contextmanager
+def visiting(guild_id: int):
+    """
+    using() for background work on guilds that may not be loaded: a
+    partition loaded just for the block is unloaded again afterwards.
+    """
+    loaded = guild_id in partitions
+    with using(guild_id) as state:
+        yield state
+    if not loaded:
+        evict(guild_id)
+
+
+# ---- Legacy single-guild data ----
+# Files that lived directly in data/ before guilds had partitions
+LEGACY_FILES: tuple[str, ...] = (
+    AURA_FILE, AURACOUNTER_FILE, WINSTREAK_FILE, ESCROW_FILE, CONFIG_FILE, HISTORY_FILE, HISTORY_DIR,
+    JOURNAL_FILE, DB_FILE, f"{DB_FILE}-wal", f"{DB_FILE}-shm", "dailyBoard.json", "backfill.json",
+)
 
-# In-memory state
-aura_data: Dict[str, int] = {}
-user_reactions: Dict[int, list[str]] = {}
-user_aura_count: Dict[str, Dict[str, int]] = {}
-winstreakData: Dict[str, int] = {}
 
-# Global Variables
-OWNER_IDS: list[int] = []
-CHANNEL_ID: int | None = None
+def legacy_files() -> list[str]:
+    """Single-guild data files still sitting in data/ (journal segments included)."""
+    names = [n for n in LEGACY_FILES if os.path.exists(os.path.join(DATA_DIR, n))]
+    names += [
+        n for n in os.listdir(DATA_DIR)
+        if n.startswith(f"{JOURNAL_FILE}.") and n.rsplit(".", 1)[1].isdigit()
+    ]
+    return names
+
+
+def adopt_legacy(guild_id: int) -> bool:
+    """
+    Move the single-guild files in data/ into a guild's partition. Nothing
+    is moved if that guild already has data of its own.
+    """
+    names = legacy_files()
+    if not names:
+        return False
+    target = os.path.join(GUILDS_DIR, str(guild_id))
+    if guild_id in partitions or (os.path.isdir(target) and os.listdir(target)):
+        log(f"Guild {guild_id} already has data; leaving {', '.join(names)} in {DATA_DIR}/", "ERROR")
+        return False
+    os.makedirs(target, exist_ok=True)
+    for name in names:
+        os.replace(os.path.join(DATA_DIR, name), os.path.join(target, name))
+    log(f"Moved {len(names)} data files into {target}", "SUCCESS")
+    return True
+
 
 # ---- Owner/Admin Manager
 
 def add_owner(owner_id : str) -> None:
-    global OWNER_IDS
-    if owner_id not in OWNER_IDS:
-        OWNER_IDS += (owner_id,)
+    state = current()
+    if owner_id not in state.OWNER_IDS:
+        state.OWNER_IDS += (owner_id,)
 
 def remove_owner(owner_id: str) -> None:
-    global OWNER_IDS
     try:
-        OWNER_IDS.remove(owner_id)
+        current().OWNER_IDS.remove(owner_id)
     except ValueError:
         pass
 
-# ---- JSON helpers ----
-def load_json(file: str) -> Dict[str, Any]:
-    """Load JSON from file and return a dict (empty if missing or empty)."""
-    if os.path.exists(file):
-        with open(file, "r", encoding="utf-8") as f:
-            content: str = f.read().strip()
-            if content:
-                try:
-                    return json.loads(content)
-                except json.JSONDecodeError:
-                    log(f"{file} exists but contains invalid JSON. Returning empty dict.", "ERROR")
-                    return {}
-    return {}
 
+def load_config() -> None:
+    """Load the guild's event channel and officers from its config.json."""
+    state = current()
+    data: Dict[str, Any] = load_json(state.path(CONFIG_FILE))
+    state.CHANNEL_ID = data.get("channel_id")
+    state.OWNER_IDS = [int(x) for x in data.get("owner_id", [])]
+
+
+# ---- Ledger ----
+def set_ledger(client) -> None:
+    """
+    Keep the tables in the ledger process (see modules/ledger.py) instead of
+    on disk here. Call before any guild is loaded.
+    """
+    global _ledger
+    _ledger = client
+
+
+# ---- Write-behind ----
+def flush() -> None:
+    """
+    Queue the dirty tables of every loaded guild on the I/O thread (one job
+    per guild), or send what is still buffered for the ledger, then run the
+    flush hooks.
+    """
+    for state in list(partitions.values()):
+        state.store.flush()
+    if _ledger is not None:
+        _ledger.flush()
+    for hook in _flush_hooks:
+        hook()
+
+
+def register_flush(hook: Callable[[], None]) -> None:
+    """Run `hook` on every flush (interval, threshold and shutdown)."""
+    _flush_hooks.append(hook)
 
-def save_json(file: str, data: Dict[str, Any]) -> None:
-    """Write JSON to disk with indentation."""
-    with open(file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
-    log(f"{file} saved", "SUCCESS")
 
+async def flush_loop() -> None:
+    """
+    Background task that flushes dirty tables every FLUSH_INTERVAL seconds
+    and unloads guilds that have gone idle.
+    """
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL)
+        flush()
+        evict_idle()
 
 
 # ---- Aura data management ----
 def load_aura() -> None:
-    """Load the global aura leaderboard into memory."""
-    global aura_data
-    loaded: Dict[str, Any] = load_json(AURA_FILE)
-    aura_data.clear()
-    aura_data.update({k: int(v) for k, v in loaded.items()})  # coerce to int
-    log("Aura data loaded", "SUCCESS" if aura_data else "WARNING")
-
+    """
+    Load the guild's tables (the store replays its journal over them) and
+    rebuild the leaderboard indexes.
+    """
+    state = current()
+    state.store.load()
+    state.aura_rank.rebuild(state.aura_data)
+    state.pos_rank.rebuild({k: v["POS"] for k, v in state.user_aura_count.items() if v["POS"] > 0})
+    state.neg_rank.rebuild({k: v["NEG"] for k, v in state.user_aura_count.items() if v["NEG"] > 0})
+    state.streak_rank.rebuild({k: v for k, v in state.winstreakData.items() if v > 0})
 
-def load_history() -> Dict[str, Any]:
-    """Return saved history (may be empty)."""
-    return load_json(HISTORY_FILE)
 
+def load_recent_history(days: int, state: GuildData | None = None) -> list[tuple[str, Dict[str, Any]]]:
+    """
+    Return the last `days` snapshots as (day, {"time": ..., "aura": {...}}),
+    oldest first. Only those days are rebuilt, not the whole history.
+    Pass `state` when calling from the I/O thread (no guild is selected there).
+    """
+    return (state or current()).store.recent_history(days)
 
-def ensure_today(history: Dict[str, Any]) -> None:
-    """Ensure today's key exists in history (YYYY-MM-DD)."""
-    from datetime import date
 
-    today: str = date.today().strftime("%Y-%m-%d")
-    if today not in history:
-        history[today] = {}
-        log("Added today's date to history", "WARNING")
+def save_history_day(day: str, snapshot: Dict[str, Any]) -> None:
+    """Queue one day of history ({"time": ..., "aura": {...}}) for writing."""
+    current().store.save_history_day(day, snapshot)
 
 
 # ---- Aura Command Helper ----
 
-def set_aura(user_id: int, amount: int) -> None:
+def commit(
+    reason: str,
+    aura: Dict[str, int] | None = None,
+    streaks: Dict[str, int] | None = None,
+    escrow_changes: Dict[str, Dict[str, Any] | None] | None = None,
+) -> None:
+    """
+    Journal and apply one atomic change as a single record: relative aura
+    changes {user_id: delta}, new winstreaks {user_id: streak} and escrow
+    updates {escrow_id: escrow, or None to close it}. Every aura, winstreak
+    and escrow mutation goes through here.
+    """
+    state = current()
+    entries: Dict[str, tuple[int, int]] = {}
+    for uid, delta in (aura or {}).items():
+        entries[uid] = (int(delta), state.aura_data.get(uid, 0) + int(delta))
+    streaks = {str(uid): int(streak) for uid, streak in (streaks or {}).items()}
+    state.store.record(reason, entries, streaks, escrow_changes or {})
+    AURA_CHANGES.inc(reason)
+
+    for uid, (_, balance) in entries.items():
+        state.aura_rank.update(uid, balance)
+    for uid, streak in streaks.items():
+        if streak > 0:
+            state.streak_rank.update(uid, streak)
+        else:
+            state.streak_rank.remove(uid)
+
+
+def apply_aura(changes: Dict[str, int], reason: str) -> None:
+    """Journal and apply relative changes {user_id: delta} as one record."""
+    commit(reason, aura=changes)
+
+
+def set_aura(user_id: int, amount: int, reason: str = "set_aura") -> None:
     """Set a user's aura to an explicit value."""
-    aura_data[str(user_id)] = int(amount)
-    save_json(AURA_FILE, aura_data)
+    uid = str(user_id)
+    apply_aura({uid: int(amount) - balance(uid)}, reason)
     log(f"Set aura for {user_id}: {amount}", "INFO")
 
 
-def update_aura(user_id: int, change: int, name: str | None = None, user_obj=None) -> None:
+def balance(user_id: int | str) -> int:
+    return current().aura_data.get(str(user_id), 0)
+
+
+def debit_if_sufficient(
+    user_id: int | str, amount: int, reason: str, credit_to: int | str | None = None
+) -> bool:
+    """
+    Take `amount` from a user only if they have it, optionally paying it to
+    `credit_to` in the same journal record. There is no await between the
+    check and the change, so nothing else can spend the aura in between.
+    """
+    uid, amount = str(user_id), int(amount)
+    if amount < 0 or balance(uid) < amount:
+        return False
+    changes = {uid: -amount}
+    if credit_to is not None:
+        changes[str(credit_to)] = changes.get(str(credit_to), 0) + amount
+    apply_aura(changes, reason)
+    return True
+
+
+def transfer(giver_id: int | str, receiver_id: int | str, amount: int, reason: str = "give_aura") -> bool:
+    """Move aura between two users as one journal record, if the giver has it."""
+    return debit_if_sufficient(giver_id, amount, reason, credit_to=receiver_id)
+
+
+def update_aura(
+    user_id: int, change: int, name: str | None = None, user_obj=None, reason: str = "update"
+) -> None:
     """
     Apply a relative change to a user's aura (positive or negative),
-    save to disk and log.
+    journal it, mark it for the next flush and log.
     """
     uid = str(user_id)
-    aura_data[uid] = aura_data.get(uid, 0) + int(change)
-    save_json(AURA_FILE, aura_data)
+    apply_aura({uid: int(change)}, reason)
+    if not log_enabled("INFO"):
+        return
 
     if name is not None:
         logName = name
@@ -113,51 +456,32 @@ def update_aura(user_id: int, change: int, name: str | None = None, user_obj=Non
     else:
         logName = str(user_id)
 
-    log(f"Updated aura for {logName}: {aura_data[uid]}", "INFO")
+    log(f"Updated aura for {logName}: {balance(uid)}", "INFO")
 
 
-# ---- Winstreak Handler ---- 
-def loadWinstreak() -> None:
-    """Load the winstreak data into memory"""
-    global winstreakData
-    loaded = load_json(WINSTREAK_FILE)
-    winstreak_data = {k: int(v) for k, v in loaded.items()}
-    log("'winstreak' data loaded", "SUCCESS" if winstreak_data else "WARNING")
+# ---- Winstreak Handler ----
+def nextWinstreak(userID: int | str, won: bool) -> int:
+    """The streak a user would have after a win or a loss."""
+    return getWinstreak(userID) + 1 if won else 0
 
 
 def updateWinstreak(userID: int, won: bool) -> int:
     uID = str(userID)
-    if won:
-        current = winstreakData.get(uID, 0)
-        winstreakData[uID] = current + 1
-    else:
-        winstreakData[uID] = 0
-
-    save_json(WINSTREAK_FILE, winstreakData)
-    log(f"Winstreak for {uID} updated to {winstreakData[uID]}", "INFO")
-    return winstreakData[uID]
+    commit("winstreak", streaks={uID: nextWinstreak(uID, won)})
+    if log_enabled("INFO"):
+        log(f"Winstreak for {uID} updated to {getWinstreak(uID)}", "INFO")
+    return getWinstreak(uID)
 
 def getWinstreak(userID: int) -> int:
     """Get a user's winstreak"""
-    return winstreakData.get(str(userID), 0)
+    return current().winstreakData.get(str(userID), 0)
 
 
 
 # ---- Aura-count-per-sender (positive / negative counts) ----
-def load_aura_count() -> None:
-    """Load counters for how much aura each sender has given (POS/NEG)."""
-    global user_aura_count
-    loaded: Dict[str, Any] = load_json(AURACOUNTER_FILE)
-    user_aura_count = {
-        k: {"POS": int(v.get("POS", 0)), "NEG": int(v.get("NEG", 0))} for k, v in loaded.items()
-    }
-    log("'auraCount' data loaded", "SUCCESS" if user_aura_count else "WARNING")
-
-
-def save_aura_count() -> None:
-    """Persist the sender counters to disk."""
-    save_json(AURACOUNTER_FILE, user_aura_count)
-    log("Saved aura counts to file", "SUCCESS")
+def save_aura_count(*sender_ids: str) -> None:
+    """Queue the sender counters for the next flush."""
+    current().store.counts_changed(*sender_ids)
 
 
 def adjust_sender_count(sender_id: int, field: str, delta: int) -> None:
@@ -165,37 +489,82 @@ def adjust_sender_count(sender_id: int, field: str, delta: int) -> None:
     Increment/decrement a sender's POS/NEG count, clamped to >= 0.
     field must be "POS" or "NEG".
     """
+    state = current()
     sid: str = str(sender_id)
+    _adjust_count(state, sid, field, delta)
+    save_aura_count(sid)
+    if log_enabled("INFO"):
+        log(f"Adjusted {field} for {sid} by {delta} -> {state.user_aura_count[sid][field]}", "INFO")
+
+
+def adjust_sender_counts(deltas: Dict[tuple[str, str], int]) -> None:
+    """Apply many {(sender_id, field): delta} changes with a single dirty mark."""
+    state = current()
+    for (sid, field), delta in deltas.items():
+        _adjust_count(state, sid, field, delta)
+    save_aura_count(*{sid for sid, _ in deltas})
+
+
+def _adjust_count(state: GuildData, sid: str, field: str, delta: int) -> None:
     if field not in ("POS", "NEG"):
         raise ValueError("field must be 'POS' or 'NEG'")
-    if sid not in user_aura_count:
-        user_aura_count[sid] = {"POS": 0, "NEG": 0}
-    user_aura_count[sid][field] = max(0, user_aura_count[sid][field] + int(delta))
-    save_aura_count()
-    log(f"Adjusted {field} for {sid} by {delta} -> {user_aura_count[sid][field]}", "INFO")
+    counts = state.user_aura_count
+    if sid not in counts:
+        counts[sid] = {"POS": 0, "NEG": 0}
+    counts[sid][field] = max(0, counts[sid][field] + int(delta))
+    index: RankIndex = state.pos_rank if field == "POS" else state.neg_rank
+    if counts[sid][field] > 0:
+        index.update(sid, counts[sid][field])
+    else:
+        index.remove(sid)
 
 
 def get_negative_leaderboard() -> list[tuple[str, int]]:
     """
-    Returns list of (user_id_str, neg_count) sorted descending by NEG.
+    Returns list of (user_id_str, neg_count) sorted descending by NEG,
+    for senders with at least one.
     """
-    return sorted(
-        ((uid, data["NEG"]) for uid, data in user_aura_count.items()),
-        key=lambda x: x[1],
-        reverse=True,
-    )
+    neg_rank = current().neg_rank
+    return neg_rank.page(0, len(neg_rank))
 
 
 # ---- Game Lock/Unlock ----
-activePlayers = set()
+# One asyncio.Lock per user of a guild, created on first use and dropped by
+# the garbage collector once nobody holds or waits on it. A user is "busy"
+# while a game or transfer holds their lock; different users never wait on
+# each other.
+def user_lock(user_id: int | str) -> asyncio.Lock:
+    locks = current().locks
+    uid = str(user_id)
+    lock = locks.get(uid)
+    if lock is None:
+        lock = asyncio.Lock()
+        locks[uid] = lock
+    return lock
+
 
-def isBusy(user_id):
-    return user_id in activePlayers
-def lockUser(user_id, name="Unknown",):
-    activePlayers.add(user_id)
-    log(f"{name} has been locked", "INFO")
-def unlockUser(user_id, name="Unknown"):
-    activePlayers.discard(user_id)
-    log(f"{name} has been unlocked", "INFO")
+def isBusy(user_id: int | str) -> bool:
+    lock = current().locks.get(str(user_id))
+    return lock is not None and lock.locked()
 
 
+@asynccontextmanager
+async def locked(*user_ids: int | str):
+    """
+    Hold the locks of every given user (taken in id order, so two games
+    locking the same pair can't deadlock). Check isBusy() first to refuse
+    instead of waiting; with no await in between, taking a free lock is
+    immediate.
+    """
+    locks = [user_lock(uid) for uid in sorted({str(u) for u in user_ids})]
+    taken: list[asyncio.Lock] = []
+    try:
+        for lock in locks:
+            await lock.acquire()
+            taken.append(lock)
+        if log_enabled("INFO"):
+            log(f"Locked {', '.join(sorted({str(u) for u in user_ids}))}", "INFO")
+        yield
+    finally:
+        for lock in reversed(taken):
+            lock.release()
@@ -0,0 +1,213 @@
+# modules/backfill.py
+import asyncio
+import os
+import sys
+from collections import Counter
+from typing import Any, Dict, Iterable
+
+import discord
+
+from modules import aura_manager, file_io, reactions
+from modules.storage import load_json
+from modules.utils import log
+
+# Inside each guild's partition (see aura_manager.GuildData)
+CHECKPOINT_FILE: str = "backfill.json"
+
+# CONCURRENCY -> channels whose history is read at the same time
+# CHECKPOINT  -> messages scanned between checkpoint writes
+CONCURRENCY: int = int(os.getenv("AURA_BACKFILL_CONCURRENCY", "4"))
+CHECKPOINT: int = int(os.getenv("AURA_BACKFILL_CHECKPOINT", "1000"))
+
+
+class Tally:
+    """
+    Running totals of a history scan, plus where each channel got to.
+    Only per-user totals are kept, so memory doesn't grow with messages.
+    """
+
+    def __init__(self, path: str, state: Dict[str, Any] | None = None):
+        self.path = path
+        state = state or {}
+        self.aura: Counter[str] = Counter(state.get("aura", {}))
+        self.pos: Counter[str] = Counter(state.get("POS", {}))
+        self.neg: Counter[str] = Counter(state.get("NEG", {}))
+        self.messages: int = state.get("messages", 0)
+        # channel_id -> {"before": oldest message scanned, "done": bool}
+        self.channels: Dict[str, Dict[str, Any]] = state.get("channels", {})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "aura": dict(self.aura),
+            "POS": dict(self.pos),
+            "NEG": dict(self.neg),
+            "messages": self.messages,
+            "channels": {k: dict(v) for k, v in self.channels.items()},
+        }
+
+    def save(self) -> None:
+        file_io.write_json(self.path, self.to_dict())
+
+
+def checkpoint_file() -> str:
+    """The current guild's checkpoint."""
+    return aura_manager.current().path(CHECKPOINT_FILE)
+
+
+def load_checkpoint(path: str) -> Tally:
+    return Tally(path, load_json(path))
+
+
+def reset_checkpoint() -> None:
+    """Forget the current guild's previous scan so the next one starts from the newest messages."""
+    file_io.submit(_remove_checkpoint, checkpoint_file())
+
+
+def _remove_checkpoint(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+# ---- Scanning ----
+async def _count_message(message: discord.Message) -> tuple[Counter, Counter, Counter]:
+    """Aura, POS and NEG counted from one message's reactions (same rules as live reactions)."""
+    aura, pos, neg = Counter(), Counter(), Counter()
+    if message.author.bot:
+        return aura, pos, neg
+    target = str(message.author.id)
+    for reaction in message.reactions:
+        if isinstance(reaction.emoji, str):
+            continue
+        emoji_name = reactions.aura_emoji(reaction.emoji)
+        if emoji_name is None:
+            continue
+        field, change = reactions.AURA_EMOJI[emoji_name]
+        async for user in reaction.users():
+            if user.bot or user.id == message.author.id:
+                continue
+            aura[target] += change
+            (pos if field == "POS" else neg)[str(user.id)] += 1
+    return aura, pos, neg
+
+
+async def _scan_channel(channel: discord.abc.Messageable, tally: Tally, limit: asyncio.Semaphore) -> None:
+    state = tally.channels.setdefault(str(channel.id), {"before": None, "done": False})
+    if state["done"]:
+        return
+    async with limit:
+        log(f"Backfilling #{getattr(channel, 'name', channel.id)}", "INFO")
+        before = discord.Object(state["before"]) if state["before"] else None
+        async for message in channel.history(limit=None, before=before):
+            aura, pos, neg = await _count_message(message)
+            # Merged without awaiting, so a checkpoint never sees half a message
+            tally.aura.update(aura)
+            tally.pos.update(pos)
+            tally.neg.update(neg)
+            tally.messages += 1
+            state["before"] = message.id
+            if tally.messages % CHECKPOINT == 0:
+                tally.save()
+                log(f"Backfill checkpoint: {tally.messages} messages scanned", "INFO")
+        state["done"] = True
+        tally.save()
+
+
+async def scan(channels: Iterable[discord.abc.Messageable], resume: bool = True) -> Tally:
+    """
+    Read the full history of `channels` (CONCURRENCY at a time, newest first)
+    and count aura reactions per author and reactor. With `resume`, channels
+    pick up from the last checkpoint instead of starting over.
+    """
+    channels = list(channels)
+    tally = load_checkpoint(checkpoint_file()) if resume else Tally(checkpoint_file())
+    limit = asyncio.Semaphore(CONCURRENCY)
+    results = await asyncio.gather(
+        *(_scan_channel(channel, tally, limit) for channel in channels), return_exceptions=True
+    )
+    for channel, result in zip(channels, results):
+        if isinstance(result, Exception):
+            log(f"Backfill of {channel.id} stopped: {result}", "ERROR")
+    tally.save()
+    log(f"Backfill scanned {tally.messages} messages", "SUCCESS")
+    return tally
+
+
+# ---- Reconciliation ----
+def diff(tally: Tally) -> Dict[str, Dict[str, tuple[int, int]]]:
+    """
+    {"aura"|"POS"|"NEG": {user_id: (current, counted)}} for every user whose
+    stored value differs from what the scanned reactions add up to.
+    Aura also comes from games, buttons and gifts, so the aura diff is only
+    meaningful after losing aura.json; POS/NEG only ever come from reactions.
+    """
+    state = aura_manager.current()
+    result: Dict[str, Dict[str, tuple[int, int]]] = {"aura": {}, "POS": {}, "NEG": {}}
+    for uid, counted in tally.aura.items():
+        current = state.aura_data.get(uid, 0)
+        if current != counted:
+            result["aura"][uid] = (current, counted)
+    for field, counts in (("POS", tally.pos), ("NEG", tally.neg)):
+        for uid in set(counts) | {k for k, v in state.user_aura_count.items() if v[field]}:
+            current = state.user_aura_count.get(uid, {}).get(field, 0)
+            if current != counts[uid]:
+                result[field][uid] = (current, counts[uid])
+    return result
+
+
+def apply(tally: Tally, include_aura: bool = False) -> Dict[str, int]:
+    """
+    Apply a scan: POS/NEG counts are replaced, and with `include_aura` every
+    scanned user's aura is set to the counted total. Aura goes in as a single
+    journal record and everything is written with one flush.
+    """
+    changes = diff(tally)
+    counts = {
+        (uid, field): counted - current
+        for field in ("POS", "NEG")
+        for uid, (current, counted) in changes[field].items()
+    }
+    if counts:
+        aura_manager.adjust_sender_counts(counts)
+    if include_aura and changes["aura"]:
+        aura_manager.apply_aura(
+            {uid: counted - current for uid, (current, counted) in changes["aura"].items()},
+            "backfill",
+        )
+    aura_manager.flush()
+    summary = {field: len(users) for field, users in changes.items()}
+    if not include_aura:
+        summary["aura"] = 0
+    log(f"Backfill applied: {summary}", "SUCCESS")
+    return summary
+
+
+# ---- Offline entry point ----
+async def _offline(channel_ids: list[int], apply_changes: bool, include_aura: bool) -> None:
+    client = discord.Client(intents=discord.Intents.default())
+    async with client:
+        await client.login(os.getenv("DISCORD_TOKEN"))
+        channels = [await client.fetch_channel(cid) for cid in channel_ids]
+        # Everything is counted into the first channel's server
+        aura_manager.use(channels[0].guild.id)
+        # No gateway means no emoji cache; aura_emoji() falls back to matching by name
+        tally = await scan(channels)
+    changed = diff(tally)
+    for field, users in changed.items():
+        log(f"{field}: {len(users)} users differ", "INFO")
+    if apply_changes:
+        apply(tally, include_aura)
+
+
+if __name__ == "__main__":
+    # python -m modules.backfill [--apply] [--aura] <channel_id> [...]
+    # Stop the bot first: this writes the same data files.
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    args = sys.argv[1:]
+    ids = [int(a) for a in args if a.isdigit()]
+    if not ids:
+        print("Usage: python -m modules.backfill [--apply] [--aura] <channel_id> [...]")
+        sys.exit(1)
+    asyncio.run(_offline(ids, "--apply" in args, "--aura" in args))
+    file_io.drain()
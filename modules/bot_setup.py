@@ -3,6 +3,7 @@ import os
 from dotenv import load_dotenv
 import discord
 from discord.ext import commands
+from modules import shards, tracing
 from modules.utils import log
 
 load_dotenv()
@@ -10,10 +11,43 @@ TOKEN = os.getenv("DISCORD_TOKEN")
 if not TOKEN:
     raise ValueError("[ERROR] DISCORD_TOKEN not set in environment.")
 
+# Memory profile
+# "default" : discord.py's normal caching (every member chunked at startup)
+# "low"     : no member cache, no startup chunking, no typing events.
+#             Member arguments in commands are fetched when needed instead.
+MEMORY_PROFILE: str = os.getenv("AURA_MEMORY_PROFILE", "default").lower()
+
 intents = discord.Intents.default()
 intents.message_content = True
 intents.reactions = True
 intents.members = True
 
-bot = commands.Bot(command_prefix="?", intents=intents, help_command=None)
-log("Bot setup complete", "SUCCESS")
+# Reactions are handled from raw gateway events, so the message cache only
+# needs to be big enough for views and commands
+MAX_MESSAGES: int = int(os.getenv("AURA_MAX_MESSAGES", "100"))
+
+options: dict = {"max_messages": MAX_MESSAGES}
+if MEMORY_PROFILE == "low":
+    intents.typing = False
+    options.update(
+        member_cache_flags=discord.MemberCacheFlags.none(),
+        chunk_guilds_at_startup=False,
+    )
+
+# Discord REST time shows up in ?perf
+tracing.install()
+
+if shards.SHARD_COUNT:
+    # One of several bot processes started by launcher.py
+    bot = commands.AutoShardedBot(
+        command_prefix="?",
+        intents=intents,
+        help_command=None,
+        shard_count=shards.SHARD_COUNT,
+        shard_ids=shards.SHARD_IDS,
+        **options,
+    )
+    log(f"Running shards {shards.SHARD_IDS} of {shards.SHARD_COUNT}", "SUCCESS")
+else:
+    bot = commands.Bot(command_prefix="?", intents=intents, help_command=None, **options)
+log(f"Bot setup complete ({MEMORY_PROFILE} memory profile)", "SUCCESS")
@@ -6,30 +6,39 @@ import discord
 import json
 import inspect
 import os
+import time
 from modules.bot_setup import bot
-from modules.daily_tasks import save_config, load_config
-from modules import aura_manager
-from modules.utils import log, seconds_until
+from modules.daily_tasks import save_config, golden_spawn_time
+from modules import aura_manager, backfill, bot_setup, file_io, leaderboards, pages, reactions, scheduler, sessions, tracing
+from modules import memory as mem
+from modules.utils import log, seconds_until, loop_lag
 from modules.ui import leaderboardEmbed, randomButton, goldenButtonEmbed
 from discord import Embed
 
 # Path to auraCount.json
 AURA_COUNT_FILE = os.path.join("data", "auraCount.json")
 
+# Besides the bot's owner (or team) on Discord, these users can run the
+# diagnostics commands, which show every server of the process (comma-separated ids)
+MAINTAINER_IDS: set[int] = {int(uid) for uid in os.getenv("AURA_MAINTAINERS", "").split(",") if uid.strip()}
+
+
+async def is_maintainer(user: discord.abc.User) -> bool:
+    """Whether a user may see process-wide stats (?lag, ?memory, ?sessions, ?jobs, ?perf)."""
+    return user.id in MAINTAINER_IDS or await bot.is_owner(user)
+
 
 # Test Page Turn Embed Layout
 class pageTurn(discord.ui.View):
     def __init__(self, data):
         super().__init__(timeout=120)  # Added () after __init__
-        self.data = data
+        # Page provider (see modules/pages.py); plain lists are wrapped
+        self.pages = pages.StaticPages(data) if isinstance(data, list) else data
         self.currentPage = 0
-        self.perPage = 10
 
     def createEmbed(self):
-        # 1. Calculate the chunk of data to show
-        start = self.currentPage * self.perPage
-        end = start + self.perPage
-        chunk = self.data[start:end]
+        # 1. Ask the provider for just this page
+        chunk = self.pages.page(self.currentPage)
 
         # description between each user
         description = "--------------------------------------\n".join(chunk)
@@ -42,7 +51,7 @@ class pageTurn(discord.ui.View):
         )
 
         # 4. Calculate total pages
-        total_pages = (len(self.data) - 1) // self.perPage + 1
+        total_pages = self.pages.pageCount
 
         # 5. Set the footer on the embed object
         embed.set_footer(text=f"Page {self.currentPage + 1} of {total_pages}")
@@ -69,6 +78,10 @@ class pageTurn(discord.ui.View):
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
         # 1. Update the page tracker
+        if self.currentPage + 1 >= self.pages.pageCount:
+            return await interaction.response.send_message(
+                "You're on the last page!", ephemeral=True
+            )
         self.currentPage += 1
 
         # 2. Create the NEW embed
@@ -108,10 +121,10 @@ def load_aura_count() -> dict:
 @bot.command()
 async def set_channel(ctx: commands.Context) -> None:
     """Set the current channel as the daily leaderboard channel."""
-    if ctx.author.id not in aura_manager.OWNER_IDS:
+    if ctx.author.id not in aura_manager.current().OWNER_IDS:
         return await ctx.send("You do not have permission to set channels.")
 
-    aura_manager.CHANNEL_ID = ctx.channel.id
+    aura_manager.current().CHANNEL_ID = ctx.channel.id
     save_config()  # this now saves the correct CHANNEL_ID
     await ctx.send(f"Events will now be sent in {ctx.channel.mention}")
     log(f"Event channel set to {ctx.channel.id} by {ctx.author}", "INFO")
@@ -123,7 +136,7 @@ async def add_officer(ctx: commands.Context, member: discord.Member) -> None:
     if ctx.author.id != ctx.guild.owner_id:
         return await ctx.send("Only the server owner can use this command.")
 
-    if member.id not in aura_manager.OWNER_IDS:
+    if member.id not in aura_manager.current().OWNER_IDS:
         aura_manager.add_owner(member.id)
         save_config()
         await ctx.send(f"{member.mention} has been added as an officer.")
@@ -133,10 +146,10 @@ async def add_officer(ctx: commands.Context, member: discord.Member) -> None:
 
 @bot.command()
 async def remove_officer(ctx: commands.Context, member: discord.Member) -> None:
-    if ctx.author.id not in aura_manager.OWNER_IDS:
+    if ctx.author.id not in aura_manager.current().OWNER_IDS:
         return await ctx.send("You do not have permission to remove officers...")
 
-    if member.id not in aura_manager.OWNER_IDS:
+    if member.id not in aura_manager.current().OWNER_IDS:
         await ctx.send(f"{member.mention} is not an officer.")
     else:
         aura_manager.remove_owner(member.id)
@@ -151,7 +164,7 @@ from modules.daily_tasks import send_leaderboard  # Import the function you just
 async def test_daily(ctx):
     """Manually triggers the daily leaderboard for testing."""
     # 1. Check if the user is an officer
-    if ctx.author.id not in aura_manager.OWNER_IDS:
+    if ctx.author.id not in aura_manager.current().OWNER_IDS:
         return await ctx.send("❌ You don't have permission to run this test.")
 
     await ctx.send("🔄 Running manual daily leaderboard test...")
@@ -173,7 +186,7 @@ async def test_daily(ctx):
 @bot.command()
 async def aura(ctx: commands.Context, member: discord.Member | None = None) -> None:
     member = member or ctx.author
-    user_aura = aura_manager.aura_data.get(str(member.id), 0)
+    user_aura = aura_manager.current().aura_data.get(str(member.id), 0)
     await ctx.send(f"{member.mention}'s aura: `{user_aura:,}`")
     log(f"Aura requested for {member} ({member.id})", "INFO")
 
@@ -183,60 +196,19 @@ async def winstreak(
     ctx: commands.Context, member: discord.Member | None = None
 ) -> None:
     member = member or ctx.author
-    userWinstreak = aura_manager.winstreakData.get(str(member.id), 0)
+    userWinstreak = aura_manager.current().winstreakData.get(str(member.id), 0)
     await ctx.send(f"🔥{member.mention}'s Winstreak: `{userWinstreak}`")
     log(f"Winstreak requested for {member} ({member.id})", "INFO")
 
 
 @bot.command()
 async def lb(ctx, page: int = 1):
-
-    # Check if user is in a game
-    if aura_manager.isBusy(ctx.author.id):
-        return await ctx.send(f"Finish your current game first!")
-
-    # 1. Get the data and FILTER OUT THE BOT
-    # Use .copy() so we don't accidentally delete the bot from the actual file
-    leaderboard_data = aura_manager.aura_data.copy()
-    bot_id_str = str(bot.user.id)
-
-    if bot_id_str in leaderboard_data:
-        del leaderboard_data[bot_id_str]
-
-    if not leaderboard_data:
-        return await ctx.send("No Data for Leaderboard Yet...")
-
-    # 2. Sort the filtered data (Notice we use 'leaderboard_data' here)
-    sorted_aura = sorted(leaderboard_data.items(), key=lambda x: x[1], reverse=True)
-
-    # 3. Format Data
-    formatted_data = []
-    for rank, (uid, score) in enumerate(sorted_aura, start=1):
-        formattedScore = f"{score:,}"
-        prefix = {1: "🥇", 2: "🥈", 3: "🥉"}.get(rank, str(rank))
-        formatted_data.append(f"{prefix}> <@{uid}> \n\u2003Aura: {formattedScore}\n")
-
-    # 4. Initialize the View
-    view = leaderboardEmbed(
-        data=formatted_data,
-        title="Aura Leaderboard",
-        description="Leaderboard for people with the most aura",
-        color=0x6DAB18,
-    )
-
-    # 5. Set the starting page based on user input
-    target_page = page - 1
-    if 0 <= target_page <= view.end:
-        view.currentPage = target_page
-        await ctx.send(embed=view.createEmbed(), view=view)
-    else:
-        # Give a helpful message if the page number is too high
-        await ctx.send(f"Invalid page! Choose between 1 and {view.end + 1}.")
+    await leaderboards.show(ctx, "aura", page)
 
 
 @bot.command()
 async def bank(ctx: commands.Context) -> None:
-    botAura = aura_manager.aura_data.get(str(bot.user.id), 0)
+    botAura = aura_manager.current().aura_data.get(str(bot.user.id), 0)
     await ctx.send(
         f"{ctx.author.mention} > There is currently `{botAura:,}` aura in the bank "
     )
@@ -246,11 +218,11 @@ async def bank(ctx: commands.Context) -> None:
 # OLD LEADERBOARD EMBED, WONT WORK WITH OVER 20 MEMBERS
 
 # async def lb(ctx: commands.Context) -> None:
-#     if not aura_manager.aura_data:
+#     if not aura_manager.current().aura_data:
 #         await ctx.send("No aura yet!")
 #         return
 #
-#     sorted_aura = sorted(aura_manager.aura_data.items(), key=lambda x: x[1], reverse=True)
+#     sorted_aura = sorted(aura_manager.current().aura_data.items(), key=lambda x: x[1], reverse=True)
 #     embed = Embed(title="Aura Leaderboard", description="--------------------------------------",color=discord.Color(0x32CD32), )
 #     for rank, (uid, score) in enumerate(sorted_aura, start=1):
 #         user = await bot.fetch_user(int(uid))
@@ -269,7 +241,6 @@ async def leaderboard_alias(ctx: commands.Context) -> None:
 @bot.command()
 async def give_aura(ctx: commands.Context, member: discord.Member, amount: str) -> None:
     giver_id = str(ctx.author.id)
-    receiver_id = str(member.id)
 
     # Check if user is in a game
     if aura_manager.isBusy(ctx.author.id):
@@ -278,7 +249,7 @@ async def give_aura(ctx: commands.Context, member: discord.Member, amount: str)
         return await ctx.send(f"That user is currently in a game!")
 
     # Get the giver's current balance
-    currentAura = aura_manager.aura_data.get(giver_id, 0)
+    currentAura = aura_manager.current().aura_data.get(giver_id, 0)
 
     # Convert "all" or string to integer
     if amount.lower() == "all":
@@ -298,20 +269,10 @@ async def give_aura(ctx: commands.Context, member: discord.Member, amount: str)
     if member.id == ctx.author.id:
         return await ctx.send("You can't give aura to yourself!")
 
-    # Ensure receiver exists in aura_data
-    aura_manager.aura_data.setdefault(receiver_id, 0)
-
-    # Check if they have enough
-    if currentAura < amount:
+    # Check and move in one step (journaled as one record)
+    if not aura_manager.transfer(ctx.author.id, member.id, amount):
         return await ctx.send(f"You don't have enough aura to give {amount:,}.")
 
-    # Transfer aura
-    aura_manager.aura_data[giver_id] -= amount
-    aura_manager.aura_data[receiver_id] += amount
-
-    # Save to file
-    aura_manager.save_json(aura_manager.AURA_FILE, aura_manager.aura_data)
-
     await ctx.send(
         f"{ctx.author.mention} gave **{amount:,}** aura to {member.mention}!"
     )
@@ -324,7 +285,7 @@ async def give_aura(ctx: commands.Context, member: discord.Member, amount: str)
 @bot.command()
 async def set_aura(ctx: commands.Context, member: discord.Member, amount: int) -> None:
     authorName = ctx.author.display_name.capitalize()
-    if ctx.author.id not in aura_manager.OWNER_IDS:
+    if ctx.author.id not in aura_manager.current().OWNER_IDS:
         return await ctx.send("You do not have permission to set the aura.")
     aura_manager.set_aura(member.id, amount)
     await ctx.send(f"{member.mention} > New Balance: `{amount:,} Aura`")
@@ -333,13 +294,13 @@ async def set_aura(ctx: commands.Context, member: discord.Member, amount: int) -
 
 @bot.command()
 async def reset_aura(ctx: commands.Context, member: discord.Member) -> None:
-    if ctx.author.id not in aura_manager.OWNER_IDS:
+    if ctx.author.id not in aura_manager.current().OWNER_IDS:
         return await ctx.send("You do not have permission to reset the aura.")
     if member is None:
         return await ctx.send(
             "❌ You forgot to include the user! (Usage: `?reset_aura @user`)"
         )
-    aura_manager.set_aura(member.id, 0)
+    aura_manager.set_aura(member.id, 0, reason="reset_aura")
     await ctx.send(f"{member.mention}'s aura has been reset to 0!")
     log(f"{ctx.author} reset aura for {member}", "INFO")
 
@@ -348,10 +309,10 @@ async def reset_aura(ctx: commands.Context, member: discord.Member) -> None:
 async def modify_aura(
     ctx: commands.Context, member: discord.Member, amount: int
 ) -> None:
-    if ctx.author.id not in aura_manager.OWNER_IDS:
+    if ctx.author.id not in aura_manager.current().OWNER_IDS:
         return await ctx.send("You do not have permission to modify aura.")
-    aura_manager.update_aura(member.id, amount, ctx.author.display_name)
-    new_val = aura_manager.aura_data.get(str(member.id), 0)
+    aura_manager.update_aura(member.id, amount, ctx.author.display_name, reason="modify_aura")
+    new_val = aura_manager.current().aura_data.get(str(member.id), 0)
     if amount > 0:
         await ctx.send("Modifying Aura...")
         await ctx.send(f"{member.mention} > New Balance: `{amount} Aura`")
@@ -364,99 +325,19 @@ async def modify_aura(
 @bot.command()
 async def dslb(ctx, page: int = 1):
     """Show paginated leaderboard of who has given the most negative aura."""
-    from modules.aura_manager import user_aura_count
-
-    # Check if user is in a game
-    if aura_manager.isBusy(ctx.author.id):
-        return await ctx.send(f"Finish your currnet game first!")
-
-    # Filter only people with NEG > 0
-    neg_scores = {
-        uid: data["NEG"] for uid, data in user_aura_count.items() if data["NEG"] > 0
-    }
-
-    if not neg_scores:
-        await ctx.send("Nobody has given negative aura yet...")
-        return
-
-    # Sort the data
-    sorted_neg = sorted(neg_scores.items(), key=lambda x: x[1], reverse=True)
-
-    # Format into a list of strings
-    formatted_data = []
-    for rank, (uid, neg_count) in enumerate(sorted_neg, start=1):
-        emoji = {1: "🍆", 2: "🚴", 3: "🤸"}.get(rank, str(rank))
-        formatted_data.append(
-            f"{emoji} > <@{uid}>\n\u2003Negative Aura Given: {neg_count}\n"
-        )
-
-    # Embed Title and Description
-    view = leaderboardEmbed(
-        data=formatted_data,
-        title="Leaderboard of Dicksuck",
-        description="Leaderboard for people who need to lay off the -aura button",
-        color=0xEBF527,
-    )
-
-    # Handle starting page logic
-    target_page = page - 1
-    if target_page < 0 or target_page > view.end:
-        await ctx.send(f"Invalid page! Choose a page between `1` and `{view.end + 1}`.")
-        return
-
-    view.currentPage = target_page
-
-    # Send it
-    await ctx.send(embed=view.createEmbed(), view=view)
+    await leaderboards.show(ctx, "neg", page)
 
 
 @bot.command(name="slb")
 async def slb(ctx: commands.Context, page: int = 1) -> None:
     """Show paginated Simp Leaderboard."""
-    from modules.aura_manager import user_aura_count
-
-    # Check if user is in a game
-    if aura_manager.isBusy(ctx.author.id):
-        return await ctx.send(f"Finish your currnet game first!")
-
-    # 1. Filter only people with POS > 0
-    pos_scores = {
-        uid: data["POS"] for uid, data in user_aura_count.items() if data["POS"] > 0
-    }
-
-    if not pos_scores:
-        await ctx.send("Nobody has given positive aura yet...")
-        return
-
-    # 2. Sort the data
-    sorted_pos = sorted(pos_scores.items(), key=lambda x: x[1], reverse=True)
+    await leaderboards.show(ctx, "pos", page)
 
-    # 3. Format into a list of strings
-    formatted_data = []
-    for rank, (uid, pos_count) in enumerate(sorted_pos, start=1):
-        emoji = {1: "👑", 2: "💎", 3: "🌸"}.get(rank, str(rank))
-        formatted_data.append(
-            f"{emoji} > <@{uid}>\n\u2003Positive Aura Given: {pos_count}\n"
-        )
-
-    # 4. Embed Title and Description
-    view = leaderboardEmbed(
-        data=formatted_data,
-        title="Simp Leaderboard",
-        description="Leaderboard for people who hand out +aura like candy",
-        color=0xFD87E2,
-    )
-
-    # Handle starting page logic
-    target_page = page - 1
-    if target_page < 0 or target_page > view.end:
-        await ctx.send(f"Invalid page! Choose a page between `1` and `{view.end + 1}`.")
-        return
-
-    view.currentPage = target_page
 
-    # Send the embed and the view
-    await ctx.send(embed=view.createEmbed(), view=view)
+@bot.command()
+async def wslb(ctx: commands.Context, page: int = 1) -> None:
+    """Show paginated leaderboard of the longest current winstreaks."""
+    await leaderboards.show(ctx, "streak", page)
 
 
 @bot.command()
@@ -465,7 +346,8 @@ async def dailylb(ctx: commands.Context) -> None:
     if aura_manager.isBusy(ctx.author.id):
         return await ctx.send(f"Finish your currnet game first!")
 
-    wait = seconds_until(9, 30)
+    next_post = scheduler.next_run("daily_leaderboard")
+    wait = max(0.0, next_post - time.time()) if next_post is not None else seconds_until(9, 30)
     hours, minutes, seconds = (
         int(wait // 3600),
         int((wait % 3600) // 60),
@@ -479,7 +361,7 @@ async def gb(ctx: commands.Context) -> None:
     if aura_manager.isBusy(ctx.author.id):
         return await ctx.send(f"Finish your current game first!")
 
-    spawnTime = getattr(bot, "nextGoldenSpawn", None)
+    spawnTime = golden_spawn_time()
     log(f"{ctx.author.display_name} checked for golden button", "INFO")
     try:
         userClicked = getattr(bot, "userClicked")
@@ -506,7 +388,7 @@ async def gb(ctx: commands.Context) -> None:
 
 @bot.command()
 async def spawnButton(ctx: commands.Context, amount: str = "1") -> None:
-    if ctx.author.id not in aura_manager.OWNER_IDS:
+    if ctx.author.id not in aura_manager.current().OWNER_IDS:
         return await ctx.send("Only officers can spawn buttons..")
 
     try:
@@ -527,7 +409,7 @@ async def spawnButton(ctx: commands.Context, amount: str = "1") -> None:
 
 @bot.command()
 async def spawnGoldenButton(ctx: commands.Context) -> None:
-    if ctx.author.id not in aura_manager.OWNER_IDS:
+    if ctx.author.id not in aura_manager.current().OWNER_IDS:
         return await ctx.send("Only officers can spawn buttons..")
     view = goldenButtonEmbed()
     message = await ctx.send("A GOLDEN AURA BUTTON HAS SPAWNED!", view=view)
@@ -538,6 +420,128 @@ async def spawnGoldenButton(ctx: commands.Context) -> None:
     )
 
 
+@bot.command(name="backfill")
+async def backfill_cmd(ctx: commands.Context, mode: str = "scan", option: str = "") -> None:
+    """
+    Rebuild aura counts from channel history.
+    ?backfill [scan]           - scan (or resume scanning) every text channel and show the diff
+    ?backfill apply [aura]     - apply the last scan (POS/NEG, plus aura with "aura")
+    ?backfill reset            - forget the last scan
+    """
+    if ctx.author.id not in aura_manager.current().OWNER_IDS:
+        return await ctx.send("Only officers can run a backfill..")
+
+    mode = mode.lower()
+    if mode == "reset":
+        backfill.reset_checkpoint()
+        return await ctx.send("Backfill checkpoint cleared.")
+
+    if mode == "apply":
+        tally = await file_io.run(backfill.load_checkpoint, backfill.checkpoint_file())
+        if not tally.channels or not all(c["done"] for c in tally.channels.values()):
+            return await ctx.send("No finished scan to apply. Run `?backfill` first.")
+        summary = backfill.apply(tally, include_aura=option.lower() == "aura")
+        return await ctx.send(
+            f"Backfill applied > POS: `{summary['POS']}` | NEG: `{summary['NEG']}` | Aura: `{summary['aura']}` users updated"
+        )
+
+    channels = [
+        c for c in ctx.guild.text_channels if c.permissions_for(ctx.guild.me).read_message_history
+    ]
+    await ctx.send(f"🔄 Scanning {len(channels)} channels, this can take a while...")
+    tally = await backfill.scan(channels)
+    changes = backfill.diff(tally)
+    await ctx.send(
+        f"Scanned `{tally.messages:,}` messages. Users that differ > "
+        f"Aura: `{len(changes['aura'])}` | POS: `{len(changes['POS'])}` | NEG: `{len(changes['NEG'])}`\n"
+        f"Use `?backfill apply` to fix POS/NEG, or `?backfill apply aura` to also replace aura."
+    )
+
+
+@bot.command()
+async def lag(ctx: commands.Context) -> None:
+    """Show how far behind the event loop has been running, plus reaction throughput."""
+    if not await is_maintainer(ctx.author):
+        return await ctx.send("Only the bot's maintainers can view bot stats..")
+    stats = reactions.stats
+    await ctx.send(
+        f"Event loop lag > Last: `{loop_lag['last'] * 1000:.1f} ms` | "
+        f"Avg: `{loop_lag['avg'] * 1000:.1f} ms` | Max: `{loop_lag['max'] * 1000:.1f} ms`\n"
+        f"Reactions > Applied: `{stats['reactions']:,}` in `{stats['batches']:,}` batches | "
+        f"Rate limited: `{stats['suppressed']:,}`"
+    )
+
+
+@bot.command()
+async def memory(ctx: commands.Context) -> None:
+    """Show resident memory and a rough size of every cache."""
+    if not await is_maintainer(ctx.author):
+        return await ctx.send("Only the bot's maintainers can view bot stats..")
+    rows = mem.cache_report(bot)
+    lines = [f"{name:<18}{count:>9,}{size / 1024:>10,.0f} KB" for name, count, size in rows]
+    await ctx.send(
+        f"Resident memory > `{mem.rss_bytes() / 2**20:,.1f} MB` "
+        f"({bot_setup.MEMORY_PROFILE} profile)\n```\n" + "\n".join(lines) + "\n```"
+    )
+
+
+@bot.command(name="sessions")
+async def sessions_cmd(ctx: commands.Context) -> None:
+    """Show how many games are running and how long they have been open."""
+    if not await is_maintainer(ctx.author):
+        return await ctx.send("Only the bot's maintainers can view bot stats..")
+    info = sessions.summary()
+    games = ", ".join(f"{game}: `{count}`" for game, count in info["games"].most_common()) or "none"
+    stats = sessions.stats
+    await ctx.send(
+        f"Open games > `{info['open']}` / `{sessions.MAX_SESSIONS}` in `{info['channels']}` channels "
+        f"(busiest: `{info['busiest_channel']}` / `{sessions.MAX_CHANNEL_SESSIONS}`)\n"
+        f"By game > {games}\n"
+        f"Age > Oldest: `{info['oldest']:.0f}s` | Avg: `{info['average']:.0f}s`\n"
+        f"Since start > Opened: `{stats['opened']:,}` | Refused: `{stats['refused']:,}` | Timed out: `{stats['expired']:,}`"
+    )
+
+
+@bot.command()
+async def jobs(ctx: commands.Context) -> None:
+    """Show the background jobs, when they last ran and when they run next."""
+    if not await is_maintainer(ctx.author):
+        return await ctx.send("Only the bot's maintainers can view bot stats..")
+    lines = []
+    for job in scheduler.summary():
+        next_time = datetime.fromtimestamp(job["next"]).strftime("%a %I:%M %p")
+        last_time = datetime.fromtimestamp(job["last"]).strftime("%a %I:%M %p") if job["last"] else "never"
+        status = " (running)" if job["running"] else ""
+        line = f"**{job['name']}**{status} - {job['trigger']}\n\u2003Next > `{next_time}` | Last > `{last_time}` | Runs > `{job['runs']}`"
+        if job["failures"]:
+            line += f"\n\u2003Failed `{job['failures']}` in a row > `{job['error']}`"
+        lines.append(line)
+    await ctx.send("\n".join(lines) or "No background jobs scheduled.")
+
+
+@bot.command()
+async def perf(ctx: commands.Context) -> None:
+    """Show p50/p95/p99 run times per command and button, split into compute, disk and Discord time."""
+    if not await is_maintainer(ctx.author):
+        return await ctx.send("Only the bot's maintainers can view bot stats..")
+
+    def ms(values: list[float]) -> str:
+        return " / ".join(f"{v * 1000:.0f}" for v in values)
+
+    rows = tracing.report()
+    if not rows:
+        return await ctx.send("Nothing has been timed yet.")
+    lines = [
+        f"**{row['name']}** (`{row['runs']}` runs)\n"
+        f"\u2003Total > `{ms(row['total'])}` ms\n"
+        f"\u2003Compute > `{ms(row['compute'])}` | Disk > `{ms(row['io'])}` | Discord > `{ms(row['rest'])}`\n"
+        for row in rows
+    ]
+    window = f"Last {tracing.WINDOW / 60:g} minutes, p50 / p95 / p99, slowest first"
+    view = leaderboardEmbed(lines, title="Command Latency", description=window, color=0x3498DB)
+    await ctx.send(embed=view.createEmbed(), view=view)
+
+
 @bot.command()
 async def help(ctx: commands.Context) -> None:
     help_text = """        
@@ -547,6 +551,7 @@ async def help(ctx: commands.Context) -> None:
         - `?lb` - Shows global leaderboard
         - `?slb` - Shows who gives the most positive aura
         - `?dslb` - Shows who gives the most negative aura
+        - `?wslb` - Shows the longest current winstreaks
         - `?dailylb` - Shows countdown for next daily leaderboard post
 
         **Games:**
@@ -562,6 +567,14 @@ async def help(ctx: commands.Context) -> None:
         - `?modify_aura [member] [amount]` - Add/subtract from current aura
         - `?set_channel` - Sets the channel for daily leaderboards
         - `?add_officer [member]` - Adds user to the aura officer list
+        - `?backfill [scan | apply [aura] | reset]` - Rebuild aura counts from channel history
+
+        **Bot Maintainer Commands:**
+        - `?lag` - Shows event loop lag and reaction stats
+        - `?memory` - Shows memory use per cache
+        - `?sessions` - Shows running games and their ages
+        - `?jobs` - Shows background jobs and when they run next
+        - `?perf` - Shows p50/p95/p99 run times of commands and buttons
         
         *Note: Use "all" or "half" for quick betting.*
     """
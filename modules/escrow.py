@@ -0,0 +1,111 @@
+# modules/escrow.py
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any
+
+from modules import aura_manager
+from modules.utils import log
+
+# What happens to bets still open when the bot starts (their games can't resume)
+# "refund"  -> stakes go back to the players
+# "forfeit" -> stakes go to the bank, like a timed out game
+ON_RESTART: str = os.getenv("AURA_ESCROW_ON_RESTART", "refund").lower()
+
+
+def reserve(game: str, stakes: Dict[int | str, int], bank: int | str) -> str | None:
+    """
+    Take every player's stake into a new escrow as one journal record, or
+    nothing at all if any of them can't cover it. Returns the escrow id.
+    """
+    stakes = {str(uid): int(amount) for uid, amount in stakes.items()}
+    if any(amount < 0 or aura_manager.balance(uid) < amount for uid, amount in stakes.items()):
+        return None
+    escrow_id = f"{game}-{time.time_ns():x}"
+    aura_manager.commit(
+        f"{game}_stake",
+        aura={uid: -amount for uid, amount in stakes.items()},
+        escrow_changes={
+            escrow_id: {"game": game, "stakes": stakes, "bank": str(bank), "time": round(time.time(), 3)}
+        },
+    )
+    log(f"Escrow {escrow_id} opened: {stakes}", "INFO")
+    return escrow_id
+
+
+def pot(escrow_id: str) -> int:
+    escrow = aura_manager.current().escrows.get(escrow_id)
+    return sum(escrow["stakes"].values()) if escrow else 0
+
+
+def settle(escrow_id: str, payouts: Dict[int | str, int], streaks: Dict[int | str, int] | None = None) -> bool:
+    """
+    Close an escrow with one journal record: pay `payouts` {user_id: amount},
+    give the bank whatever is left of the pot (a win paying more than the
+    pot is paid by the house, as before) and set `streaks` in the same write.
+    False if the escrow was already settled.
+    """
+    escrow: Dict[str, Any] | None = aura_manager.current().escrows.get(escrow_id)
+    if escrow is None:
+        log(f"Escrow {escrow_id} is already settled", "WARNING")
+        return False
+    changes: Dict[str, int] = {}
+    for uid, amount in payouts.items():
+        if amount:
+            changes[str(uid)] = changes.get(str(uid), 0) + int(amount)
+    remainder = pot(escrow_id) - sum(changes.values())
+    if remainder > 0:
+        changes[escrow["bank"]] = changes.get(escrow["bank"], 0) + remainder
+    aura_manager.commit(escrow["game"], aura=changes, streaks=streaks, escrow_changes={escrow_id: None})
+    log(f"Escrow {escrow_id} settled: {changes}", "INFO")
+    return True
+
+
+def refund(escrow_id: str) -> bool:
+    """Give every stake back."""
+    escrow = aura_manager.current().escrows.get(escrow_id)
+    return settle(escrow_id, escrow["stakes"]) if escrow else False
+
+
+def forfeit(escrow_id: str) -> bool:
+    """Give the whole pot to the bank."""
+    return settle(escrow_id, {})
+
+
+@asynccontextmanager
+async def held(game: str, stakes: Dict[int | str, int], bank: int | str):
+    """
+    reserve() for the length of a game. Yields the escrow id (None if a
+    stake couldn't be covered); a game that ends without settling, e.g.
+    on an error, gets its stakes back.
+    """
+    escrow_id = reserve(game, stakes, bank)
+    try:
+        yield escrow_id
+    finally:
+        if escrow_id in aura_manager.current().escrows:
+            refund(escrow_id)
+
+
+# Ids of bets settled by resolve_stale(), so sessions can tell their channels
+interrupted: set[str] = set()
+
+
+def resolve_stale() -> list[str]:
+    """
+    Settle escrows left open by the last run. Runs as each guild's data is
+    loaded (nothing is open in memory before that). Returns their ids.
+    """
+    stale = list(aura_manager.current().escrows)
+    interrupted.update(stale)
+    for escrow_id in stale:
+        if ON_RESTART == "forfeit":
+            forfeit(escrow_id)
+        else:
+            refund(escrow_id)
+    if stale:
+        log(f"{'Forfeited' if ON_RESTART == 'forfeit' else 'Refunded'} {len(stale)} open bets from the last run", "WARNING")
+    return stale
+
+
+aura_manager.register_load(resolve_stale)
@@ -1,32 +1,72 @@
 # modules/events.py
+import time
 import discord
 from discord.ext import commands
 from modules.bot_setup import bot
 from modules.daily_tasks import save_config
 from modules.utils import log
-from modules import aura_manager
+from modules import aura_manager, metrics, reactions, sessions, tracing, user_directory
 
-# Load aura counts into memory
-aura_manager.load_aura_count()
-aura_manager.loadWinstreak()
+COMMANDS = metrics.Counter("aura_commands", "Commands run, by command and status", ("command", "status"))
+COMMAND_SECONDS = metrics.Histogram("aura_command_seconds", "Command run time", ("command",))
+REACTION_EVENTS = metrics.Counter("aura_reaction_events", "Raw reaction events received", ("event",))
+REACTION_SECONDS = metrics.Histogram("aura_reaction_handler_seconds", "Reaction event handler run time", ("event",))
+
+
+@bot.before_invoke
+async def before_command(ctx: commands.Context) -> None:
+    # Runs in the command's task, so the trace covers it until after_command
+    tracing.start(f"?{ctx.command.qualified_name}")
+    await select_guild(ctx)
+
+
+@bot.after_invoke
+async def after_command(ctx: commands.Context) -> None:
+    tracing.finish()
+
+
+async def select_guild(ctx: commands.Context) -> None:
+    """Point every command at its server's data (commands in DMs get none)."""
+    if ctx.guild is None:
+        return
+    await aura_manager.preload(ctx.guild.id)
+    state = aura_manager.use(ctx.guild.id)
+    # The server owner is always an officer
+    owner_id = ctx.guild.owner_id
+    if owner_id is not None and owner_id not in state.OWNER_IDS:
+        state.OWNER_IDS.append(owner_id)
+        log(f"Added server owner {owner_id} to 'OWNER_IDS' of guild {ctx.guild.id}", "SUCCESS")
+        save_config()
+
+
+@bot.listen("on_command")
+async def command_started(ctx: commands.Context) -> None:
+    ctx.started = time.perf_counter()
+
+
+def command_finished(ctx: commands.Context, status: str) -> None:
+    """Count a command and its run time (from on_command to completion or error)."""
+    if ctx.command is None:
+        return
+    COMMANDS.inc(ctx.command.qualified_name, status)
+    started = getattr(ctx, "started", None)
+    if started is not None:
+        COMMAND_SECONDS.observe(time.perf_counter() - started, ctx.command.qualified_name)
+
+
+@bot.listen("on_command_completion")
+async def command_completed(ctx: commands.Context) -> None:
+    command_finished(ctx, "ok")
 
 
 @bot.event
 async def on_ready():
-    updated = False
-    for guild in bot.guilds:
-        owner_id = guild.owner_id
-        if owner_id not in aura_manager.OWNER_IDS:
-            aura_manager.OWNER_IDS.append(owner_id)
-            log(f"Added server owner {owner_id} to 'OWNER_IDS'", "SUCCESS")
-            updated = True
-
-    if updated:
-        save_config()
-        log(
-            f"Saved CHANNEL_ID = {aura_manager.CHANNEL_ID} and OWNER_IDs = {aura_manager.OWNER_IDS}",
-            "SUCCESS",
-        )
+    # Seed the name cache with everyone discord.py already knows about
+    user_directory.remember_many(bot.users)
+    reactions.load_emoji_ids(bot.emojis)
+
+    # Games cut off by the last restart
+    await sessions.resolve_stale(bot)
 
     # VERSION NUMBER
     await bot.change_presence(
@@ -35,91 +75,105 @@ async def on_ready():
 
 
 @bot.event
-async def on_reaction_add(
-    reaction: discord.Reaction, user: discord.User | discord.Member
-) -> None:
+async def on_raw_reaction_add(payload: discord.RawReactionActionEvent) -> None:
     """
     Track reaction adds and update aura/sender counters.
-    Ignores bot reactions and self-reacts.
+    Works for any message, cached or not. Ignores bot reactions and self-reacts.
     """
+    started = time.perf_counter()
+    REACTION_EVENTS.inc("add")
     try:
-        if user.bot:
+        # Cheap filters first: most reactions aren't aura emoji
+        emoji_name = reactions.aura_emoji(payload.emoji)
+        if emoji_name is None or payload.guild_id is None or payload.member is None or payload.member.bot:
             return
 
-        message: discord.Message | None = reaction.message
-        target: discord.User | discord.Member = message.author
-        if message is None:
+        # The gateway sends the author with every add
+        if payload.message_author_id is not None:
+            author_user = bot.get_user(payload.message_author_id)
+            reactions.remember_author(
+                payload.message_id,
+                payload.message_author_id,
+                getattr(author_user, "bot", False),
+            )
+        author = await reactions.message_author(bot, payload.channel_id, payload.message_id)
+        if author is None:
             return
-        if target is None or getattr(target, "bot", False):
-            return
-        if user.id == target.id:
+        target_id, target_is_bot = author
+        if target_is_bot or payload.user_id == target_id:
             return
 
-        emoji_name: str = (
-            reaction.emoji if isinstance(reaction.emoji, str) else reaction.emoji.name
-        )
-        aura_manager.user_reactions.setdefault(user.id, [])
-        if emoji_name not in aura_manager.user_reactions[user.id]:
-            aura_manager.user_reactions[user.id].append(emoji_name)
-
-        if emoji_name == "aura":
-            aura_manager.update_aura(target.id, 1)
-            aura_manager.adjust_sender_count(user.id, "POS", 1)
-            log(f"{user.name} gave +1 aura to {target.name}", "INFO")
-        elif emoji_name == "auradown":
-            aura_manager.update_aura(target.id, -1)
-            aura_manager.adjust_sender_count(user.id, "NEG", 1)
-            log(f"{user.name} gave -1 aura to {target.name}", "INFO")
+        # Count each (message, reactor, emoji) once, even if the event repeats
+        key = (payload.message_id, payload.user_id, emoji_name)
+        if key in reactions.counted or not reactions.allow_add(payload.user_id, target_id):
+            return
+        if reactions.counted.add(key, target_id):
+            # Applied with the next reaction batch (see modules/reactions.py)
+            reactions.submit(
+                payload.guild_id, payload.message_id, payload.user_id, target_id, emoji_name, added=True
+            )
 
     except Exception as e:
-        log(f"Error in on_reaction_add: {e}", "ERROR")
+        log(f"Error in on_raw_reaction_add: {e}", "ERROR")
+    finally:
+        REACTION_SECONDS.observe(time.perf_counter() - started, "add")
 
 
 @bot.event
-async def on_reaction_remove(
-    reaction: discord.Reaction, user: discord.User | discord.Member
-) -> None:
+async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent) -> None:
     """
     Track reaction removals; reverse the aura & sender counters if appropriate.
     """
+    started = time.perf_counter()
+    REACTION_EVENTS.inc("remove")
     try:
-        if user.bot:
+        emoji_name = reactions.aura_emoji(payload.emoji)
+        if emoji_name is None or payload.guild_id is None:
             return
+        # Only reverse reactions that were counted; the index knows the author
+        target_id = reactions.counted.pop((payload.message_id, payload.user_id, emoji_name))
+        if target_id is not None:
+            reactions.submit(
+                payload.guild_id, payload.message_id, payload.user_id, target_id, emoji_name, added=False
+            )
 
-        message: discord.Message | None = reaction.message
-        target: discord.User | discord.Member = message.author
-        if message is None:
-            return
-        if target is None or getattr(target, "bot", False):
-            return
-        if user.id == target.id:
-            return
+    except Exception as e:
+        log(f"Error in on_raw_reaction_remove: {e}", "ERROR")
+    finally:
+        REACTION_SECONDS.observe(time.perf_counter() - started, "remove")
 
-        emoji_name: str = (
-            reaction.emoji if isinstance(reaction.emoji, str) else reaction.emoji.name
-        )
 
-        if (
-            user.id in aura_manager.user_reactions
-            and emoji_name in aura_manager.user_reactions[user.id]
-        ):
-            if emoji_name == "aura":
-                aura_manager.update_aura(target.id, -1)
-                aura_manager.adjust_sender_count(user.id, "POS", -1)
-                log(f"{user.name} removed +aura from {target.name}", "INFO")
-            elif emoji_name == "auradown":
-                aura_manager.update_aura(target.id, 1)
-                aura_manager.adjust_sender_count(user.id, "NEG", -1)
-                log(f"{user.name} removed -aura from {target.name}", "INFO")
-
-            aura_manager.user_reactions[user.id].remove(emoji_name)
+@bot.listen("on_message")
+async def remember_message_author(message: discord.Message) -> None:
+    # Authors of new messages are free to record; saves a fetch if a reaction lacks one
+    reactions.remember_author(message.id, message.author.id, message.author.bot)
 
-    except Exception as e:
-        log(f"Error in on_reaction_remove: {e}", "ERROR")
+
+@bot.event
+async def on_guild_emojis_update(guild: discord.Guild, before, after) -> None:
+    reactions.load_emoji_ids(bot.emojis)
+
+
+@bot.event
+async def on_member_join(member: discord.Member) -> None:
+    user_directory.remember(member)
+
+
+@bot.event
+async def on_member_update(before: discord.Member, after: discord.Member) -> None:
+    if before.name != after.name:
+        user_directory.remember(after)
+
+
+@bot.event
+async def on_user_update(before: discord.User, after: discord.User) -> None:
+    if before.name != after.name:
+        user_directory.remember(after)
 
 
 @bot.event
 async def on_command_error(ctx, error):
+    command_finished(ctx, "error")
     # Command not found
     if isinstance(error, commands.CommandNotFound):
         log(f"{ctx.author} entered a invalid command", "WARNING")
@@ -130,5 +184,9 @@ async def on_command_error(ctx, error):
         )
     elif isinstance(error, commands.MemberNotFound):
         await ctx.send("User not found. Make sure you mention them!")
+    elif isinstance(error, sessions.SessionLimit):
+        await ctx.send(str(error))
+    elif isinstance(getattr(error, "original", None), aura_manager.NoGuild):
+        await ctx.send("That command only works in a server.")
     else:
         log(f"UNHANDELED ERROR {error}", "ERROR")
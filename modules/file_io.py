@@ -0,0 +1,61 @@
+# modules/file_io.py
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from modules import tracing
+from modules.utils import log
+from modules.storage import load_json, save_json
+
+# One thread does all disk work, so writes land in the order they were
+# submitted and a read submitted after a write sees that write.
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aura-io")
+
+
+def _logged(fn: Callable, *args) -> Any:
+    try:
+        return fn(*args)
+    except Exception as e:
+        log(f"Background I/O failed in {getattr(fn, '__qualname__', fn)}: {e}", "ERROR")
+        raise
+
+
+def submit(fn: Callable, *args) -> Future:
+    """Queue fn(*args) on the writer thread. Safe to call with or without a running loop."""
+    return _writer.submit(_logged, fn, *args)
+
+
+async def run(fn: Callable, *args) -> Any:
+    """Run fn(*args) on the writer thread and await the result."""
+    with tracing.span("io"):
+        return await asyncio.wrap_future(submit(fn, *args))
+
+
+def call(fn: Callable, *args) -> Any:
+    """
+    Run fn(*args) on the writer thread (after everything queued before it)
+    and block for the result. Called from the writer thread itself, it just runs.
+    """
+    if threading.current_thread().name.startswith("aura-io"):
+        return fn(*args)
+    with tracing.span("io"):
+        return submit(fn, *args).result()
+
+
+def write_json(file: str, data: Dict[str, Any]) -> Future:
+    """
+    Queue an atomic JSON write. `data` must not be mutated afterwards,
+    so pass a copy of any live dict.
+    """
+    return submit(save_json, file, data)
+
+
+async def read_json(file: str) -> Dict[str, Any]:
+    """Load JSON on the writer thread (after any queued writes to it)."""
+    return await run(load_json, file)
+
+
+def drain() -> None:
+    """Block until every queued write has finished. Used on shutdown."""
+    _writer.shutdown(wait=True)
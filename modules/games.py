@@ -2,9 +2,8 @@ import discord
 import random
 import time
 from math import ceil
-from modules import aura_manager
+from modules import aura_manager, escrow, sessions, tracing
 from modules.bot_setup import bot
-from modules.aura_manager import unlockUser, lockUser, isBusy
 from modules.daily_tasks import save_config
 from modules.ui import coinFlipEmbed, blackJackEmbed, higherLowerEmbed, rockPaperScissorsEmbed, rpsChallengeEmbed, rpsPvPEmbed
 from modules.utils import log
@@ -23,7 +22,7 @@ async def coinflip(ctx, amount: str):
     
 
     user_id = str(ctx.author.id)
-    currentAura = aura_manager.aura_data.get(user_id, 0)
+    currentAura = aura_manager.current().aura_data.get(user_id, 0)
 
     if amount.lower() == "all":
         amount = currentAura
@@ -42,41 +41,44 @@ async def coinflip(ctx, amount: str):
 
 
     view = coinFlipEmbed(ctx.author, amount)
-    aura_manager.lockUser(ctx.author.id, name=ctx.author.display_name)
-    msg = await ctx.send(f"**{ctx.author.mention}** pick Heads or Tails for **{amount:,}** Aura!", view=view )
-    log(f"Game started for {authorName.capitalize()}", "CF_INFO")
-    await view.wait()
-
-    if view.choice is None:
-        aura_manager.update_aura(ctx.author.id, -amount, ctx.author.display_name)
-        aura_manager.update_aura(bot.user.id, +amount, "The House")
-
-        await msg.edit(content=f"{ctx.author.mention} Timed out! You lost. The House takes `{amount:,}' aura", view=None)
-        aura_manager.unlockUser(ctx.author.id, name=ctx.author.display_name)
-        return 
-
-    coinflipInt = random.randint(1,100)
-    if coinflipInt % 2 == 0:
-        result = "heads"
-    else:
-        result = "tails"
+    async with (
+        sessions.opened(ctx, "coinflip", ctx.author.id) as session,
+        aura_manager.locked(ctx.author.id),
+        escrow.held("coinflip", {ctx.author.id: amount}, bot.user.id) as bet,
+    ):
+        if bet is None:
+            return await ctx.send(f"You Only Have {aura_manager.balance(ctx.author.id)} Aura")
+        session.attach(bet)
+        msg = await ctx.send(f"**{ctx.author.mention}** pick Heads or Tails for **{amount:,}** Aura!", view=view )
+        session.attach(message=msg)
+        log(f"Game started for {authorName.capitalize()}", "CF_INFO")
+        with tracing.span("wait"):
+            await view.wait()
+
+        if view.choice is None:
+            escrow.forfeit(bet)
 
+            await msg.edit(content=f"{ctx.author.mention} Timed out! You lost. The House takes `{amount:,}' aura", view=None)
+            return 
 
-    won = (view.choice == result)
-    try:
+        coinflipInt = random.randint(1,100)
+        if coinflipInt % 2 == 0:
+            result = "heads"
+        else:
+            result = "tails"
+
+
+        won = (view.choice == result)
         if won:
-            aura_manager.update_aura(ctx.author.id, amount, ctx.author.display_name)
-            currentAura += amount
+            escrow.settle(bet, {ctx.author.id: amount * 2})
+            currentAura = aura_manager.balance(ctx.author.id)
             outcome_text = f"**YOU WIN!** It was **{result.capitalize()}**.\n**✚{amount:,}** AURA!"
             log(f"{ctx.author.name.capitalize()} Won {amount:,} aura.","COINFLIP")
             await ctx.send(f"{ctx.author.mention} > New Balance: `{currentAura:,} Aura`")
             color = 0x6dab18
         else:
-            aura_manager.update_aura(ctx.author.id, -amount, ctx.author.display_name)
-            aura_manager.update_aura(bot.user.id, +amount, "The House")
-
-            currentAura -= amount
-            botTotal = aura_manager.aura_data.get(str(bot.user.id))
+            escrow.forfeit(bet)
+            currentAura = aura_manager.balance(ctx.author.id)
 
 
             outcome_text = f"**YOU LOSE!** It was **{result.capitalize()}**.\n **━{amount:,}** AURA."
@@ -86,13 +88,9 @@ async def coinflip(ctx, amount: str):
             log(f"{ctx.author.name.capitalize()} Lost {amount:,} aura.","COINFLIP")
             color = 0x992d22
 
-        aura_manager.save_json(aura_manager.AURA_FILE, aura_manager.aura_data)
         embed = discord.Embed(description=outcome_text, color=color)
         await msg.edit(content=None, embed=embed, view=None)
 
-    finally:
-        aura_manager.unlockUser(ctx.author.id, name=ctx.author.display_name)
-
 # -------------------------------------------------------------------------------------------------------------------------------------------------------------------
 
 
@@ -132,7 +130,7 @@ async def blackjack(ctx, amount: str):
     if aura_manager.isBusy(ctx.author.id):
         return await ctx.send(f"Finish your current game first!")
 
-    currentAura = aura_manager.aura_data.get(user_id, 0)
+    currentAura = aura_manager.current().aura_data.get(user_id, 0)
 
     # BET AMOUNT LOGIC
     if amount.lower() == "all":
@@ -150,106 +148,104 @@ async def blackjack(ctx, amount: str):
     if currentAura < amount:
         return await ctx.send(f"You Only Have **{currentAura:,}** Aura") 
 
-    aura_manager.lockUser(ctx.author.id, name=ctx.author.display_name)
-    
-    try:
-        playerHand = [drawCard(), drawCard()]
-        dealerHand = [drawCard(), drawCard()]
+    async with (
+        sessions.opened(ctx, "blackjack", ctx.author.id) as session,
+        aura_manager.locked(ctx.author.id),
+        escrow.held("blackjack", {ctx.author.id: amount}, bot.user.id) as bet,
+    ):
+        if bet is None:
+            return await ctx.send(f"You Only Have **{aura_manager.balance(ctx.author.id):,}** Aura")
+        session.attach(bet)
+        try:
+            playerHand = [drawCard(), drawCard()]
+            dealerHand = [drawCard(), drawCard()]
 
-        embed = discord.Embed(title="Blackjack", color=0x2b2d31)
-        embed.add_field(name="Your Hand", value=f"{playerHand}\nScore: {calculateScore(playerHand)}")
-        embed.add_field(name="Dealer's Hand", value=f"['{dealerHand[0]}', '❓']")
+            embed = discord.Embed(title="Blackjack", color=0x2b2d31)
+            embed.add_field(name="Your Hand", value=f"{playerHand}\nScore: {calculateScore(playerHand)}")
+            embed.add_field(name="Dealer's Hand", value=f"['{dealerHand[0]}', '❓']")
         
-        view = blackJackEmbed(ctx.author, amount) 
-        msg = await ctx.send(f"{ctx.author.mention}'s Blackjack game for **{amount:,}** aura", embed=embed, view=view)
+            view = blackJackEmbed(ctx.author, amount) 
+            msg = await ctx.send(f"{ctx.author.mention}'s Blackjack game for **{amount:,}** aura", embed=embed, view=view)
+            session.attach(message=msg)
 
-        playing = True
-        log(f"Game started for {authorName.capitalize()}", "BJ_INFO")
+            playing = True
+            log(f"Game started for {authorName.capitalize()}", "BJ_INFO")
         
-        while playing:
-            current_score = calculateScore(playerHand)
-            if current_score >= 21:
-                break
-
-            view = blackJackEmbed(ctx.author, amount)
-            await msg.edit(embed=embed, view=view)
-            await view.wait()
+            while playing:
+                current_score = calculateScore(playerHand)
+                if current_score >= 21:
+                    break
 
-            if view.choice == "hit":
-                playerHand.append(drawCard())
-                new_score = calculateScore(playerHand)
-                embed.set_field_at(0, name="Your Hand", value=f"{playerHand}\nScore: {new_score}")
-                if new_score >= 21:
+                view = blackJackEmbed(ctx.author, amount)
+                await msg.edit(embed=embed, view=view)
+                with tracing.span("wait"):
+                    await view.wait()
+
+                if view.choice == "hit":
+                    playerHand.append(drawCard())
+                    new_score = calculateScore(playerHand)
+                    embed.set_field_at(0, name="Your Hand", value=f"{playerHand}\nScore: {new_score}")
+                    if new_score >= 21:
+                        playing = False
+                elif view.choice == "stand":
                     playing = False
-            elif view.choice == "stand":
-                playing = False
-            else:
-                # --- TIMEOUT LOSS LOGIC ---
-                aura_manager.update_aura(ctx.author.id, -amount, ctx.author.display_name)
-                aura_manager.update_aura(bot.user.id, +amount, "The House" )
+                else:
+                    # --- TIMEOUT LOSS LOGIC ---
+                    escrow.forfeit(bet)
 
-                aura_manager.save_json(aura_manager.AURA_FILE, aura_manager.aura_data)
                 
-                new_balance = aura_manager.aura_data.get(user_id, 0)
+                    new_balance = aura_manager.current().aura_data.get(user_id, 0)
                 
-                log(f"{authorName.capitalize()} timed out and lost {amount:,} aura", "BLACKJACK")
+                    log(f"{authorName.capitalize()} timed out and lost {amount:,} aura", "BLACKJACK")
                 
-                await msg.edit(content=f"**Timed out!** You lost **{amount:,}** Aura.", embed=None, view=None)
-                await ctx.send(f"{ctx.author.mention} > New Balance: `{new_balance:,} Aura`")
-                # await ctx.send(f"`{amount:,}` aura has been added to the bank. ")
-                return
-
-        # DEALER TURN
-        playerFinal = calculateScore(playerHand)
-        if playerFinal <= 21:
-            while calculateScore(dealerHand) < 17:
-                dealerHand.append(drawCard())
+                    await msg.edit(content=f"**Timed out!** You lost **{amount:,}** Aura.", embed=None, view=None)
+                    await ctx.send(f"{ctx.author.mention} > New Balance: `{new_balance:,} Aura`")
+                    # await ctx.send(f"`{amount:,}` aura has been added to the bank. ")
+                    return
+
+            # DEALER TURN
+            playerFinal = calculateScore(playerHand)
+            if playerFinal <= 21:
+                while calculateScore(dealerHand) < 17:
+                    dealerHand.append(drawCard())
         
-        dealerFinal = calculateScore(dealerHand)
+            dealerFinal = calculateScore(dealerHand)
         
-# DETERMINE WINNER
-        bot_id_str = str(bot.user.id)
-        if playerFinal > 21:
-            result, change, color = "BUST", -amount, 0x992d22
-            # House collects on player bust
-            aura_manager.update_aura(bot.user.id, amount, "The House")
-        elif dealerFinal > 21:
-            result, change, color = "DEALER BUSTED - YOU WIN!", amount, 0x6dab18
-        elif playerFinal > dealerFinal:
-            result, change, color = "YOU WIN!", amount, 0x6dab18
-        elif playerFinal < dealerFinal:
-            result, change, color = "DEALER WINS", -amount, 0x992d22
-            # House collects on dealer win
-            aura_manager.update_aura(bot.user.id, amount, "The House")
-        else:
-            result, change, color = "PUSH (TIE)", 0, 0x7289da
+            # DETERMINE WINNER
+            bot_id_str = str(bot.user.id)
+            if playerFinal > 21:
+                result, change, color = "BUST", -amount, 0x992d22
+            elif dealerFinal > 21:
+                result, change, color = "DEALER BUSTED - YOU WIN!", amount, 0x6dab18
+            elif playerFinal > dealerFinal:
+                result, change, color = "YOU WIN!", amount, 0x6dab18
+            elif playerFinal < dealerFinal:
+                result, change, color = "DEALER WINS", -amount, 0x992d22
+            else:
+                result, change, color = "PUSH (TIE)", 0, 0x7289da
 
-        # UPDATE PLAYER AURA
-        if change != 0:
-            aura_manager.update_aura(ctx.author.id, change, ctx.author.display_name)
-            aura_manager.save_json(aura_manager.AURA_FILE, aura_manager.aura_data)
+            # SETTLE THE BET (the house keeps the stake on a loss)
+            escrow.settle(bet, {ctx.author.id: amount + change})
 
-        # Get  balances for the final message
-        new_balance = aura_manager.aura_data.get(user_id, 0)
-        bot_balance = aura_manager.aura_data.get(bot_id_str, 0)
+            # Get  balances for the final message
+            new_balance = aura_manager.current().aura_data.get(user_id, 0)
+            bot_balance = aura_manager.current().aura_data.get(bot_id_str, 0)
 
-        # FINAL UI UPDATE
-        finalEmbed = discord.Embed(title=f"Blackjack - {result}", color=color)
-        finalEmbed.add_field(name="Your Hand", value=f"{playerHand}\nScore: {playerFinal}")
-        finalEmbed.add_field(name="Dealer Hand", value=f"{dealerHand}\nScore: {dealerFinal}")
+            # FINAL UI UPDATE
+            finalEmbed = discord.Embed(title=f"Blackjack - {result}", color=color)
+            finalEmbed.add_field(name="Your Hand", value=f"{playerHand}\nScore: {playerFinal}")
+            finalEmbed.add_field(name="Dealer Hand", value=f"{dealerHand}\nScore: {dealerFinal}")
         
-        await msg.edit(embed=finalEmbed, view=None)
+            await msg.edit(embed=finalEmbed, view=None)
 
-        status_msg = f"{ctx.author.mention} > New Balance: `{new_balance:,} Aura`"
+            status_msg = f"{ctx.author.mention} > New Balance: `{new_balance:,} Aura`"
         
-        if change < 0:
-            status_msg += f"\n`{amount:,}` aura added to the bank."
+            if change < 0:
+                status_msg += f"\n`{amount:,}` aura added to the bank."
             
-        await ctx.send(status_msg)
-    except Exception as e:
-        log(f"Blackjack Error: {e}", "ERROR")
-    finally:
-        aura_manager.unlockUser(ctx.author.id, name=ctx.author.display_name)
+            await ctx.send(status_msg)
+        except Exception as e:
+            log(f"Blackjack Error: {e}", "ERROR")
 
 @bot.command(aliases=['hl'])
 async def higherlower(ctx, amount: str):
@@ -259,7 +255,7 @@ async def higherlower(ctx, amount: str):
     if aura_manager.isBusy(ctx.author.id):
         return await ctx.send("Finish your current game first!")
 
-    currentAura = aura_manager.aura_data.get(user_id, 0)
+    currentAura = aura_manager.current().aura_data.get(user_id, 0)
 
     # Bet Amount Logic
     if amount.lower() == "all":
@@ -285,120 +281,118 @@ async def higherlower(ctx, amount: str):
     turn = 0
     playing = True
     
-    aura_manager.lockUser(ctx.author.id, name=ctx.author.display_name)
-    log(f"HL Game started for {authorName.capitalize()} for {amount:,} aura", "HL_INFO")
-
-    try:
-        embed = discord.Embed(title="Higher or Lower", color=0x2b2d31)
-        embed.add_field(name="Current Dice", value=f"**{dice}**", inline=True)
-        embed.add_field(name="Current Pot", value=f"**{pot:,}** Aura", inline=True)
-        embed.set_footer(text=f"Round: {turn + 1}/5 | Next Multiplier: {PAYOUTS[turn]}x | Buy-in: {amount:,}")
+    async with (
+        sessions.opened(ctx, "higherlower", ctx.author.id) as session,
+        aura_manager.locked(ctx.author.id),
+        escrow.held("higherlower", {ctx.author.id: amount}, bot.user.id) as bet,
+    ):
+        if bet is None:
+            return await ctx.send(f"You Only Have **{aura_manager.balance(ctx.author.id):,}** Aura")
+        session.attach(bet)
+        log(f"HL Game started for {authorName.capitalize()} for {amount:,} aura", "HL_INFO")
+
+        try:
+            embed = discord.Embed(title="Higher or Lower", color=0x2b2d31)
+            embed.add_field(name="Current Dice", value=f"**{dice}**", inline=True)
+            embed.add_field(name="Current Pot", value=f"**{pot:,}** Aura", inline=True)
+            embed.set_footer(text=f"Round: {turn + 1}/5 | Next Multiplier: {PAYOUTS[turn]}x | Buy-in: {amount:,}")
         
-        view = higherLowerEmbed(ctx.author)
-        msg = await ctx.send(f"{ctx.author.mention} starting Higher/Lower!", embed=embed, view=view)
+            view = higherLowerEmbed(ctx.author)
+            msg = await ctx.send(f"{ctx.author.mention} starting Higher/Lower!", embed=embed, view=view)
+            session.attach(message=msg)
 
-        while playing:
-            await view.wait()
+            while playing:
+                with tracing.span("wait"):
+                    await view.wait()
 
-            # Timeout Logic
-            if view.choice is None:
-                aura_manager.update_aura(ctx.author.id, -amount, ctx.author.display_name)
-                aura_manager.update_aura(bot.user.id, +amount, "The House") 
-
-                aura_manager.save_json(aura_manager.AURA_FILE, aura_manager.aura_data)
-                log(f"{authorName.capitalize()} HL Timed Out", "HIGHERLOWER")
-                await msg.edit(content=f"**Timed out!** You lost **{amount:,}** Aura.", embed=None, view=None)
-                # await ctx.send(f"`{amount:,}` aura has been added to the bank. ")
-
-                await ctx.send(f"")
-                playing = False
-                break
-
-            # Cash Out Logic
-            if view.choice == "quit":
-                if turn >= 2:
-                    profit = pot - amount
-                    if profit != 0:
-                        aura_manager.update_aura(ctx.author.id, profit, ctx.author.display_name)
-                        aura_manager.save_json(aura_manager.AURA_FILE, aura_manager.aura_data)
-                    
-                    log(f"{authorName.capitalize()} cashed out HL on round {turn} at {pot:,}", "HIGHERLOWER")
-                    embed.title = "Cashed Out!"
-                    embed.color = 0x6dab18
-                    embed.description = f"You walked away with **{pot:,}** Aura."
-                    await msg.edit(content=None, embed=embed, view=None)
+                # Timeout Logic
+                if view.choice is None:
+                    escrow.forfeit(bet)
+
+                    log(f"{authorName.capitalize()} HL Timed Out", "HIGHERLOWER")
+                    await msg.edit(content=f"**Timed out!** You lost **{amount:,}** Aura.", embed=None, view=None)
+                    # await ctx.send(f"`{amount:,}` aura has been added to the bank. ")
+
+                    await ctx.send(f"")
                     playing = False
                     break
-                else:
-                    embed.description = f"Nah you can't quit until you make it to round 3."
+
+                # Cash Out Logic
+                if view.choice == "quit":
+                    if turn >= 2:
+                        escrow.settle(bet, {ctx.author.id: pot})
+                    
+                        log(f"{authorName.capitalize()} cashed out HL on round {turn} at {pot:,}", "HIGHERLOWER")
+                        embed.title = "Cashed Out!"
+                        embed.color = 0x6dab18
+                        embed.description = f"You walked away with **{pot:,}** Aura."
+                        await msg.edit(content=None, embed=embed, view=None)
+                        playing = False
+                        break
+                    else:
+                        embed.description = f"Nah you can't quit until you make it to round 3."
+                        view = higherLowerEmbed(ctx.author)
+                        await msg.edit(embed=embed, view=view)
+                        continue
+                
+                # Roll Logic
+                roll = random.randint(1, 100)
+                won = (view.choice == "higher" and roll > dice) or (view.choice == "lower" and roll < dice)
+                embed.description = f"[{dice}] -> [{roll}]\n"
+
+                if roll == dice:
+                    embed.description = f"TIE! Go again."
+                    embed.set_footer(text=f"Rolled a {roll}: Tie! Try again.")
                     view = higherLowerEmbed(ctx.author)
                     await msg.edit(embed=embed, view=view)
                     continue
-                
-            # Roll Logic
-            roll = random.randint(1, 100)
-            won = (view.choice == "higher" and roll > dice) or (view.choice == "lower" and roll < dice)
-            embed.description = f"[{dice}] -> [{roll}]\n"
-
-            if roll == dice:
-                embed.description = f"TIE! Go again."
-                embed.set_footer(text=f"Rolled a {roll}: Tie! Try again.")
-                view = higherLowerEmbed(ctx.author)
-                await msg.edit(embed=embed, view=view)
-                continue
 
-            if won:
-                pot = ceil(pot * MULT[turn])
-                turn += 1
-                dice = roll
+                if won:
+                    pot = ceil(pot * MULT[turn])
+                    turn += 1
+                    dice = roll
                 
-                if turn >= len(MULT): # Max Rounds Reached
-                    log(f"{authorName.capitalize()} Reached round 5.", "HIGHERLOWER")
-                    profit = pot - amount
-                    aura_manager.update_aura(ctx.author.id, profit, ctx.author.display_name)
-                    aura_manager.save_json(aura_manager.AURA_FILE, aura_manager.aura_data)
+                    if turn >= len(MULT): # Max Rounds Reached
+                        log(f"{authorName.capitalize()} Reached round 5.", "HIGHERLOWER")
+                        escrow.settle(bet, {ctx.author.id: pot})
                     
-                    embed.title = "MAX WINS REACHED!"
-                    embed.color = 0x6dab18
-                    embed.set_field_at(0, name="Final Dice", value=f"**{roll}**")
-                    embed.set_field_at(1, name="Final Payout", value=f"**{pot:,}** Aura")
-                    embed.set_footer(text=f"Game Completed | Multiplier: {PAYOUTS[-1]}x | Buy-in: {amount:,}")
+                        embed.title = "MAX WINS REACHED!"
+                        embed.color = 0x6dab18
+                        embed.set_field_at(0, name="Final Dice", value=f"**{roll}**")
+                        embed.set_field_at(1, name="Final Payout", value=f"**{pot:,}** Aura")
+                        embed.set_footer(text=f"Game Completed | Multiplier: {PAYOUTS[-1]}x | Buy-in: {amount:,}")
+                        await msg.edit(content=None, embed=embed, view=None)
+                        playing = False
+                    else:
+                        embed.description += f"It was {view.choice}. Good job. Again! :smiling_imp:"
+                        embed.set_field_at(0, name="Current Dice", value=f"**{dice}**")
+                        embed.set_field_at(1, name="Current Pot", value=f"**{pot:,}** Aura")
+                        embed.set_footer(text=f"Round: {turn + 1}/5 | Next Multiplier: {PAYOUTS[turn]}x | Buy-in: {amount:,}")
+                        view = higherLowerEmbed(ctx.author)
+                        await msg.edit(embed=embed, view=view)
+
+                else:
+                    # Loss Logic
+                    escrow.forfeit(bet)
+
+                
+                    log(f"{authorName.capitalize()} lost HL game.", "HIGHERLOWER")
+                    embed.title = "YOU LOSE!"
+                    embed.color = 0x992d22
+                    embed.description += f"Aww you lost **{amount:,}** Aura."
+                    embed.set_footer(text=f"Round: {turn + 1}/5 | Pot lost: {pot} | Buy-in: {amount:,}")
+                    embed.clear_fields()
                     await msg.edit(content=None, embed=embed, view=None)
                     playing = False
-                else:
-                    embed.description += f"It was {view.choice}. Good job. Again! :smiling_imp:"
-                    embed.set_field_at(0, name="Current Dice", value=f"**{dice}**")
-                    embed.set_field_at(1, name="Current Pot", value=f"**{pot:,}** Aura")
-                    embed.set_footer(text=f"Round: {turn + 1}/5 | Next Multiplier: {PAYOUTS[turn]}x | Buy-in: {amount:,}")
-                    view = higherLowerEmbed(ctx.author)
-                    await msg.edit(embed=embed, view=view)
 
-            else:
-                # Loss Logic
-                aura_manager.update_aura(ctx.author.id, -amount, ctx.author.display_name)
-                aura_manager.update_aura(bot.user.id, +amount, "The House")
+            # Final balance update
+            new_balance = aura_manager.current().aura_data.get(user_id, 0)
+            await ctx.send(f"{ctx.author.mention} > New Balance: `{new_balance:,} Aura`")
+            # await ctx.send(f"`{amount:,}` aura has been added to the bank. ")
 
-                aura_manager.save_json(aura_manager.AURA_FILE, aura_manager.aura_data)
-                
-                log(f"{authorName.capitalize()} lost HL game.", "HIGHERLOWER")
-                embed.title = "YOU LOSE!"
-                embed.color = 0x992d22
-                embed.description += f"Aww you lost **{amount:,}** Aura."
-                embed.set_footer(text=f"Round: {turn + 1}/5 | Pot lost: {pot} | Buy-in: {amount:,}")
-                embed.clear_fields()
-                await msg.edit(content=None, embed=embed, view=None)
-                playing = False
-
-        # Final balance update
-        new_balance = aura_manager.aura_data.get(user_id, 0)
-        await ctx.send(f"{ctx.author.mention} > New Balance: `{new_balance:,} Aura`")
-        # await ctx.send(f"`{amount:,}` aura has been added to the bank. ")
-
-
-    except Exception as e:
-        log(f"Higher/Lower Error: {e}", "ERROR")
-    finally:
-        aura_manager.unlockUser(ctx.author.id, name=ctx.author.display_name)
+
+        except Exception as e:
+            log(f"Higher/Lower Error: {e}", "ERROR")
 
 @bot.command(aliases=['rps'])
 async def rockPaperScissors(ctx, opponent: Optional[discord.Member] = None, amount: str = 0):
@@ -412,7 +406,7 @@ async def rockPaperScissors(ctx, opponent: Optional[discord.Member] = None, amou
         amount = opponent
         opponent = None
     
-    currentAura = aura_manager.aura_data.get(userID, 0)
+    currentAura = aura_manager.current().aura_data.get(userID, 0)
 
     if isinstance(amount, str):
         if amount.lower() == "all":
@@ -441,7 +435,7 @@ async def rockPaperScissors(ctx, opponent: Optional[discord.Member] = None, amou
         if opponent.bot:
             return await ctx.send("Don't ping me to challenge the house!")
         
-        oppAura = aura_manager.aura_data.get(str(opponent.id), 0)
+        oppAura = aura_manager.current().aura_data.get(str(opponent.id), 0)
         if oppAura < amount:
             return await ctx.send(f"{opponent.mention} doesn't have enough aura 🤣 🫵")
         
@@ -449,114 +443,119 @@ async def rockPaperScissors(ctx, opponent: Optional[discord.Member] = None, amou
             return await ctx.send(f"**{opponent.display_name}** is already in a game")
         
         # Send Challenge Embed
-        aura_manager.lockUser(ctx.author.id, name=ctx.author.display_name)  # Lock author while challenging
-        log(f"{ctx.author.display_name} Challenged {opponent.display_name} to RPS | Bet: {amount:,} Aura", "RPS_DUEL")
-        view = rpsChallengeEmbed(ctx.author, opponent, amount)
-        embed = discord.Embed(
-            title = "RPS Challenge",
-            description=f"{ctx.author.mention} has challenged {opponent.mention} for `{amount:,} Aura`",
-            color=0xFFFFFF
-        )
-        msg = await ctx.send(content=opponent.mention, embed=embed, view=view)
+        # Lock author while challenging
+        async with sessions.opened(ctx, "rps", ctx.author.id) as session, aura_manager.locked(ctx.author.id):
+            log(f"{ctx.author.display_name} Challenged {opponent.display_name} to RPS | Bet: {amount:,} Aura", "RPS_DUEL")
+            view = rpsChallengeEmbed(ctx.author, opponent, amount)
+            embed = discord.Embed(
+                title = "RPS Challenge",
+                description=f"{ctx.author.mention} has challenged {opponent.mention} for `{amount:,} Aura`",
+                color=0xFFFFFF
+            )
+            msg = await ctx.send(content=opponent.mention, embed=embed, view=view)
+            session.attach(message=msg)
+
+            with tracing.span("wait"):
+                await view.wait()
+
+            if not view.accepted:
+                log(f"{opponent.display_name} Declined duel against {ctx.author.display_name}", "RPS_DUEL")
+                return await ctx.send("Challenge Declined or Timed Out..")
+        
 
-        await view.wait()
+            # The opponent may have started a game or spent aura while deciding
+            if aura_manager.isBusy(opponent.id):
+                return await ctx.send(f"**{opponent.display_name}** is already in a game")
 
-        if not view.accepted:
-            log(f"{opponent.display_name} Declined duel against {ctx.author.display_name}", "RPS_DUEL")
-            aura_manager.unlockUser(ctx.author.id, name=ctx.author.display_name)
-            return await ctx.send("Challenge Declined or Timed Out..")
-        
+            # PvP Logic
+            async with aura_manager.locked(opponent.id), escrow.held(
+                "rps", {ctx.author.id: amount, opponent.id: amount}, bot.user.id
+            ) as bet:
+                if bet is None:
+                    return await ctx.send("Someone spent their aura before the duel started..")
+                session.players.append(str(opponent.id))
+                session.attach(bet)
+                log(f"{opponent.display_name} Accepted duel against {ctx.author.display_name} | Bet: {amount:,} Aura.", "RPS_DUEL")
+                pvpView = rpsPvPEmbed(ctx.author, opponent, amount)
 
-        # PvP Logic
-        log(f"{opponent.display_name} Accepted duel against {ctx.author.display_name} | Bet: {amount:,} Aura.", "RPS_DUEL")
-        aura_manager.lockUser(opponent.id, name=opponent.display_name)
-        
-        try:
-            pvpView = rpsPvPEmbed(ctx.author, opponent, amount)
+                pvpEmbed = discord.Embed(title="RPS Duel", color=0xFFFFFF)
+                pvpEmbed.add_field(name=ctx.author.display_name, value="Selecting...", inline=True)
+                pvpEmbed.add_field(name="vs", value="|", inline=True)
+                pvpEmbed.add_field(name=opponent.display_name, value="Selecting...", inline=True)
 
-            pvpEmbed = discord.Embed(title="RPS Duel", color=0xFFFFFF)
-            pvpEmbed.add_field(name=ctx.author.display_name, value="Selecting...", inline=True)
-            pvpEmbed.add_field(name="vs", value="|", inline=True)
-            pvpEmbed.add_field(name=opponent.display_name, value="Selecting...", inline=True)
+                await msg.edit(content=None, embed=pvpEmbed, view=pvpView)
 
-            await msg.edit(content=None, embed=pvpEmbed, view=pvpView)
+                with tracing.span("wait"):
+                    await pvpView.wait()
 
-            await pvpView.wait()
+                if pvpView.p1Choice and pvpView.p2Choice:
+                    p1c, p2c = pvpView.p1Choice, pvpView.p2Choice
 
-            if pvpView.p1Choice and pvpView.p2Choice:
-                p1c, p2c = pvpView.p1Choice, pvpView.p2Choice
+                    if p1c == p2c:
+                        resultText = (f"It was a **TIE**.")
+                        log(f"Game: {ctx.author.display_name} vs. {opponent.display_name} | Bet: {amount:,} Aura | Winner: TIE", "RPS_DUEL")
+                        color = 0x7289da
 
-                if p1c == p2c:
-                    resultText = (f"It was a **TIE**.")
-                    log(f"Game: {ctx.author.display_name} vs. {opponent.display_name} | Bet: {amount:,} Aura | Winner: TIE", "RPS_DUEL")
-                    color = 0x7289da
+                        escrow.refund(bet)
+                        p1new = aura_manager.balance(ctx.author.id)
+                        p2new = aura_manager.balance(opponent.id)
 
-                    winMsg = (f"`Game Tied.`")
-                    balMsg = (f"{ctx.author.mention}> New Balance: `{currentAura}` | {opponent.mention}> New Balance: `{oppAura}`")
+                        winMsg = (f"`Game Tied.`")
+                        balMsg = (f"{ctx.author.mention}> New Balance: `{p1new}` | {opponent.mention}> New Balance: `{p2new}`")
 
                     
             
-                elif winMap[p1c] == p2c:
-                    resultText = (f"{ctx.author.display_name} **WINS**.")
-                    log(f"Game: {ctx.author.display_name} vs. {opponent.display_name} | Bet: {amount:,} Aura | Winner: {ctx.author.display_name}", "RPS_DUEL")
-                    color = 0x6dab18
-                    aura_manager.update_aura(ctx.author.id, amount, ctx.author.display_name)
-                    aura_manager.update_aura(opponent.id, -amount, opponent.display_name)
-                    
-                    # Aura Update
-                    p1new = aura_manager.aura_data.get(str(ctx.author.id), 0)
-                    p2new = aura_manager.aura_data.get(str(opponent.id), 0)
-
-                    #Winstreak Update
-                    p1Streak = aura_manager.updateWinstreak(ctx.author.id, True)
-                    p2Streak = aura_manager.updateWinstreak(opponent.id, False)
+                    elif winMap[p1c] == p2c:
+                        resultText = (f"{ctx.author.display_name} **WINS**.")
+                        log(f"Game: {ctx.author.display_name} vs. {opponent.display_name} | Bet: {amount:,} Aura | Winner: {ctx.author.display_name}", "RPS_DUEL")
+                        color = 0x6dab18
+
+                        # Aura and Winstreak Update, written together
+                        p1Streak = aura_manager.nextWinstreak(ctx.author.id, True)
+                        p2Streak = aura_manager.nextWinstreak(opponent.id, False)
+                        escrow.settle(bet, {ctx.author.id: amount * 2}, {ctx.author.id: p1Streak, opponent.id: p2Streak})
+                        p1new = aura_manager.current().aura_data.get(str(ctx.author.id), 0)
+                        p2new = aura_manager.current().aura_data.get(str(opponent.id), 0)
                     
-                    winMsg = (f"`{ctx.author.display_name} took {amount:,} Aura from {opponent.display_name}`\nStreak: {p1Streak}")
-                    balMsg = (f"{ctx.author.mention}> New Balance: `{p1new}` | {opponent.mention}> New Balance: `{p2new}`")
-                    streakMsg = (f"🔥 {ctx.author.display_name}'s Winstreak: {p1Streak}")
+                        winMsg = (f"`{ctx.author.display_name} took {amount:,} Aura from {opponent.display_name}`\nStreak: {p1Streak}")
+                        balMsg = (f"{ctx.author.mention}> New Balance: `{p1new}` | {opponent.mention}> New Balance: `{p2new}`")
+                        streakMsg = (f"🔥 {ctx.author.display_name}'s Winstreak: {p1Streak}")
 
                 
-                else:
-                    resultText = (f"{opponent.display_name} **WINS**")
-                    log(f"Game: {ctx.author.display_name} vs. {opponent.display_name} | Bet: {amount:,} Aura | Winner: {opponent.display_name}", "RPS_DUEL")
-                    color = 0x992d22
-                    aura_manager.update_aura(ctx.author.id, -amount, ctx.author.display_name)
-                    aura_manager.update_aura(opponent.id, amount, opponent.display_name)
+                    else:
+                        resultText = (f"{opponent.display_name} **WINS**")
+                        log(f"Game: {ctx.author.display_name} vs. {opponent.display_name} | Bet: {amount:,} Aura | Winner: {opponent.display_name}", "RPS_DUEL")
+                        color = 0x992d22
 
-                    # Aura Update
-                    p1new = aura_manager.aura_data.get(str(ctx.author.id), 0)
-                    p2new = aura_manager.aura_data.get(str(opponent.id), 0)
+                        # Aura and Winstreak Update, written together
+                        p2Streak = aura_manager.nextWinstreak(opponent.id, True)
+                        p1Streak = aura_manager.nextWinstreak(ctx.author.id, False)
+                        escrow.settle(bet, {opponent.id: amount * 2}, {opponent.id: p2Streak, ctx.author.id: p1Streak})
+                        p1new = aura_manager.current().aura_data.get(str(ctx.author.id), 0)
+                        p2new = aura_manager.current().aura_data.get(str(opponent.id), 0)
 
-                    #Winstreak Update
-                    p2Streak = aura_manager.updateWinstreak(opponent.id, True)
-                    p1Streak = aura_manager.updateWinstreak(ctx.author.id, False)
+                        winMsg = (f"`{opponent.display_name} took {amount:,} Aura from {ctx.author.display_name}`")
+                        balMsg = (f"{ctx.author.mention}> New Balance: `{p1new:,}` | {opponent.mention}> New Balance: `{p2new:,}`")
+                        streakMsg = (f"🔥 {opponent.display_name}'s Winstreak: {p2Streak}")
 
-                    winMsg = (f"`{opponent.display_name} took {amount:,} Aura from {ctx.author.display_name}`")
-                    balMsg = (f"{ctx.author.mention}> New Balance: `{p1new:,}` | {opponent.mention}> New Balance: `{p2new:,}`")
-                    streakMsg = (f"🔥 {opponent.display_name}'s Winstreak: {p2Streak}")
 
 
-                aura_manager.save_json(aura_manager.AURA_FILE, aura_manager.aura_data)
+                    # Winner Reveal
+                    final = discord.Embed(title=resultText, color=color)
+                    final.add_field(name=ctx.author.display_name, value=f"{emojis[p1c]} {p1c.capitalize()}", inline=True)
+                    final.add_field(name="vs", value="|", inline=True)
+                    final.add_field(name=opponent.display_name, value=f"{emojis[p2c]} {p2c.capitalize()}", inline=True)
 
-                # Winner Reveal
-                final = discord.Embed(title=resultText, color=color)
-                final.add_field(name=ctx.author.display_name, value=f"{emojis[p1c]} {p1c.capitalize()}", inline=True)
-                final.add_field(name="vs", value="|", inline=True)
-                final.add_field(name=opponent.display_name, value=f"{emojis[p2c]} {p2c.capitalize()}", inline=True)
-
-                await msg.edit(embed=final, view=None)
-                await ctx.send(f"{winMsg}")
-                await ctx.send(f"{balMsg}")
-                await ctx.send(f"{streakMsg}")
-
-            else:
-                await msg.edit(content="Duel Timed Out..", embed=None, view=None)
-                log(f"Game: {ctx.author.display_name} vs. {opponent.display_name} | Bet: {amount:,} Aura | Status: Timed Out", "RPS_DUEL")
+                    await msg.edit(embed=final, view=None)
+                    await ctx.send(f"{winMsg}")
+                    await ctx.send(f"{balMsg}")
+                    await ctx.send(f"{streakMsg}")
 
+                else:
+                    escrow.refund(bet)
+                    await msg.edit(content="Duel Timed Out..", embed=None, view=None)
+                    log(f"Game: {ctx.author.display_name} vs. {opponent.display_name} | Bet: {amount:,} Aura | Status: Timed Out", "RPS_DUEL")
 
-        finally:
-            aura_manager.unlockUser(ctx.author.id, name=ctx.author.display_name)
-            aura_manager.unlockUser(opponent.id, name=opponent.display_name)
 
         return
 
@@ -567,33 +566,35 @@ async def rockPaperScissors(ctx, opponent: Optional[discord.Member] = None, amou
         return await ctx.send(f"You Only Have **{currentAura:,}** Aura")
     
     #Lock user
-    aura_manager.lockUser(ctx.author.id, name = ctx.author.display_name)
-    log(f"{ctx.author.display_name} Started RPS game against The House", "RPS")
+    async with (
+        sessions.opened(ctx, "rps", ctx.author.id) as session,
+        aura_manager.locked(ctx.author.id),
+        escrow.held("rps", {ctx.author.id: amount}, bot.user.id) as bet,
+    ):
+        if bet is None:
+            return await ctx.send(f"You Only Have **{aura_manager.balance(ctx.author.id):,}** Aura")
+        session.attach(bet)
+        log(f"{ctx.author.display_name} Started RPS game against The House", "RPS")
 
 
 
-    embed = discord.Embed(title="Rock Paper Scissors", color=0xFFFFFF)
-    embed.add_field(name=f"{ctx.author.display_name}", value="Selecting...", inline=True)
-    embed.add_field(name="vs", value="|", inline=True)
-    embed.add_field(name="The House", value="Thinking...", inline=True)
-    embed.set_footer(text=f"Stake: {amount:,} Aura")
+        embed = discord.Embed(title="Rock Paper Scissors", color=0xFFFFFF)
+        embed.add_field(name=f"{ctx.author.display_name}", value="Selecting...", inline=True)
+        embed.add_field(name="vs", value="|", inline=True)
+        embed.add_field(name="The House", value="Thinking...", inline=True)
+        embed.set_footer(text=f"Stake: {amount:,} Aura")
 
 
-    view = rockPaperScissorsEmbed(ctx.author, amount)
-    msg = await ctx.send(embed=embed, view=view)
+        view = rockPaperScissorsEmbed(ctx.author, amount)
+        msg = await ctx.send(embed=embed, view=view)
+        session.attach(message=msg)
     
-    await view.wait()
-
-
-
-        
+        with tracing.span("wait"):
+            await view.wait()
 
-    try:
         # Timeout Logic
         if view.choice is None:
-            aura_manager.update_aura(ctx.author.id, -amount, ctx.author.display_name)
-            aura_manager.update_aura(bot.user.id, +amount, "The House")
-            aura_manager.save_json(aura_manager.AURA_FILE, aura_manager.aura_data)
+            escrow.forfeit(bet)
             log(f"{ctx.author.display_name} timed out. Lost {amount:,} aura", "RPS")
 
             embed.description = "**Game Cancelled: Timed Out**"
@@ -627,12 +628,10 @@ async def rockPaperScissors(ctx, opponent: Optional[discord.Member] = None, amou
             log(f"{ctx.author.display_name} Lost {amount:,} aura", "RPS")
             change = -amount
             color = 0x992d22
-            aura_manager.update_aura(bot.user.id, +amount, "The House")
 
-        if change != 0:
-            aura_manager.update_aura(ctx.author.id, change, ctx.author.display_name)
+        # The house keeps the stake on a loss
+        escrow.settle(bet, {ctx.author.id: amount + change})
 
-        aura_manager.save_json(aura_manager.AURA_FILE, aura_manager.aura_data)
 
 
         finalEmbed = discord.Embed(title=resultText, color=color)
@@ -648,11 +647,9 @@ async def rockPaperScissors(ctx, opponent: Optional[discord.Member] = None, amou
             inline=True
         )
         
-        newBal = aura_manager.aura_data.get(userID, 0)
+        newBal = aura_manager.current().aura_data.get(userID, 0)
         finalEmbed.set_footer(text=f"Bet: {amount:,}")
 
         await msg.edit(content=None, embed=finalEmbed, view=None)
         await ctx.send(f"{ctx.author.mention} > New Balance: `{newBal:,} Aura`")
 
-    finally:
-        aura_manager.unlockUser(ctx.author.id, name=ctx.author.display_name)
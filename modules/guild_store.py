@@ -0,0 +1,297 @@
+# modules/guild_store.py
+import os
+import sqlite3
+import threading
+from typing import Dict, Any, Iterable
+
+from modules import file_io
+from modules.journal import AuraJournal
+from modules.storage import (
+    JsonBackend,
+    SqliteBackend,
+    migrate_json_to_sqlite,
+    DURABILITY,
+    AURA_TABLE,
+    COUNT_TABLE,
+    WINSTREAK_TABLE,
+    ESCROW_TABLE,
+)
+from modules.utils import log
+
+# Files (inside a guild's partition)
+AURA_FILE: str = "aura.json"
+HISTORY_FILE: str = "auraHistory.json"  # legacy, migrated into HISTORY_DIR
+HISTORY_DIR: str = "history"
+AURACOUNTER_FILE: str = "auraCount.json"
+CONFIG_FILE: str = "config.json"
+WINSTREAK_FILE: str = "winstreaks.json"
+ESCROW_FILE: str = "escrows.json"
+JOURNAL_FILE: str = "auraJournal.jsonl"
+DB_FILE: str = "aura.db"
+
+# Storage backend: "json" (flat files above) or "sqlite" (aura.db)
+STORAGE: str = os.getenv("AURA_STORAGE", "json").lower()
+
+# Write-behind settings
+# FLUSH_INTERVAL  -> seconds between background flushes of dirty tables
+# FLUSH_THRESHOLD -> pending changes (per guild) that force an early flush
+# DURABILITY      -> "fast"   : plain overwrite, flushed on interval/threshold
+#                    "normal" : atomic temp file + rename, flushed on interval/threshold
+#                    "strict" : atomic + fsync, journal fsynced and other tables
+#                               flushed on every change
+# JOURNAL_COMPACT -> journal records that force a snapshot + journal compaction
+# GUILD_IDLE      -> seconds without activity before a guild's partition is
+#                    written out and dropped from memory
+FLUSH_INTERVAL: float = float(os.getenv("AURA_FLUSH_INTERVAL", "5"))
+FLUSH_THRESHOLD: int = int(os.getenv("AURA_FLUSH_THRESHOLD", "500"))
+JOURNAL_COMPACT: int = int(os.getenv("AURA_JOURNAL_COMPACT", "5000"))
+GUILD_IDLE: float = float(os.getenv("AURA_GUILD_IDLE", "1800"))
+
+# Tables whose changes go through the journal (see GuildStore.record())
+JOURNALED_TABLES: tuple[str, ...] = (AURA_TABLE, WINSTREAK_TABLE, ESCROW_TABLE)
+
+
+def json_backend(directory: str) -> JsonBackend:
+    """The flat-file backend over the files of a partition directory."""
+    return JsonBackend(
+        {
+            AURA_TABLE: os.path.join(directory, AURA_FILE),
+            COUNT_TABLE: os.path.join(directory, AURACOUNTER_FILE),
+            WINSTREAK_TABLE: os.path.join(directory, WINSTREAK_FILE),
+            ESCROW_TABLE: os.path.join(directory, ESCROW_FILE),
+        },
+        os.path.join(directory, HISTORY_DIR),
+        os.path.join(directory, HISTORY_FILE),
+    )
+
+
+def open_backend(directory: str):
+    if STORAGE == "sqlite":
+        db_file = os.path.join(directory, DB_FILE)
+        db = SqliteBackend(db_file)
+        if migrate_json_to_sqlite(json_backend(directory), db):
+            log(f"Migrated JSON data into {db_file}", "SUCCESS")
+        return db
+    return json_backend(directory)
+
+
+class GuildTables:
+    """A guild's aura, sender counts, winstreaks and open escrows."""
+
+    def __init__(self, guild_id: int):
+        self.guild_id = guild_id
+        self.aura_data: Dict[str, int] = {}
+        self.user_aura_count: Dict[str, Dict[str, int]] = {}
+        self.winstreakData: Dict[str, int] = {}
+        # escrow_id -> {"game", "stakes": {user_id: amount}, "bank", "time"} (see modules/escrow.py)
+        self.escrows: Dict[str, Dict[str, Any]] = {}
+
+    def apply(
+        self,
+        entries: Dict[str, Any],
+        streaks: Dict[str, int],
+        escrows: Dict[str, Dict[str, Any] | None],
+    ) -> None:
+        """Apply one journal record: {user_id: (delta, balance)}, new streaks and escrow updates."""
+        for uid, (_, balance) in entries.items():
+            self.aura_data[uid] = int(balance)
+        for uid, streak in streaks.items():
+            self.winstreakData[uid] = int(streak)
+        for eid, escrow in escrows.items():
+            if escrow is None:
+                self.escrows.pop(eid, None)
+            else:
+                self.escrows[eid] = escrow
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "aura": self.aura_data,
+            "counts": self.user_aura_count,
+            "winstreaks": self.winstreakData,
+            "escrows": self.escrows,
+        }
+
+
+class GuildStore(GuildTables):
+    """
+    A guild's tables as kept on disk: loaded from the backend, every change
+    journaled first, and written behind by flush() on the I/O thread. Used
+    by the bot directly, or by the ledger process for every shard (see
+    modules/ledger.py).
+    """
+
+    def __init__(self, guild_id: int, directory: str):
+        super().__init__(guild_id)
+        self.directory = directory
+        # table -> keys changed since the last flush. The I/O thread puts the
+        # keys of failed writes back, so every access holds dirty_lock.
+        self.dirty: Dict[str, set[str]] = {}
+        self.dirty_lock = threading.Lock()
+        self.pending: int = 0
+        # Opened (and migrated) behind any writes an unloaded store of this guild still has queued
+        self.backend = file_io.call(open_backend, directory)
+        # Every aura, winstreak and escrow change is appended here before it is
+        # applied in memory. The snapshots written by flush() make the journal
+        # redundant, so it is rotated by each flush and discarded once they are on disk.
+        self.journal = AuraJournal(os.path.join(directory, JOURNAL_FILE), fsync=DURABILITY == "strict")
+
+    # ---- Loading ----
+    def load(self) -> None:
+        """
+        Load every table, replay the journal over them and mark today in history.
+        Runs on the I/O thread behind every queued write, so a store reloaded
+        right after the guild was unloaded reads what the old one flushed last
+        (and not journal segments that flush is about to discard).
+        """
+        file_io.call(self._load)
+
+    def _load(self) -> None:
+        """Runs on the I/O thread."""
+        self.aura_data = {k: int(v) for k, v in self.backend.load(AURA_TABLE).items()}  # coerce to int
+        self.winstreakData = {k: int(v) for k, v in self.backend.load(WINSTREAK_TABLE).items()}
+        self.escrows = dict(self.backend.load(ESCROW_TABLE))
+        self.user_aura_count = {
+            k: {"POS": int(v.get("POS", 0)), "NEG": int(v.get("NEG", 0))}
+            for k, v in self.backend.load(COUNT_TABLE).items()
+        }
+        self.replay_journal()
+        self.ensure_today()
+
+    def replay_journal(self) -> None:
+        """
+        Re-apply journal records newer than the last snapshot (after a crash or
+        a kill before the final flush), then compact.
+        """
+        replayed: Dict[str, set[str]] = {AURA_TABLE: set(), WINSTREAK_TABLE: set(), ESCROW_TABLE: set()}
+        records: int = 0
+        for record in self.journal.replay():
+            streaks, escrows = record.get("w", {}), record.get("e", {})
+            self.apply(record["a"], streaks, escrows)
+            replayed[AURA_TABLE].update(record["a"])
+            replayed[WINSTREAK_TABLE].update(streaks)
+            replayed[ESCROW_TABLE].update(escrows)
+            records += 1
+        if records:
+            log(
+                f"Replayed {records} journal records for {len(replayed[AURA_TABLE])} users of guild {self.guild_id}",
+                "WARNING",
+            )
+            self.mark_dirty({table: keys for table, keys in replayed.items() if keys})
+            self.flush()
+
+    # ---- Changes ----
+    def record(
+        self,
+        reason: str,
+        entries: Dict[str, tuple[int, int]],
+        streaks: Dict[str, int],
+        escrows: Dict[str, Dict[str, Any] | None],
+    ) -> None:
+        """Journal one change, apply it and queue it for the next flush."""
+        self.journal.append(reason, entries, streaks, escrows)
+        self.apply(entries, streaks, escrows)
+        self.mark_dirty({
+            table: keys
+            for table, keys in ((AURA_TABLE, entries), (WINSTREAK_TABLE, streaks), (ESCROW_TABLE, escrows))
+            if keys
+        })
+
+    def counts_changed(self, *sender_ids: str) -> None:
+        """Queue the sender counters for the next flush."""
+        self.mark_dirty({COUNT_TABLE: sender_ids})
+
+    def mark_dirty(self, tables: Dict[str, Iterable[str]]) -> None:
+        """
+        Record that rows changed in memory. The write happens later from the
+        flush loop, once FLUSH_THRESHOLD changes pile up, or right away in
+        "strict" durability (journaled tables are already safe by then).
+        All tables are marked before any flush, so a flush never writes half
+        of a change.
+        """
+        with self.dirty_lock:
+            for table, keys in tables.items():
+                self.dirty.setdefault(table, set()).update(keys)
+                self.pending += 1
+        if (
+            (DURABILITY == "strict" and any(t not in JOURNALED_TABLES for t in tables))
+            or self.pending >= FLUSH_THRESHOLD
+            or self.journal.entries >= JOURNAL_COMPACT
+        ):
+            self.flush()
+
+    # ---- Write-behind ----
+    def snapshot(self, table: str) -> Dict[str, Any]:
+        """Return a copy of the in-memory dict behind a table, safe to hand to the writer thread."""
+        if table == AURA_TABLE:
+            return dict(self.aura_data)
+        if table == COUNT_TABLE:
+            return {k: dict(v) for k, v in self.user_aura_count.items()}
+        if table == WINSTREAK_TABLE:
+            return dict(self.winstreakData)
+        if table == ESCROW_TABLE:
+            return {k: dict(v) for k, v in self.escrows.items()}
+        raise ValueError(f"{table} is not a write-behind table")
+
+    def flush(self) -> None:
+        """
+        Queue the dirty tables on the I/O thread as one job, coalescing all
+        pending changes. Only the copy of the data is made on the caller's thread.
+        """
+        self.pending = 0
+        with self.dirty_lock:
+            dirty, self.dirty = self.dirty, {}
+        if not dirty:
+            return
+        journaled = any(table in JOURNALED_TABLES for table in dirty)
+        segments: list[str] = self.journal.rotate() if journaled else []
+        writes = [(table, self.snapshot(table), keys) for table, keys in dirty.items()]
+        file_io.submit(self._write_tables, writes, segments)
+
+    def _write_tables(self, writes: list[tuple[str, Dict[str, Any], set[str]]], segments: list[str]) -> None:
+        """Runs on the I/O thread."""
+        failed = False
+        for table, data, keys in writes:
+            try:
+                self.backend.save(table, data, keys)
+            except (OSError, sqlite3.Error) as e:
+                # Retry on the next flush; journal segments stay until every snapshot lands
+                with self.dirty_lock:
+                    self.dirty.setdefault(table, set()).update(keys)
+                log(f"Failed to flush {table} of guild {self.guild_id}: {e}", "ERROR")
+                failed = True
+        if not failed:
+            # Snapshots are on disk, the journal records they cover are no longer needed
+            AuraJournal.discard(segments)
+
+    def close(self) -> None:
+        """Flush, then close the journal and backend behind the queued writes."""
+        self.flush()
+        file_io.submit(self._close)
+
+    def _close(self) -> None:
+        """Runs on the I/O thread."""
+        self.journal.close()
+        self.backend.close()
+
+    # ---- History ----
+    def recent_history(self, days: int) -> list[tuple[str, Dict[str, Any]]]:
+        """
+        Return the last `days` snapshots as (day, {"time": ..., "aura": {...}}),
+        oldest first. Only those days are rebuilt, not the whole history.
+        Reads the backend, so call it from the I/O thread.
+        """
+        recent: list[str] = self.backend.history_days(snapshots_only=True)[-days:]
+        return [(day, self.backend.load_history_day(day)) for day in recent]
+
+    def save_history_day(self, day: str, snapshot: Dict[str, Any]) -> None:
+        """Queue one day of history ({"time": ..., "aura": {...}}) on the I/O thread."""
+        file_io.submit(self.backend.save_history_day, day, snapshot)
+
+    def ensure_today(self) -> None:
+        """Ensure today's key exists in history (YYYY-MM-DD)."""
+        from datetime import date
+
+        today: str = date.today().strftime("%Y-%m-%d")
+        if today not in file_io.call(self.backend.history_days):
+            self.save_history_day(today, {})
+            log(f"Added today's date to history of guild {self.guild_id}", "WARNING")
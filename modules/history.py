@@ -0,0 +1,131 @@
+# modules/history.py
+import os
+import threading
+from typing import Dict, Any
+
+from modules.utils import log
+from modules.storage import load_json, save_json
+
+# A full copy of every user's aura is written at least this often (in days)
+KEYFRAME_INTERVAL: int = int(os.getenv("AURA_HISTORY_KEYFRAME", "7"))
+
+# Segment kinds, encoded in the file name: YYYY-MM-DD.<kind>.json
+KEYFRAME: str = "key"    # every user's aura
+DELTA: str = "delta"     # only users whose aura changed since the previous snapshot
+MARKER: str = "mark"     # day marked by ensure_today(), no snapshot yet
+
+
+class SegmentedHistory:
+    """
+    Daily aura snapshots stored as one small file per day in data/history/,
+    each holding {"time": "HH-MM-SS", "aura": {user_id: aura}}.
+
+    A day's full state is rebuilt from the nearest keyframe at or before it
+    plus the deltas after it, so snapshot cost and disk usage follow daily
+    activity instead of days x users. The kind of every segment is in its
+    file name, so listing the directory is enough to plan a rebuild.
+    """
+
+    def __init__(self, directory: str, legacy_file: str | None = None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index: Dict[str, str] | None = None
+        # (day, full state) of the most recently rebuilt/saved day
+        self._cache: tuple[str, Dict[str, int]] | None = None
+        if legacy_file and os.path.exists(legacy_file) and not self.days():
+            self._migrate(legacy_file)
+
+    # ---- Listing ----
+    def _path(self, day: str, kind: str) -> str:
+        return os.path.join(self.directory, f"{day}.{kind}.json")
+
+    def _kinds(self) -> Dict[str, str]:
+        """day -> segment kind, read from the directory once and kept up to date."""
+        if self._index is None:
+            self._index = {}
+            for name in os.listdir(self.directory):
+                parts = name.split(".")
+                if len(parts) == 3 and parts[2] == "json":
+                    self._index[parts[0]] = parts[1]
+        return self._index
+
+    def days(self, snapshots_only: bool = False) -> list[str]:
+        """Sorted list of stored days, optionally skipping unsnapshotted markers."""
+        return sorted(
+            day for day, kind in self._kinds().items() if not snapshots_only or kind != MARKER
+        )
+
+    # ---- Reading ----
+    def load_day(self, day: str) -> Dict[str, Any]:
+        """Return {"time": ..., "aura": full state} for a day ({} if no snapshot)."""
+        with self._lock:
+            kind = self._kinds().get(day)
+            if kind in (None, MARKER):
+                return {}
+            time = load_json(self._path(day, kind)).get("time")
+            return {"time": time, "aura": dict(self._state(day))}
+
+    def _state(self, day: str) -> Dict[str, int]:
+        """Full aura state as of `day` (inclusive)."""
+        if self._cache and self._cache[0] == day:
+            return self._cache[1]
+
+        kinds = self._kinds()
+        chain: list[str] = []
+        for d in reversed([d for d in self.days(snapshots_only=True) if d <= day]):
+            chain.append(d)
+            if kinds[d] == KEYFRAME:
+                break
+
+        state: Dict[str, int] = {}
+        for d in reversed(chain):
+            segment = load_json(self._path(d, kinds[d]))
+            state.update({k: int(v) for k, v in segment.get("aura", {}).items()})
+        self._cache = (day, state)
+        return state
+
+    # ---- Writing ----
+    def save_day(self, day: str, snapshot: Dict[str, Any]) -> None:
+        """
+        Store a day. `snapshot` is {"time": ..., "aura": full state}, or {} to
+        only mark the day.
+        """
+        with self._lock:
+            kinds = self._kinds()
+            if not snapshot:
+                if day not in kinds:
+                    save_json(self._path(day, MARKER), {"time": None, "aura": {}})
+                    kinds[day] = MARKER
+                return
+
+            earlier = [d for d in self.days(snapshots_only=True) if d < day]
+            since_keyframe = 0
+            for d in reversed(earlier):
+                if kinds[d] == KEYFRAME:
+                    break
+                since_keyframe += 1
+            kind = KEYFRAME if not earlier or since_keyframe + 1 >= KEYFRAME_INTERVAL else DELTA
+
+            aura = {k: int(v) for k, v in snapshot["aura"].items()}
+            if kind == KEYFRAME:
+                stored = aura
+            else:
+                previous = self._state(earlier[-1])
+                stored = {k: v for k, v in aura.items() if previous.get(k) != v}
+
+            save_json(self._path(day, kind), {"time": snapshot["time"], "aura": stored})
+            old_kind = kinds.get(day)
+            if old_kind and old_kind != kind:
+                os.remove(self._path(day, old_kind))
+            kinds[day] = kind
+            self._cache = (day, aura)
+            log(f"History for {day} saved ({kind}, {len(stored)} users)", "SNAPSHOT")
+
+    # ---- Migration ----
+    def _migrate(self, legacy_file: str) -> None:
+        """Split the old monolithic auraHistory.json into daily segments."""
+        history = load_json(legacy_file)
+        for day in sorted(history):
+            self.save_day(day, history[day])
+        log(f"Migrated {len(history)} days from {legacy_file} into {self.directory}", "SUCCESS")
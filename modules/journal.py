@@ -0,0 +1,111 @@
+# modules/journal.py
+import glob
+import json
+import os
+import time
+from typing import Dict, Any, Iterator
+
+from modules.utils import log
+
+
+class AuraJournal:
+    """
+    Append-only JSONL log of aura changes.
+
+    Each line is one mutation:
+        {"t": unix_time, "r": reason, "a": {user_id: [delta, new_balance], ...}}
+
+    Changes made together with aura are part of the same line, so they are
+    applied all or nothing:
+        "w": {user_id: new_winstreak, ...}
+        "e": {escrow_id: open escrow, or null once it is settled, ...}
+
+    Records carry the resulting values, so replaying a line that is already
+    part of the last snapshot just sets the same value again. That keeps
+    recovery correct even if the bot dies between writing a snapshot and
+    discarding the journal.
+
+    Compaction happens in two steps so snapshots can be written off the
+    event loop: rotate() moves the live file aside as a numbered segment
+    (new records go to a fresh file), and discard() deletes those segments
+    once the snapshot that covers them is on disk.
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self.entries = 0
+        self._fd: int = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def append(
+        self,
+        reason: str,
+        changes: Dict[str, tuple[int, int]],
+        streaks: Dict[str, int] | None = None,
+        escrows: Dict[str, Dict[str, Any] | None] | None = None,
+    ) -> None:
+        """Append one record. Cost is the size of the record, not of the data."""
+        record: Dict[str, Any] = {"t": round(time.time(), 3), "r": reason, "a": changes}
+        if streaks:
+            record["w"] = streaks
+        if escrows:
+            record["e"] = escrows
+        os.write(self._fd, (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8"))
+        if self.fsync:
+            os.fsync(self._fd)
+        self.entries += 1
+
+    def segments(self) -> list[str]:
+        """Rotated segments not yet covered by a snapshot, oldest first."""
+        found = []
+        for path in glob.glob(f"{glob.escape(self.path)}.*"):
+            suffix = path.rsplit(".", 1)[1]
+            if suffix.isdigit():
+                found.append((int(suffix), path))
+        return [path for _, path in sorted(found)]
+
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        """Yield every intact record in order. A torn last line is skipped."""
+        for path in self.segments() + [self.path]:
+            yield from self._read(path)
+
+    def _read(self, path: str) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f, start=1):
+                if not line.endswith("\n"):
+                    log(f"Ignoring incomplete record at {path}:{number}", "WARNING")
+                    break
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    log(f"Ignoring corrupt record at {path}:{number}", "WARNING")
+
+    def rotate(self) -> list[str]:
+        """
+        Move the live journal aside and start a fresh one. Returns every
+        segment a snapshot taken right now would cover.
+        """
+        segments = self.segments()
+        os.close(self._fd)
+        if os.path.getsize(self.path):
+            last = int(segments[-1].rsplit(".", 1)[1]) if segments else 0
+            rotated = f"{self.path}.{last + 1}"
+            os.replace(self.path, rotated)
+            segments.append(rotated)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.entries = 0
+        return segments
+
+    @staticmethod
+    def discard(segments: list[str]) -> None:
+        """Delete segments whose records are now part of a snapshot."""
+        for path in segments:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def close(self) -> None:
+        os.close(self._fd)
@@ -0,0 +1,150 @@
+# modules/leaderboards.py
+from typing import Callable
+
+from discord.ext import commands
+
+from modules import aura_manager, pages
+from modules.bot_setup import bot
+from modules.rank_index import RankIndex
+from modules.ui import leaderboardEmbed
+from modules.utils import log
+
+
+class Metric:
+    """
+    One leaderboard: where its scores live and how it is shown.
+    `index` is called on every request so it always sees the live RankIndex.
+    """
+
+    __slots__ = ("name", "index", "formatRow", "title", "description", "color", "empty", "excludeBot")
+
+    def __init__(
+        self,
+        name: str,
+        index: Callable[[], RankIndex],
+        formatRow: Callable[[int, str, int], str],
+        title: str,
+        description: str,
+        color: int,
+        empty: str,
+        excludeBot: bool = False,
+    ):
+        self.name = name
+        self.index = index
+        self.formatRow = formatRow
+        self.title = title
+        self.description = description
+        self.color = color
+        self.empty = empty
+        self.excludeBot = excludeBot
+
+
+# metric name -> Metric
+METRICS: dict[str, Metric] = {}
+
+
+def register(name: str, **options) -> Metric:
+    """Declare a leaderboard. See Metric for the options."""
+    metric = Metric(name, **options)
+    METRICS[name] = metric
+    return metric
+
+
+def snapshot(name: str) -> pages.LeaderboardSnapshot:
+    """Shared, versioned snapshot of a metric (rebuilt only after it changes)."""
+    metric = METRICS[name]
+    exclude = str(bot.user.id) if metric.excludeBot and bot.user else None
+    guild_id = aura_manager.current().guild_id
+    return pages.get_snapshot(guild_id, name, metric.index(), metric.formatRow, exclude=exclude)
+
+
+async def show(ctx: commands.Context, name: str, page: int = 1) -> None:
+    """Common body of every leaderboard command."""
+    # Check if user is in a game
+    if aura_manager.isBusy(ctx.author.id):
+        return await ctx.send(f"Finish your current game first!")
+
+    metric = METRICS[name]
+    board = snapshot(name)
+    if not board.total:
+        return await ctx.send(metric.empty)
+
+    view = leaderboardEmbed(
+        data=board,
+        title=metric.title,
+        description=metric.description,
+        color=metric.color,
+    )
+
+    # Handle starting page logic
+    target_page = page - 1
+    if target_page < 0 or target_page > view.end:
+        return await ctx.send(f"Invalid page! Choose a page between `1` and `{view.end + 1}`.")
+
+    view.currentPage = target_page
+    await ctx.send(embed=view.createEmbed(), view=view)
+    log(f"{metric.title} page {page} requested by {ctx.author}", "INFO")
+
+
+# ---- Row formatters (rank, user_id, score) -> line ----
+def formatAuraRow(rank: int, uid: str, score: int) -> str:
+    prefix = {1: "🥇", 2: "🥈", 3: "🥉"}.get(rank, str(rank))
+    return f"{prefix}> <@{uid}> \n\u2003Aura: {score:,}\n"
+
+
+def formatPosRow(rank: int, uid: str, pos_count: int) -> str:
+    emoji = {1: "👑", 2: "💎", 3: "🌸"}.get(rank, str(rank))
+    return f"{emoji} > <@{uid}>\n\u2003Positive Aura Given: {pos_count}\n"
+
+
+def formatNegRow(rank: int, uid: str, neg_count: int) -> str:
+    emoji = {1: "🍆", 2: "🚴", 3: "🤸"}.get(rank, str(rank))
+    return f"{emoji} > <@{uid}>\n\u2003Negative Aura Given: {neg_count}\n"
+
+
+def formatStreakRow(rank: int, uid: str, streak: int) -> str:
+    emoji = {1: "🔥", 2: "⚡", 3: "✨"}.get(rank, str(rank))
+    return f"{emoji} > <@{uid}>\n\u2003Winstreak: {streak}\n"
+
+
+# ---- Registered leaderboards ----
+# Per-game stats aren't recorded anywhere yet (games only move aura and the
+# rps winstreak), so there is no per-game board; registering one only needs
+# a RankIndex of the stat on the guild state.
+register(
+    "aura",
+    index=lambda: aura_manager.current().aura_rank,
+    formatRow=formatAuraRow,
+    title="Aura Leaderboard",
+    description="Leaderboard for people with the most aura",
+    color=0x6DAB18,
+    empty="No Data for Leaderboard Yet...",
+    excludeBot=True,
+)
+register(
+    "pos",
+    index=lambda: aura_manager.current().pos_rank,
+    formatRow=formatPosRow,
+    title="Simp Leaderboard",
+    description="Leaderboard for people who hand out +aura like candy",
+    color=0xFD87E2,
+    empty="Nobody has given positive aura yet...",
+)
+register(
+    "neg",
+    index=lambda: aura_manager.current().neg_rank,
+    formatRow=formatNegRow,
+    title="Leaderboard of Dicksuck",
+    description="Leaderboard for people who need to lay off the -aura button",
+    color=0xEBF527,
+    empty="Nobody has given negative aura yet...",
+)
+register(
+    "streak",
+    index=lambda: aura_manager.current().streak_rank,
+    formatRow=formatStreakRow,
+    title="Winstreak Leaderboard",
+    description="Leaderboard for the longest current rps winstreaks",
+    color=0xFF7A1A,
+    empty="Nobody is on a winstreak right now...",
+)
@@ -0,0 +1,379 @@
+# modules/ledger.py
+# The ledger: one process that owns every guild's tables (aura, sender
+# counts, winstreaks, escrows) and history on disk, shared by the bot
+# processes started by launcher.py. Each guild belongs to one shard, so a bot
+# process keeps its guilds' tables in memory for reads and sends every change
+# here, where it is journaled and written behind as in a single process
+# (see modules/guild_store.py).
+#
+# Wire format: one JSON list of requests per line. Changes made during one
+# event loop tick go out as one batch. Requests with an "id" are answered
+# with a line [{"id", "result"} or {"id", "error"}, ...]. Changes carry the
+# resulting values, like journal records, so resending a batch is harmless.
+import asyncio
+import itertools
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Any, Dict
+
+from modules import file_io, tracing
+from modules.aura_manager import GUILDS_DIR
+from modules.guild_store import GuildStore, GuildTables, FLUSH_INTERVAL, GUILD_IDLE
+from modules.utils import log
+
+# Address of the ledger: "unix:<path>" or "<host>:<port>"
+ADDRESS: str = os.getenv("AURA_LEDGER", "unix:" + os.path.join("data", "ledger.sock"))
+
+# Longest line (one batch) the ledger reads
+MAX_LINE: int = 64 * 2**20
+
+
+class LedgerError(RuntimeError):
+    """The ledger refused or failed a request."""
+
+
+# ---- Ledger side ----
+class LedgerService:
+    """Handles batches of requests against the GuildStores of this process."""
+
+    def __init__(self):
+        # guild_id -> store, loaded on first request
+        self.stores: Dict[int, GuildStore] = {}
+        self.last_used: Dict[int, float] = {}
+        self.stats: Dict[str, int] = {"batches": 0, "requests": 0}
+
+    def store(self, guild_id: int) -> GuildStore:
+        guild_id = int(guild_id)
+        store = self.stores.get(guild_id)
+        if store is None:
+            directory = os.path.join(GUILDS_DIR, str(guild_id))
+            os.makedirs(directory, exist_ok=True)
+            store = GuildStore(guild_id, directory)
+            store.load()
+            self.stores[guild_id] = store
+            log(f"Ledger loaded guild {guild_id} ({len(self.stores)} in memory)", "SUCCESS")
+        self.last_used[guild_id] = time.monotonic()
+        return store
+
+    def handle(self, batch: list[Dict[str, Any]]) -> list[Dict[str, Any]]:
+        """Run a batch in order. Returns the answers to requests that carry an id."""
+        answers = []
+        for request in batch:
+            try:
+                result = self.run(request)
+                if "id" in request:
+                    answers.append({"id": request["id"], "result": result})
+            except Exception as e:
+                log(f"Ledger request {request.get('op')} failed: {e}", "ERROR")
+                if "id" in request:
+                    answers.append({"id": request["id"], "error": str(e)})
+        self.stats["batches"] += 1
+        self.stats["requests"] += len(batch)
+        return answers
+
+    def run(self, request: Dict[str, Any]) -> Any:
+        op = request["op"]
+        store = self.store(request["guild"])
+        if op == "load":
+            return store.to_dict()
+        if op == "record":
+            entries = {uid: tuple(entry) for uid, entry in request["a"].items()}
+            store.record(request["r"], entries, request.get("w", {}), request.get("e", {}))
+        elif op == "counts":
+            store.user_aura_count.update(request["counts"])
+            store.counts_changed(*request["counts"])
+        elif op == "history":
+            # Read where the snapshots are written, after any still queued
+            return file_io.call(store.recent_history, request["days"])
+        elif op == "snapshot":
+            store.save_history_day(request["day"], request["data"])
+        else:
+            raise LedgerError(f"Unknown ledger request {op!r}")
+        return None
+
+    def flush(self) -> None:
+        for store in self.stores.values():
+            store.flush()
+
+    def evict_idle(self) -> None:
+        """Write out and drop stores no shard has used for GUILD_IDLE seconds."""
+        cutoff = time.monotonic() - GUILD_IDLE
+        for guild_id, used in list(self.last_used.items()):
+            if used < cutoff:
+                self.stores.pop(guild_id).close()
+                del self.last_used[guild_id]
+
+
+async def serve(address: str = ADDRESS) -> None:
+    """Run the ledger until cancelled, then write everything out."""
+    service = LedgerService()
+
+    async def connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                answers = service.handle(json.loads(line))
+                if answers:
+                    writer.write(json.dumps(answers, separators=(",", ":")).encode("utf-8") + b"\n")
+                    await writer.drain()
+        except (ConnectionError, json.JSONDecodeError) as e:
+            log(f"Ledger connection dropped: {e}", "WARNING")
+        finally:
+            writer.close()
+
+    kind, target = _parse(address)
+    if kind == "unix":
+        if os.path.exists(target):
+            os.remove(target)
+        server = await asyncio.start_unix_server(connection, target, limit=MAX_LINE)
+    else:
+        server = await asyncio.start_server(connection, *target, limit=MAX_LINE)
+    log(f"Ledger listening on {address}", "SUCCESS")
+
+    try:
+        async with server:
+            while True:
+                await asyncio.sleep(FLUSH_INTERVAL)
+                service.flush()
+                service.evict_idle()
+    finally:
+        service.flush()
+        log(f"Ledger stopped after {service.stats['batches']} batches", "SUCCESS")
+
+
+# ---- Bot side ----
+class RemoteStore(GuildTables):
+    """
+    GuildStore stand-in for a bot process: the tables stay in memory for
+    reads and every change is sent to the ledger.
+    """
+
+    def __init__(self, ledger: "LedgerClient | InProcessLedger", guild_id: int):
+        super().__init__(guild_id)
+        self.ledger = ledger
+
+    def load(self) -> None:
+        # Fetched off the event loop beforehand if the guild was preloaded (see aura_manager.preload())
+        data = self.ledger.prefetched.pop(self.guild_id, None)
+        if data is None:
+            data = self.ledger.request("load", self.guild_id)
+        self.aura_data = {k: int(v) for k, v in data["aura"].items()}
+        self.user_aura_count = data["counts"]
+        self.winstreakData = {k: int(v) for k, v in data["winstreaks"].items()}
+        self.escrows = data["escrows"]
+
+    def record(self, reason: str, entries, streaks, escrows) -> None:
+        self.apply(entries, streaks, escrows)
+        self.ledger.send("record", self.guild_id, r=reason, a=entries, w=streaks, e=escrows)
+
+    def counts_changed(self, *sender_ids: str) -> None:
+        counts = {sid: dict(self.user_aura_count[sid]) for sid in sender_ids}
+        self.ledger.send("counts", self.guild_id, counts=counts)
+
+    def flush(self) -> None:
+        """Changes are already on their way (see LedgerClient.flush())."""
+
+    def close(self) -> None:
+        """The ledger unloads the guild itself once it goes idle."""
+
+    def recent_history(self, days: int) -> list[tuple[str, Dict[str, Any]]]:
+        return [tuple(day) for day in self.ledger.request("history", self.guild_id, days=days)]
+
+    def save_history_day(self, day: str, snapshot: Dict[str, Any]) -> None:
+        self.ledger.send("snapshot", self.guild_id, day=day, data=snapshot)
+
+
+class LedgerClient:
+    """
+    A bot process's connection to the ledger. send() queues a change for the
+    batch sent at the end of the current loop tick; request() sends the
+    queued batch plus the request and waits for its answer, at most
+    `timeout` seconds. Safe to use from the I/O thread too, which is where
+    aura_manager.preload() sends loads so the event loop doesn't wait on them.
+    """
+
+    def __init__(self, address: str = ADDRESS, timeout: float = 10.0):
+        self.address = address
+        self.timeout = timeout
+        # guild_id -> "load" answer fetched by aura_manager.preload(), used by the next RemoteStore.load()
+        self.prefetched: Dict[int, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self._queue: list[Dict[str, Any]] = []
+        self._queue_lock = threading.Lock()
+        # Held while a batch is written and its answer read
+        self._io_lock = threading.Lock()
+        self._scheduled: bool = False
+        self._sock: socket.socket | None = None
+        self._reader = None
+        self._connect()
+
+    def store(self, guild_id: int) -> RemoteStore:
+        return RemoteStore(self, guild_id)
+
+    def _connect(self) -> None:
+        kind, target = _parse(self.address)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if kind == "unix":
+                    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                else:
+                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                # Also bounds every send and answer, so a hung ledger surfaces as a LedgerError
+                sock.settimeout(self.timeout)
+                sock.connect(target)
+                break
+            except OSError as e:
+                sock.close()
+                if time.monotonic() > deadline:
+                    raise LedgerError(f"Can't reach the ledger at {self.address}: {e}") from e
+                time.sleep(0.2)
+        self._sock = sock
+        self._reader = sock.makefile("rb")
+        log(f"Connected to the ledger at {self.address}", "SUCCESS")
+
+    def send(self, op: str, guild_id: int, **fields) -> None:
+        """Queue a change; it goes out with this loop tick's batch."""
+        with self._queue_lock:
+            self._queue.append({"op": op, "guild": guild_id, **fields})
+            if self._scheduled:
+                return
+            self._scheduled = True
+        try:
+            asyncio.get_running_loop().call_soon(self._send_soon)
+        except RuntimeError:
+            # No event loop (startup, shutdown, the I/O thread): send right away
+            self.flush()
+
+    def _send_soon(self) -> None:
+        # Never block the event loop behind a request from another thread;
+        # that request sends the queue before its own line anyway
+        if not self._io_lock.acquire(blocking=False):
+            asyncio.get_running_loop().call_later(0.005, self._send_soon)
+            return
+        try:
+            self._write_queue()
+        finally:
+            self._io_lock.release()
+
+    def flush(self) -> None:
+        """Send everything queued now."""
+        with self._io_lock:
+            self._write_queue()
+
+    def request(self, op: str, guild_id: int, **fields) -> Any:
+        """Send a request (after everything queued before it) and wait for the answer."""
+        request_id = next(self._ids)
+        with self._queue_lock:
+            self._queue.append({"op": op, "guild": guild_id, "id": request_id, **fields})
+        with tracing.span("io"), self._io_lock:
+            self._write_queue()
+            try:
+                line = self._reader.readline()
+            except OSError as e:
+                # A late answer would be read as the next request's; start over on a new connection
+                self._disconnect()
+                raise LedgerError(f"No answer from the ledger at {self.address} to {op!r}: {e}") from e
+        if not line:
+            self._disconnect()
+            raise LedgerError("The ledger closed the connection")
+        for answer in json.loads(line):
+            if answer["id"] == request_id:
+                if "error" in answer:
+                    raise LedgerError(answer["error"])
+                return answer["result"]
+        raise LedgerError(f"No answer to ledger request {op!r}")
+
+    def _write_queue(self) -> None:
+        """Caller holds _io_lock."""
+        with self._queue_lock:
+            batch, self._queue = self._queue, []
+            self._scheduled = False
+        if not batch:
+            return
+        line = json.dumps(batch, separators=(",", ":")).encode("utf-8") + b"\n"
+        try:
+            if self._sock is None:
+                self._connect()
+            self._sock.sendall(line)
+        except OSError as e:
+            # Batches only hold resulting values, so resending one is harmless
+            log(f"Lost the ledger connection ({e}), reconnecting", "ERROR")
+            self._disconnect()
+            self._connect()
+            self._sock.sendall(line)
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+            self._sock = self._reader = None
+
+    def close(self) -> None:
+        self.flush()
+        self._disconnect()
+
+
+class InProcessLedger:
+    """
+    The ledger without the extra process, for tests: the same calls as
+    LedgerClient, handled right away by a LedgerService in this process.
+    Requests still go through JSON, so anything that wouldn't survive the
+    socket fails here too.
+    """
+
+    def __init__(self):
+        self.service = LedgerService()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.prefetched: Dict[int, Dict[str, Any]] = {}
+
+    def store(self, guild_id: int) -> RemoteStore:
+        return RemoteStore(self, guild_id)
+
+    def send(self, op: str, guild_id: int, **fields) -> None:
+        self._handle({"op": op, "guild": guild_id, **fields})
+
+    def request(self, op: str, guild_id: int, **fields) -> Any:
+        (answer,) = self._handle({"op": op, "guild": guild_id, "id": next(self._ids), **fields})
+        if "error" in answer:
+            raise LedgerError(answer["error"])
+        return answer["result"]
+
+    def flush(self) -> None:
+        """Nothing is queued."""
+
+    def _handle(self, request: Dict[str, Any]) -> list[Dict[str, Any]]:
+        with self._lock:
+            return json.loads(json.dumps(self.service.handle([json.loads(json.dumps(request))])))
+
+    def close(self) -> None:
+        self.service.flush()
+
+
+def _parse(address: str) -> tuple[str, Any]:
+    """("unix", path) or ("tcp", (host, port))."""
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+if __name__ == "__main__":
+    # python -m modules.ledger [address]   (started by launcher.py)
+    address = sys.argv[1] if len(sys.argv) > 1 else ADDRESS
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(serve(address))
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, task.cancel)
+    try:
+        loop.run_until_complete(task)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        file_io.drain()
+        loop.close()
@@ -0,0 +1,88 @@
+# modules/memory.py
+import os
+import sys
+from itertools import islice
+from typing import Any, Iterable
+
+from modules import aura_manager, reactions, user_directory
+
+# Items measured per cache; the total is extrapolated from them
+SAMPLE: int = 64
+
+
+def rss_bytes() -> int:
+    """Resident memory of this process (peak RSS where /proc isn't available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _sizeof(obj: Any, depth: int = 2) -> int:
+    """Size of an object plus its direct contents (slots, items), `depth` levels down."""
+    size = sys.getsizeof(obj)
+    if depth <= 0 or isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        return size + sum(_sizeof(k, depth - 1) + _sizeof(v, depth - 1) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(_sizeof(item, depth - 1) for item in obj)
+    for name in getattr(type(obj), "__slots__", ()):
+        size += _sizeof(getattr(obj, name, None), depth - 1)
+    return size
+
+
+def estimate(items: Iterable[Any], count: int, container: Any = None) -> int:
+    """Approximate bytes held by `count` items, measured on the first SAMPLE of them."""
+    sample = list(islice(items, SAMPLE))
+    base = sys.getsizeof(container) if container is not None else 0
+    if not sample:
+        return base
+    return base + sum(_sizeof(item) for item in sample) * count // len(sample)
+
+
+def cache_report(bot) -> list[tuple[str, int, int]]:
+    """(cache name, entries, approximate bytes) for discord.py's caches and ours."""
+    state = bot._connection
+    members = [m for guild in bot.guilds for m in guild._members.values()]
+    rows = [
+        ("users", len(state._users), estimate(state._users.values(), len(state._users), state._users)),
+        ("members", len(members), estimate(members, len(members))),
+        ("messages", len(bot.cached_messages), estimate(bot.cached_messages, len(bot.cached_messages))),
+        ("emojis", len(bot.emojis), estimate(bot.emojis, len(bot.emojis))),
+    ]
+    # Guild data, summed over the partitions loaded right now
+    partitions = list(aura_manager.partitions.values())
+    rows.append(("guild partitions", len(partitions), estimate(partitions, len(partitions))))
+    for name, attr in (("aura", "aura_data"), ("aura counts", "user_aura_count"), ("winstreaks", "winstreakData")):
+        tables = [getattr(p, attr) for p in partitions]
+        rows.append((
+            name,
+            sum(len(t) for t in tables),
+            sum(estimate(t.items(), len(t), t) for t in tables),
+        ))
+    ours = {
+        "counted reactions": reactions.counted._entries,
+        "message authors": reactions._authors,
+        "user names": user_directory._names,
+    }
+    for name, data in ours.items():
+        rows.append((name, len(data), estimate(data.items(), len(data), data)))
+    for name, attr in (
+        ("aura rank", "aura_rank"),
+        ("POS rank", "pos_rank"),
+        ("NEG rank", "neg_rank"),
+        ("streak rank", "streak_rank"),
+    ):
+        # Buckets of (-score, user_id) plus the score dict
+        indexes = [getattr(p, attr) for p in partitions]
+        rows.append((
+            name,
+            sum(len(i) for i in indexes),
+            sum(estimate(i._scores.items(), len(i), i._scores) * 2 for i in indexes),
+        ))
+    return rows
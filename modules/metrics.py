@@ -0,0 +1,209 @@
+# modules/metrics.py
+# Counters, gauges and histograms for the bot, served in the Prometheus text
+# format at http://<AURA_METRICS>/metrics. Recording a value is a dict update
+# (histograms find their bucket with a bisect), with no locks: metrics are
+# only written from the event loop, or from the one I/O thread for file
+# saves, so nothing else ever writes the same series.
+import asyncio
+import bisect
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+from aiohttp import web
+
+from modules import shards
+from modules.utils import log, loop_lag
+
+# Address of the metrics endpoint, "<host>:<port>"; empty turns it off.
+# Bot processes of launcher.py add their first shard id to the port.
+ADDRESS: str = os.getenv("AURA_METRICS", "127.0.0.1:9108")
+
+# Bucket upper bounds, in seconds
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+SIZE_BUCKETS: tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+# name -> metric, in registration order
+registry: Dict[str, "Metric"] = {}
+
+
+class Metric:
+    kind: str = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        if name in registry:
+            raise ValueError(f"Metric {name} is already registered")
+        self.name = name
+        self.help = help
+        self.labels = labels
+        registry[name] = self
+
+    def samples(self) -> Iterator[tuple[str, tuple, float]]:
+        """(name suffix, label values, value) for every series."""
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, values, value in self.samples():
+            names = self.labels + (("le",) if len(values) > len(self.labels) else ())
+            lines.append(f"{self.name}{suffix}{_label_text(names, values)} {_number(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """A total that only goes up. inc(*label_values, amount=1)."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self.values: Dict[tuple, float] = {}
+
+    def inc(self, *label_values: Any, amount: float = 1) -> None:
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self):
+        for values, value in list(self.values.items()):
+            yield "_total", values, value
+
+
+class Gauge(Metric):
+    """
+    A value that goes up and down: set(value, *label_values), or a function
+    read at scrape time returning a number or {label values: number}.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        read: Callable[[], float | Dict[tuple, float]] | None = None,
+    ):
+        super().__init__(name, help, labels)
+        self.values: Dict[tuple, float] = {}
+        self.read = read
+
+    def set(self, value: float, *label_values: Any) -> None:
+        self.values[label_values] = value
+
+    def samples(self):
+        values = self.values
+        if self.read is not None:
+            try:
+                read = self.read()
+            except Exception as e:
+                log(f"Metric {self.name} failed: {e}", "ERROR")
+                return
+            values = read if isinstance(read, dict) else {(): read}
+        for labels, value in list(values.items()):
+            yield "", labels, value
+
+
+class Histogram(Metric):
+    """Observations counted into fixed buckets. observe(value, *label_values)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+        # label values -> [count per bucket (+Inf last)..., sum]
+        self.series: Dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *label_values: Any) -> None:
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    @contextmanager
+    def time(self, *label_values: Any):
+        """Observe how long the with-block takes."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def samples(self):
+        for values, series in list(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                yield "_bucket", values + (bound,), cumulative
+            yield "_sum", values, series[-1]
+            yield "_count", values, cumulative
+
+
+Gauge("aura_loop_lag_seconds", "How late the event loop last woke up", read=lambda: loop_lag["last"])
+
+
+def render() -> str:
+    """Every metric in the Prometheus text format."""
+    lines = []
+    for metric in list(registry.values()):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _label_text(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = (f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + ",".join(pairs) + "}"
+
+
+def _escape(value: Any) -> str:
+    if isinstance(value, float):
+        return _number(value)
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ---- Endpoint ----
+async def serve(address: str = ADDRESS) -> None:
+    """Background task: serve /metrics until cancelled."""
+    if not address:
+        return
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(body=render().encode("utf-8"), headers={"Content-Type": CONTENT_TYPE})
+
+    host, _, port = address.rpartition(":")
+    port = int(port) + (shards.SHARD_IDS[0] if shards.SHARD_IDS else 0)
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host or "127.0.0.1", port).start()
+    except OSError as e:
+        log(f"Can't serve metrics on {host}:{port}: {e}", "ERROR")
+        await runner.cleanup()
+        return
+    log(f"Serving metrics on http://{host or '127.0.0.1'}:{port}/metrics", "SUCCESS")
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await runner.cleanup()
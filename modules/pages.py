@@ -0,0 +1,109 @@
+# modules/pages.py
+from typing import Callable, Hashable
+
+from modules.rank_index import RankIndex
+
+PER_PAGE: int = 10
+
+
+class StaticPages:
+    """Page provider over a list of already formatted lines."""
+
+    __slots__ = ("lines", "perPage")
+
+    def __init__(self, lines: list[str], perPage: int = PER_PAGE):
+        self.lines = lines
+        self.perPage = perPage
+
+    @property
+    def pageCount(self) -> int:
+        return max(1, (len(self.lines) - 1) // self.perPage + 1)
+
+    def page(self, number: int) -> list[str]:
+        start = number * self.perPage
+        return self.lines[start:start + self.perPage]
+
+
+class LeaderboardSnapshot:
+    """
+    Versioned view of a leaderboard's ordered (user_id, score) rows. Every
+    view opened on the same version shares one snapshot, and a page's lines
+    are only formatted the first time someone looks at it.
+
+    Nothing is copied up front: the first page is a top-k walk of the index
+    and deeper pages are read at their offset when someone turns to them.
+    Each page remembers the index version it was read at and is read again
+    (with `total` refreshed) once the index has moved on, so a page never
+    mixes rows from two versions.
+    """
+
+    __slots__ = ("version", "index", "exclude", "total", "formatRow", "perPage", "_pages")
+
+    def __init__(
+        self,
+        version: Hashable,
+        index: RankIndex,
+        formatRow: Callable[[int, str, int], str],
+        exclude: str | None = None,
+        perPage: int = PER_PAGE,
+    ):
+        self.version = version
+        self.index = index
+        self.exclude = exclude
+        self.total = index.count(exclude)
+        self.formatRow = formatRow
+        self.perPage = perPage
+        # page number -> (index version it was read at, formatted lines)
+        self._pages: dict[int, tuple[int, list[str]]] = {}
+
+    @property
+    def pageCount(self) -> int:
+        return max(1, (self.total - 1) // self.perPage + 1)
+
+    def page(self, number: int) -> list[str]:
+        cached = self._pages.get(number)
+        if cached is not None and cached[0] == self.index.version:
+            return cached[1]
+        start = number * self.perPage
+        if number == 0:
+            rows = self.index.top(self.perPage, self.exclude)
+        else:
+            rows = self.index.page(start, self.perPage, self.exclude)
+        self.total = self.index.count(self.exclude)
+        lines = [
+            self.formatRow(rank, uid, score)
+            for rank, (uid, score) in enumerate(rows, start=start + 1)
+        ]
+        self._pages[number] = (self.index.version, lines)
+        return lines
+
+
+# (guild_id, board name) -> latest snapshot
+_snapshots: dict[tuple[int, str], LeaderboardSnapshot] = {}
+
+
+def get_snapshot(
+    guild_id: int,
+    board: str,
+    index: RankIndex,
+    formatRow: Callable[[int, str, int], str],
+    exclude: str | None = None,
+) -> LeaderboardSnapshot:
+    """
+    Return the shared snapshot of `index` for a guild's board, making a new
+    one only if the index changed since the last snapshot was taken. Views
+    holding an older snapshot keep it until they time out.
+    """
+    key = (guild_id, board)
+    version = (index.version, exclude)
+    snapshot = _snapshots.get(key)
+    if snapshot is None or snapshot.version != version:
+        snapshot = LeaderboardSnapshot(version, index, formatRow, exclude)
+        _snapshots[key] = snapshot
+    return snapshot
+
+
+def drop_guild(guild_id: int) -> None:
+    """Forget a guild's snapshots (its partition was unloaded; a reloaded index starts at version 0 again)."""
+    for key in [key for key in _snapshots if key[0] == guild_id]:
+        del _snapshots[key]
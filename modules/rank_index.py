@@ -0,0 +1,162 @@
+# modules/rank_index.py
+from bisect import bisect_left, insort
+from typing import Dict, Iterable
+
+
+class RankIndex:
+    """
+    Order-statistic index of user_id -> score, highest score first.
+
+    Entries are kept as (-score, user_id) in a list of sorted buckets with a
+    Fenwick tree over the bucket sizes, so updates, rank-of-user and
+    page-at-offset are all O(log n) (plus a memmove inside one bucket of at
+    most 2 * LOAD entries). Ties are broken by user_id.
+
+    `version` changes on every mutation so callers can cache results.
+    """
+
+    LOAD: int = 256
+
+    def __init__(self, scores: Dict[str, int] | None = None):
+        self.version = 0
+        self._scores: Dict[str, int] = {}
+        self._buckets: list[list[tuple[int, str]]] = []
+        self._maxes: list[tuple[int, str]] = []
+        self._tree: list[int] = []
+        self.rebuild(scores or {})
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._scores
+
+    def get(self, user_id: str, default: int | None = None) -> int | None:
+        return self._scores.get(user_id, default)
+
+    # ---- Building ----
+    def rebuild(self, scores: Dict[str, int]) -> None:
+        """Replace the contents in one O(n log n) pass."""
+        self._scores = {k: int(v) for k, v in scores.items()}
+        keys = sorted((-v, k) for k, v in self._scores.items())
+        self._buckets = [keys[i:i + self.LOAD] for i in range(0, len(keys), self.LOAD)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._build_tree()
+        self.version += 1
+
+    def _build_tree(self) -> None:
+        tree = [len(bucket) for bucket in self._buckets]
+        for i in range(len(tree)):
+            parent = i | (i + 1)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, i: int, delta: int) -> None:
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i |= i + 1
+
+    def _before(self, i: int) -> int:
+        """Number of entries in buckets[0:i]."""
+        total = 0
+        while i > 0:
+            total += self._tree[i - 1]
+            i &= i - 1
+        return total
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        """(bucket, position) of the entry at a 0-based overall index."""
+        bucket = 0
+        step = 1 << len(self._tree).bit_length()
+        while step:
+            nxt = bucket + step
+            if nxt <= len(self._tree) and self._tree[nxt - 1] <= index:
+                index -= self._tree[nxt - 1]
+                bucket = nxt
+            step >>= 1
+        return bucket, index
+
+    # ---- Mutation ----
+    def update(self, user_id: str, score: int) -> None:
+        """Insert a user or move them to a new score."""
+        score = int(score)
+        old = self._scores.get(user_id)
+        if old == score:
+            return
+        if old is not None:
+            self._delete((-old, user_id))
+        self._scores[user_id] = score
+        self._insert((-score, user_id))
+        self.version += 1
+
+    def remove(self, user_id: str) -> None:
+        old = self._scores.pop(user_id, None)
+        if old is not None:
+            self._delete((-old, user_id))
+            self.version += 1
+
+    def _insert(self, key: tuple[int, str]) -> None:
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._build_tree()
+            return
+        i = min(bisect_left(self._maxes, key), len(self._buckets) - 1)
+        bucket = self._buckets[i]
+        insort(bucket, key)
+        self._maxes[i] = bucket[-1]
+        if len(bucket) > 2 * self.LOAD:
+            self._buckets[i:i + 1] = [bucket[:self.LOAD], bucket[self.LOAD:]]
+            self._maxes[i:i + 1] = [bucket[self.LOAD - 1], bucket[-1]]
+            self._build_tree()
+        else:
+            self._tree_add(i, 1)
+
+    def _delete(self, key: tuple[int, str]) -> None:
+        i = bisect_left(self._maxes, key)
+        bucket = self._buckets[i]
+        del bucket[bisect_left(bucket, key)]
+        if bucket:
+            self._maxes[i] = bucket[-1]
+            self._tree_add(i, -1)
+        else:
+            del self._buckets[i]
+            del self._maxes[i]
+            self._build_tree()
+
+    # ---- Queries ----
+    def rank(self, user_id: str) -> int | None:
+        """1-based position of a user, or None if they aren't indexed."""
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        key = (-score, user_id)
+        i = bisect_left(self._maxes, key)
+        return self._before(i) + bisect_left(self._buckets[i], key) + 1
+
+    def page(self, offset: int, limit: int, exclude: str | None = None) -> list[tuple[str, int]]:
+        """
+        `limit` (user_id, score) pairs starting at 0-based `offset`, as if
+        `exclude` (e.g. the bot) were not in the index.
+        """
+        skip = self.rank(exclude) - 1 if exclude in self._scores else None
+        start = offset + 1 if skip is not None and skip <= offset else offset
+        rows = [row for row in self._iter_from(start, limit + 1) if row[0] != exclude]
+        return rows[:limit]
+
+    def top(self, k: int, exclude: str | None = None) -> list[tuple[str, int]]:
+        return self.page(0, k, exclude)
+
+    def count(self, exclude: str | None = None) -> int:
+        return len(self._scores) - (1 if exclude in self._scores else 0)
+
+    def _iter_from(self, start: int, limit: int) -> Iterable[tuple[str, int]]:
+        if start >= len(self._scores) or limit <= 0:
+            return
+        bucket, pos = self._locate(start)
+        while bucket < len(self._buckets) and limit > 0:
+            for neg, user_id in self._buckets[bucket][pos:pos + limit]:
+                yield user_id, -neg
+                limit -= 1
+            bucket, pos = bucket + 1, 0
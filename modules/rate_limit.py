@@ -0,0 +1,52 @@
+# modules/rate_limit.py
+import time
+from typing import Hashable
+
+
+class TokenBuckets:
+    """
+    One token bucket per key: up to `burst` events at once, refilled at
+    `rate` tokens per second. A bucket is stored as (tokens, last update)
+    only while it's below full; idle buckets are dropped by a periodic sweep,
+    so memory follows the number of recently active keys.
+    """
+
+    __slots__ = ("rate", "burst", "sweep_every", "_buckets", "_last_sweep")
+
+    def __init__(self, rate: float, burst: float, sweep_every: float = 60.0):
+        self.rate = rate
+        self.burst = burst
+        self.sweep_every = sweep_every
+        self._buckets: dict[Hashable, tuple[float, float]] = {}
+        self._last_sweep = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def level(self, key: Hashable, now: float | None = None) -> float:
+        """Tokens currently available for a key."""
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return self.burst
+        tokens, updated = bucket
+        return min(self.burst, tokens + (now - updated) * self.rate)
+
+    def take(self, key: Hashable, now: float | None = None) -> bool:
+        """Use one token if there is one."""
+        now = time.monotonic() if now is None else now
+        tokens = self.level(key, now)
+        if tokens < 1:
+            return False
+        self._buckets[key] = (tokens - 1, now)
+        if now - self._last_sweep >= self.sweep_every:
+            self.sweep(now)
+        return True
+
+    def sweep(self, now: float | None = None) -> None:
+        """Forget buckets that have refilled completely."""
+        now = time.monotonic() if now is None else now
+        self._last_sweep = now
+        full = [key for key in self._buckets if self.level(key, now) >= self.burst]
+        for key in full:
+            del self._buckets[key]
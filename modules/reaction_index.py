@@ -0,0 +1,141 @@
+# modules/reaction_index.py
+import json
+import os
+import time
+from collections import OrderedDict
+
+from modules import file_io
+from modules.storage import load_json, save_json
+from modules.utils import log
+
+# (message_id, reactor_id, emoji name)
+Key = tuple[int, int, str]
+
+
+class ReactionIndex:
+    """
+    Aura reactions that have been counted, keyed by (message_id, reactor_id,
+    emoji) -> (message author id, unix time counted).
+
+    A removal only reverses aura if its add is in here, so each reaction is
+    counted at most once per message. Entries are kept oldest first and
+    dropped once there are more than `max_entries` or they are older than
+    `max_age` seconds; removing a reaction that old no longer changes aura.
+
+    On disk the index is a snapshot (`path`) plus a journal of the adds and
+    removals made since (`journal`). A change is only journaled once the
+    reaction batch that applies it has committed (see commit()), so after a
+    restart the index never holds an add whose aura wasn't credited. The
+    journal is folded into the snapshot on the I/O thread once it has grown
+    about as long as the index.
+    """
+
+    # Journal records before a compaction is considered at all
+    COMPACT_MIN: int = 10000
+
+    def __init__(self, path: str, journal: str, max_entries: int, max_age: float):
+        self.path = path
+        self.journal = journal
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries: OrderedDict[Key, tuple[int, float]] = OrderedDict()
+        # Journal records committed since the last flush, and written since the last compaction
+        self._pending: list[list] = []
+        self._journaled: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Key) -> bool:
+        return key in self._entries
+
+    # ---- Mutation ----
+    def add(self, key: Key, target_id: int) -> bool:
+        """Record a counted reaction. False if it was already recorded."""
+        if key in self._entries:
+            return False
+        self._entries[key] = (target_id, time.time())
+        self._trim(self._entries)
+        return True
+
+    def pop(self, key: Key) -> int | None:
+        """Forget a reaction, returning the author it was counted for (None if unknown)."""
+        entry = self._entries.pop(key, None)
+        return None if entry is None else entry[0]
+
+    def commit(self, key: Key, target_id: int | None) -> None:
+        """
+        Journal a reaction whose aura change has been applied: an add counted
+        for `target_id`, or a removal (None). Written with the next flush.
+        """
+        if target_id is None:
+            self._pending.append(["-", *key])
+        else:
+            entry = self._entries.get(key)
+            self._pending.append(["+", *key, target_id, entry[1] if entry else round(time.time(), 3)])
+
+    def _trim(self, entries: OrderedDict) -> None:
+        cutoff = time.time() - self.max_age
+        while entries:
+            oldest = next(iter(entries.values()))
+            if len(entries) <= self.max_entries and oldest[1] >= cutoff:
+                break
+            entries.popitem(last=False)
+
+    # ---- Persistence ----
+    def load(self) -> None:
+        """Load the saved snapshot and replay the journal over it."""
+        self._entries = self._read()
+        log(f"Loaded {len(self._entries)} tracked reactions", "SUCCESS" if self._entries else "WARNING")
+
+    def _read(self) -> OrderedDict:
+        """
+        The snapshot ({"entries": [[message, reactor, emoji, target, time], ...]})
+        with the journal applied, trimmed to the limits.
+        """
+        entries: OrderedDict[Key, tuple[int, float]] = OrderedDict()
+        for message_id, reactor_id, emoji, target_id, ts in load_json(self.path).get("entries", []):
+            entries[(int(message_id), int(reactor_id), emoji)] = (int(target_id), float(ts))
+        if os.path.exists(self.journal):
+            with open(self.journal, "r", encoding="utf-8") as f:
+                for number, line in enumerate(f, start=1):
+                    try:
+                        if not line.endswith("\n"):
+                            raise ValueError("incomplete record")
+                        op, message_id, reactor_id, emoji, *counted = json.loads(line)
+                    except ValueError:
+                        log(f"Ignoring bad record at {self.journal}:{number}", "WARNING")
+                        continue
+                    key = (int(message_id), int(reactor_id), emoji)
+                    entries.pop(key, None)
+                    if op == "+":
+                        entries[key] = (int(counted[0]), float(counted[1]))
+        self._trim(entries)
+        return entries
+
+    def flush(self) -> None:
+        """Queue the changes committed since the last flush for appending to the journal."""
+        if not self._pending:
+            return
+        records, self._pending = self._pending, []
+        file_io.submit(self._append, records)
+        self._journaled += len(records)
+        if self._journaled >= max(len(self._entries), self.COMPACT_MIN):
+            self._journaled = 0
+            file_io.submit(self._compact)
+
+    def _append(self, records: list[list]) -> None:
+        """Runs on the I/O thread."""
+        with open(self.journal, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records))
+
+    def _compact(self) -> None:
+        """
+        Runs on the I/O thread: rebuild the index from the files (so only
+        committed changes end up in it), write it as the new snapshot and
+        empty the journal. Replaying a journal that is already part of the
+        snapshot (killed in between) gives the same entries.
+        """
+        entries = self._read()
+        save_json(self.path, {"entries": [[*key, *value] for key, value in entries.items()]})
+        open(self.journal, "w").close()
@@ -0,0 +1,223 @@
+# modules/reactions.py
+import asyncio
+import os
+import time
+from collections import Counter, OrderedDict
+
+import discord
+
+from modules import aura_manager, metrics, shards
+from modules.rate_limit import TokenBuckets
+from modules.reaction_index import ReactionIndex
+from modules.utils import log, log_enabled
+
+# BATCH_INTERVAL    -> seconds a batch stays open after its first reaction
+# BATCH_SIZE        -> reactions that close a batch early
+# AUTHOR_CACHE_SIZE -> message authors remembered for reaction removals
+# FETCH_CONCURRENCY -> fetch_message calls allowed in flight at once
+BATCH_INTERVAL: float = float(os.getenv("AURA_REACTION_BATCH_MS", "250")) / 1000
+BATCH_SIZE: int = int(os.getenv("AURA_REACTION_BATCH_SIZE", "500"))
+AUTHOR_CACHE_SIZE: int = int(os.getenv("AURA_AUTHOR_CACHE", "10000"))
+FETCH_CONCURRENCY: int = int(os.getenv("AURA_MESSAGE_FETCH_CONCURRENCY", "4"))
+
+# Counted reactions, so removals reverse exactly what was added (see modules/reaction_index.py)
+INDEX_FILE: str = shards.process_file(os.path.join("data", "reactionIndex.json"))
+INDEX_JOURNAL: str = shards.process_file(os.path.join("data", "reactionIndex.jsonl"))
+INDEX_SIZE: int = int(os.getenv("AURA_REACTION_INDEX_SIZE", "200000"))
+INDEX_DAYS: float = float(os.getenv("AURA_REACTION_INDEX_DAYS", "30"))
+counted: ReactionIndex = ReactionIndex(INDEX_FILE, INDEX_JOURNAL, INDEX_SIZE, INDEX_DAYS * 24 * 3600)
+
+# Counted reaction adds allowed per reactor and per message author: a burst,
+# then RATE per minute. Removals of counted reactions are never limited, so
+# toggling costs at most two changes per allowed add.
+REACTOR_BURST: float = float(os.getenv("AURA_REACTOR_BURST", "10"))
+REACTOR_RATE: float = float(os.getenv("AURA_REACTOR_RATE", "30"))
+TARGET_BURST: float = float(os.getenv("AURA_TARGET_BURST", "60"))
+TARGET_RATE: float = float(os.getenv("AURA_TARGET_RATE", "300"))
+reactor_limits: TokenBuckets = TokenBuckets(REACTOR_RATE / 60, REACTOR_BURST)
+target_limits: TokenBuckets = TokenBuckets(TARGET_RATE / 60, TARGET_BURST)
+
+# Emoji name -> (sender counter, aura change for the message author)
+AURA_EMOJI: dict[str, tuple[str, int]] = {
+    "aura": ("POS", 1),
+    "auradown": ("NEG", -1),
+}
+
+# Custom emoji id -> name for every aura emoji the bot can see (see load_emoji_ids)
+emoji_ids: dict[int, str] = {}
+
+# (guild_id, message_id, sender_id, target_id, emoji name, +1 added / -1 removed)
+Reaction = tuple[int, int, str, str, str, int]
+
+_queue: asyncio.Queue[Reaction] = asyncio.Queue()
+stats: dict[str, int] = {"batches": 0, "reactions": 0, "largest": 0, "suppressed": 0}
+
+REACTIONS = metrics.Counter("aura_reactions", "Aura reactions queued, by event", ("event",))
+SUPPRESSED = metrics.Counter("aura_reactions_suppressed", "Aura reaction adds refused by the rate limits")
+BATCH_SIZE_HIST = metrics.Histogram(
+    "aura_reaction_batch_size", "Reactions applied per batch", buckets=metrics.SIZE_BUCKETS
+)
+BATCH_SECONDS = metrics.Histogram("aura_reaction_batch_seconds", "Time to apply a reaction batch")
+metrics.Gauge("aura_reaction_queue", "Reactions waiting for the next batch", read=lambda: _queue.qsize())
+
+
+# ---- Emoji filter ----
+def load_emoji_ids(emojis) -> None:
+    """Rebuild the id -> name table from the bot's custom emojis."""
+    emoji_ids.clear()
+    emoji_ids.update({e.id: e.name for e in emojis if e.name in AURA_EMOJI})
+    log(f"Tracking {len(emoji_ids)} aura emoji", "SUCCESS" if emoji_ids else "WARNING")
+
+
+def aura_emoji(emoji: discord.PartialEmoji) -> str | None:
+    """Name of an aura emoji, or None for every other emoji."""
+    if emoji.id is None:
+        return None
+    name = emoji_ids.get(emoji.id)
+    if name is None and emoji.name in AURA_EMOJI:
+        # Same name from a server the bot isn't in; learn it
+        emoji_ids[emoji.id] = name = emoji.name
+    return name
+
+
+# ---- Message author lookup ----
+# message_id -> (author_id, author is a bot), least recently used first
+_authors: OrderedDict[int, tuple[int, bool]] = OrderedDict()
+_fetching: dict[int, asyncio.Future] = {}
+_fetch_limit = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+
+def remember_author(message_id: int, author_id: int, is_bot: bool) -> None:
+    _authors[message_id] = (author_id, is_bot)
+    _authors.move_to_end(message_id)
+    if len(_authors) > AUTHOR_CACHE_SIZE:
+        _authors.popitem(last=False)
+
+
+async def message_author(bot, channel_id: int, message_id: int) -> tuple[int, bool] | None:
+    """
+    (author_id, is_bot) of a message from the LRU, fetching it on a miss.
+    Concurrent lookups of the same message share one fetch.
+    """
+    author = _authors.get(message_id)
+    if author is not None:
+        _authors.move_to_end(message_id)
+        return author
+
+    pending = _fetching.get(message_id)
+    if pending is not None:
+        return await asyncio.shield(pending)
+
+    future = asyncio.get_running_loop().create_future()
+    _fetching[message_id] = future
+    try:
+        async with _fetch_limit:
+            channel = bot.get_channel(channel_id) or bot.get_partial_messageable(channel_id)
+            message = await channel.fetch_message(message_id)
+        author = (message.author.id, message.author.bot)
+        remember_author(message_id, *author)
+    except discord.HTTPException as e:
+        log(f"Could not fetch message {message_id}: {e}", "WARNING")
+    finally:
+        _fetching.pop(message_id, None)
+        # Waiters get None if this fetch failed or was cancelled
+        future.set_result(_authors.get(message_id))
+    return future.result()
+
+
+# ---- Rate limiting ----
+def allow_add(reactor_id: int, target_id: int) -> bool:
+    """Take a token from both the reactor's and the author's bucket, or neither."""
+    now = time.monotonic()
+    if reactor_limits.level(reactor_id, now) >= 1 and target_limits.level(target_id, now) >= 1:
+        reactor_limits.take(reactor_id, now)
+        target_limits.take(target_id, now)
+        return True
+    stats["suppressed"] += 1
+    SUPPRESSED.inc()
+    if stats["suppressed"] % 100 == 1:
+        log(f"Reaction rate limit hit by {reactor_id} -> {target_id} ({stats['suppressed']} suppressed so far)", "WARNING")
+    return False
+
+
+# ---- Batching ----
+def submit(guild_id: int, message_id: int, sender_id: int, target_id: int, emoji_name: str, added: bool) -> None:
+    """Queue a reaction add/remove; it is applied with the next batch."""
+    if emoji_name in AURA_EMOJI:
+        reaction = (int(guild_id), int(message_id), str(sender_id), str(target_id), emoji_name, 1 if added else -1)
+        _queue.put_nowait(reaction)
+        REACTIONS.inc("add" if added else "remove")
+
+
+def apply_batch(batch: list[Reaction]) -> None:
+    """
+    Net out a batch and apply it as one aura journal record plus one
+    sender-count update per guild. An add and remove of the same reaction cancel.
+    Each guild's reactions are journaled in the reaction index once its
+    changes are committed.
+    """
+    start = time.perf_counter()
+    aura: dict[int, Counter[str]] = {}
+    counts: dict[int, Counter[tuple[str, str]]] = {}
+    applied: dict[int, list[Reaction]] = {}
+    for reaction in batch:
+        guild_id, _, sender, target, emoji_name, sign = reaction
+        field, change = AURA_EMOJI[emoji_name]
+        aura.setdefault(guild_id, Counter())[target] += change * sign
+        counts.setdefault(guild_id, Counter())[(sender, field)] += sign
+        applied.setdefault(guild_id, []).append(reaction)
+
+    changed = 0
+    for guild_id in aura:
+        aura_changes = {uid: delta for uid, delta in aura[guild_id].items() if delta}
+        count_changes = {key: delta for key, delta in counts[guild_id].items() if delta}
+        with aura_manager.using(guild_id):
+            if aura_changes:
+                aura_manager.apply_aura(aura_changes, "reaction")
+            if count_changes:
+                aura_manager.adjust_sender_counts(count_changes)
+        for _, message_id, sender, target, emoji_name, sign in applied[guild_id]:
+            counted.commit((message_id, int(sender), emoji_name), int(target) if sign > 0 else None)
+        changed += len(aura_changes)
+
+    stats["batches"] += 1
+    stats["reactions"] += len(batch)
+    stats["largest"] = max(stats["largest"], len(batch))
+    BATCH_SIZE_HIST.observe(len(batch))
+    BATCH_SECONDS.observe(time.perf_counter() - start)
+    if log_enabled("INFO"):
+        log(f"Applied {len(batch)} reactions ({changed} users changed in {len(aura)} guilds)", "INFO")
+
+
+async def reaction_loop() -> None:
+    """Background task: collect queued reactions into batches and apply them."""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await _queue.get()]
+        deadline = loop.time() + BATCH_INTERVAL
+        while len(batch) < BATCH_SIZE:
+            # Take whatever is already queued without yielding per item
+            while not _queue.empty() and len(batch) < BATCH_SIZE:
+                batch.append(_queue.get_nowait())
+            remaining = deadline - loop.time()
+            if len(batch) >= BATCH_SIZE or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(_queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        try:
+            for guild_id in {reaction[0] for reaction in batch}:
+                await aura_manager.preload(guild_id)
+            apply_batch(batch)
+        except Exception as e:
+            log(f"Error applying reaction batch: {e}", "ERROR")
+
+
+def drain() -> None:
+    """Apply anything still queued. Used on shutdown."""
+    batch: list[Reaction] = []
+    while not _queue.empty():
+        batch.append(_queue.get_nowait())
+    if batch:
+        apply_batch(batch)
@@ -0,0 +1,269 @@
+# modules/scheduler.py
+import asyncio
+import datetime as dt
+import heapq
+import itertools
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from modules import file_io, metrics, shards
+from modules.storage import load_json
+from modules.utils import log
+
+SCHEDULE_FILE: str = shards.process_file(os.path.join("data", "schedule.json"))
+
+# RETRY_DELAY -> seconds before a failed job runs again (doubled for every failure in a row)
+# RETRY_MAX   -> longest wait between retries
+RETRY_DELAY: float = float(os.getenv("AURA_JOB_RETRY", "30"))
+RETRY_MAX: float = float(os.getenv("AURA_JOB_RETRY_MAX", "1800"))
+
+# Longest single sleep, so a wall clock change (DST, NTP) is noticed
+MAX_SLEEP: float = 300.0
+
+
+# ---- Triggers ----
+# first(now) -> when a new job runs first; next(now) -> when it runs after
+# finishing at `now`. Times are unix timestamps; hours are local time.
+class Daily:
+    """Every day at hour:minute."""
+
+    def __init__(self, hour: int, minute: int = 0):
+        self.hour = hour
+        self.minute = minute
+
+    def first(self, now: float) -> float:
+        return self.next(now)
+
+    def next(self, now: float) -> float:
+        base = dt.datetime.fromtimestamp(now)
+        target = base.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        if target.timestamp() <= now:
+            target += dt.timedelta(days=1)
+        return target.timestamp()
+
+    def __str__(self) -> str:
+        return f"daily at {self.hour:02d}:{self.minute:02d}"
+
+
+class Every:
+    """Every `seconds`, plus up to `jitter` more seconds at random."""
+
+    def __init__(self, seconds: float, jitter: float = 0.0):
+        self.seconds = seconds
+        self.jitter = jitter
+
+    def first(self, now: float) -> float:
+        return self.next(now)
+
+    def next(self, now: float) -> float:
+        return now + self.seconds + random.uniform(0, self.jitter)
+
+    def __str__(self) -> str:
+        jitter = f" (+{self.jitter / 60:g}m)" if self.jitter else ""
+        return f"every {self.seconds / 60:g}m{jitter}"
+
+
+class DailyWindow:
+    """Once a day, at a random time between start_hour and end_hour."""
+
+    def __init__(self, start_hour: int, end_hour: int):
+        self.start_hour = start_hour
+        self.end_hour = end_hour
+
+    def _pick(self, day: dt.date, earliest: float) -> float:
+        start = dt.datetime.combine(day, dt.time(self.start_hour)).timestamp()
+        end = dt.datetime.combine(day, dt.time(self.end_hour)).timestamp()
+        return random.uniform(max(start, earliest), end)
+
+    def first(self, now: float) -> float:
+        # Later today if the window isn't over yet
+        today = dt.date.fromtimestamp(now)
+        if now < dt.datetime.combine(today, dt.time(self.end_hour)).timestamp():
+            return self._pick(today, now)
+        return self._pick(today + dt.timedelta(days=1), now)
+
+    def next(self, now: float) -> float:
+        return self._pick(dt.date.fromtimestamp(now) + dt.timedelta(days=1), now)
+
+    def __str__(self) -> str:
+        return f"daily between {self.start_hour:02d}:00 and {self.end_hour:02d}:00"
+
+
+# ---- Jobs ----
+class Job:
+    """One scheduled coroutine and its run history."""
+
+    __slots__ = (
+        "name", "trigger", "func", "catch_up", "after",
+        "next_run", "last_run", "runs", "failures", "last_error", "task",
+    )
+
+    def __init__(self, name: str, trigger, func: Callable[[], Awaitable[Any]], catch_up: bool, after: str | None):
+        self.name = name
+        self.trigger = trigger
+        self.func = func
+        self.catch_up = catch_up
+        self.after = after
+        self.next_run: float = 0.0
+        self.last_run: float | None = None
+        self.runs: int = 0
+        self.failures: int = 0
+        self.last_error: str | None = None
+        self.task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+
+JOB_RUNS = metrics.Counter("aura_job_runs", "Background job runs, by job and status", ("job", "status"))
+JOB_SECONDS = metrics.Histogram("aura_job_seconds", "Background job run time", ("job",))
+
+# name -> Job
+jobs: Dict[str, Job] = {}
+# (next_run, sequence, name), earliest first; entries whose time no longer
+# matches their job's next_run are skipped
+_heap: list[tuple[float, int, str]] = []
+_seq = itertools.count()
+_wake: asyncio.Event | None = None
+_dirty: bool = False
+# name -> {"next", "last"} saved by the last run (see load())
+_saved: Dict[str, Dict[str, float]] = {}
+
+
+def load() -> None:
+    """Read the run times saved by the last run. Call before add()."""
+    _saved.update(load_json(SCHEDULE_FILE))
+
+
+def add(
+    name: str,
+    trigger,
+    func: Callable[[], Awaitable[Any]],
+    catch_up: bool = False,
+    after: str | None = None,
+) -> Job:
+    """
+    Schedule `func` by `trigger`. A run the last process missed (it was down
+    at the time) happens right away with `catch_up`, and is skipped
+    otherwise. `after` names a job this one waits for when both are due.
+    """
+    job = Job(name, trigger, func, catch_up, after)
+    now = time.time()
+    saved = _saved.get(name, {})
+    job.last_run = saved.get("last")
+    if saved.get("next") is None:
+        first = trigger.first(now)
+    elif saved["next"] > now:
+        first = saved["next"]
+    elif catch_up:
+        log(f"Missed {name} at {_clock(saved['next'])}, running it now", "WARNING")
+        first = now
+    else:
+        first = trigger.first(now)
+    jobs[name] = job
+    _schedule(job, first)
+    return job
+
+
+def _schedule(job: Job, when: float) -> None:
+    global _dirty
+    job.next_run = when
+    heapq.heappush(_heap, (when, next(_seq), job.name))
+    _dirty = True
+    if _wake is not None:
+        _wake.set()
+    log(f"Next {job.name} at {_clock(when)}", "SCHEDULER")
+
+
+async def _run(job: Job) -> None:
+    """Run a job once, then schedule its next run (or a retry)."""
+    dependency = jobs.get(job.after) if job.after else None
+    if dependency is not None and dependency.running:
+        await asyncio.wait([dependency.task])
+    started = time.time()
+    try:
+        with JOB_SECONDS.time(job.name):
+            await job.func()
+    except Exception as e:
+        JOB_RUNS.inc(job.name, "error")
+        job.failures += 1
+        job.last_error = f"{type(e).__name__}: {e}"
+        delay = min(RETRY_MAX, RETRY_DELAY * 2 ** (job.failures - 1))
+        log(f"Job {job.name} failed ({job.failures} in a row), retrying in {delay:.0f}s: {e}", "ERROR")
+        _schedule(job, time.time() + delay)
+        return
+    JOB_RUNS.inc(job.name, "ok")
+    job.runs += 1
+    job.failures = 0
+    job.last_error = None
+    job.last_run = started
+    _schedule(job, job.trigger.next(time.time()))
+
+
+async def scheduler_loop() -> None:
+    """
+    Background task: one timer for every job, sleeping until the earliest
+    next run. Due jobs run as their own tasks, so a slow one doesn't hold
+    up the rest.
+    """
+    global _wake
+    _wake = asyncio.Event()
+    while True:
+        now = time.time()
+        while _heap and _heap[0][0] <= now:
+            when, _, name = heapq.heappop(_heap)
+            job = jobs.get(name)
+            if job is None or job.next_run != when or job.running:
+                continue
+            job.task = asyncio.create_task(_run(job), name=f"job:{name}")
+        _wake.clear()
+        timeout = min(MAX_SLEEP, max(0.0, _heap[0][0] - time.time())) if _heap else MAX_SLEEP
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+# ---- Introspection / persistence ----
+def next_run(name: str) -> float | None:
+    job = jobs.get(name)
+    return job.next_run if job is not None else None
+
+
+def last_run(name: str) -> float | None:
+    job = jobs.get(name)
+    return job.last_run if job is not None else None
+
+
+def summary() -> list[Dict[str, Any]]:
+    """Every job, soonest first, for ?jobs."""
+    return [
+        {
+            "name": job.name,
+            "trigger": str(job.trigger),
+            "next": job.next_run,
+            "last": job.last_run,
+            "runs": job.runs,
+            "failures": job.failures,
+            "error": job.last_error,
+            "running": job.running,
+        }
+        for job in sorted(jobs.values(), key=lambda j: j.next_run)
+    ]
+
+
+def flush() -> None:
+    """Queue the next/last run times for writing if they changed."""
+    global _dirty
+    if not _dirty:
+        return
+    _dirty = False
+    data = {name: {"next": job.next_run, "last": job.last_run} for name, job in jobs.items()}
+    file_io.write_json(SCHEDULE_FILE, data)
+
+
+def _clock(timestamp: float) -> str:
+    return dt.datetime.fromtimestamp(timestamp).strftime("%a %I:%M:%S %p")
@@ -0,0 +1,219 @@
+# modules/sessions.py
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+import discord
+from discord.ext import commands
+
+from modules import aura_manager, escrow, file_io, metrics, shards
+from modules.storage import load_json
+from modules.utils import log
+
+SESSIONS_FILE: str = shards.process_file(os.path.join("data", "sessions.json"))
+
+# MAX_SESSIONS         -> games that can run at once across the bot
+# MAX_CHANNEL_SESSIONS -> games that can run at once in one channel
+# SESSION_TIMEOUT      -> seconds a game can run before it is ended (its bets are refunded)
+MAX_SESSIONS: int = int(os.getenv("AURA_MAX_SESSIONS", "200"))
+MAX_CHANNEL_SESSIONS: int = int(os.getenv("AURA_MAX_CHANNEL_SESSIONS", "20"))
+SESSION_TIMEOUT: float = float(os.getenv("AURA_SESSION_TIMEOUT", "600"))
+
+
+class SessionLimit(commands.CommandError):
+    """A game was refused because too many are running; shown by on_command_error."""
+
+
+class Session:
+    """One running game: who is playing where, its escrow and its game message."""
+
+    __slots__ = ("id", "game", "guild_id", "channel_id", "players", "started", "deadline", "escrow_id", "message_id", "task")
+
+    def __init__(self, session_id: int, game: str, guild_id: int | None, channel_id: int, players: list[str]):
+        self.id = session_id
+        self.game = game
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.players = players
+        self.started = time.time()
+        self.deadline = time.monotonic() + SESSION_TIMEOUT
+        self.escrow_id: str | None = None
+        self.message_id: int | None = None
+        self.task: asyncio.Task | None = asyncio.current_task()
+
+    def age(self, now: float | None = None) -> float:
+        return (now or time.time()) - self.started
+
+    def attach(self, escrow_id: str | None = None, message: discord.Message | None = None) -> None:
+        """Remember the game's escrow and/or message, so a restart can resolve them."""
+        global _dirty
+        if escrow_id is not None:
+            self.escrow_id = escrow_id
+        if message is not None:
+            self.message_id = message.id
+        _dirty = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "game": self.game,
+            "guild": self.guild_id,
+            "channel": self.channel_id,
+            "players": self.players,
+            "started": round(self.started, 3),
+            "escrow": self.escrow_id,
+            "message": self.message_id,
+        }
+
+
+# session id -> Session
+_sessions: Dict[int, Session] = {}
+_per_channel: Counter[int] = Counter()
+# (deadline, session id), earliest first; entries of ended sessions are skipped
+_deadlines: list[tuple[float, int]] = []
+_wake: asyncio.Event | None = None
+_ids = itertools.count(1)
+_dirty: bool = False
+
+# Sessions saved by the last run whose bets were settled on startup,
+# kept until resolve_stale() has told their channels
+stale: list[Dict[str, Any]] = []
+
+stats: Dict[str, int] = {"opened": 0, "refused": 0, "expired": 0}
+SESSIONS = metrics.Counter("aura_sessions", "Games opened, refused and timed out", ("outcome",))
+metrics.Gauge(
+    "aura_open_sessions", "Games running right now, by game", ("game",),
+    read=lambda: {(game,): count for game, count in Counter(s.game for s in _sessions.values()).items()},
+)
+
+
+# ---- Registry ----
+@asynccontextmanager
+async def opened(ctx: commands.Context, game: str, *players: int | str):
+    """
+    Register a game for as long as the block runs. Raises SessionLimit
+    when MAX_SESSIONS or MAX_CHANNEL_SESSIONS games are already running.
+    """
+    global _dirty
+    channel_id = ctx.channel.id
+    if len(_sessions) >= MAX_SESSIONS or _per_channel[channel_id] >= MAX_CHANNEL_SESSIONS:
+        stats["refused"] += 1
+        SESSIONS.inc("refused")
+        raise SessionLimit("Too many games are running right now, try again in a bit.")
+
+    guild_id = ctx.guild.id if ctx.guild else None
+    session = Session(next(_ids), game, guild_id, channel_id, [str(p) for p in players])
+    _sessions[session.id] = session
+    _per_channel[channel_id] += 1
+    heapq.heappush(_deadlines, (session.deadline, session.id))
+    if _wake is not None and _deadlines[0][1] == session.id:
+        _wake.set()
+    stats["opened"] += 1
+    SESSIONS.inc("opened")
+    _dirty = True
+    try:
+        yield session
+    finally:
+        del _sessions[session.id]
+        _per_channel[channel_id] -= 1
+        if not _per_channel[channel_id]:
+            del _per_channel[channel_id]
+        _dirty = True
+
+
+def summary() -> Dict[str, Any]:
+    """Counts and ages (seconds) of the games running right now."""
+    now = time.time()
+    ages = [s.age(now) for s in _sessions.values()]
+    return {
+        "open": len(_sessions),
+        "games": Counter(s.game for s in _sessions.values()),
+        "channels": len(_per_channel),
+        "busiest_channel": max(_per_channel.values(), default=0),
+        "oldest": max(ages, default=0.0),
+        "average": sum(ages) / len(ages) if ages else 0.0,
+    }
+
+
+# ---- Deadlines ----
+async def session_timer() -> None:
+    """
+    Background task: one timer for every session, sleeping until the
+    earliest deadline. A game past its deadline is cancelled, which releases
+    its locks and refunds its escrow on the way out.
+    """
+    global _wake
+    _wake = asyncio.Event()
+    while True:
+        now = time.monotonic()
+        while _deadlines and (_deadlines[0][1] not in _sessions or _deadlines[0][0] <= now):
+            _, session_id = heapq.heappop(_deadlines)
+            session = _sessions.get(session_id)
+            if session is not None and session.task is not None:
+                stats["expired"] += 1
+                SESSIONS.inc("expired")
+                log(f"Ending {session.game} session {session.id} after {session.age():.0f}s", "WARNING")
+                session.task.cancel()
+        _wake.clear()
+        timeout = _deadlines[0][0] - now if _deadlines else None
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+# ---- Persistence ----
+def load(default_guild: int | None = None) -> None:
+    """
+    Read the sessions saved by the last run and keep the ones whose bet was
+    settled on startup. Loading a guild settles its open bets (see
+    escrow.resolve_stale()), so every guild with a saved game is loaded here.
+    Sessions saved before guilds had partitions belong to `default_guild`.
+    """
+    global _dirty
+    saved = load_json(SESSIONS_FILE).get("sessions", [])
+    for s in saved:
+        s.setdefault("guild", default_guild)
+        if s["guild"] is not None and s.get("escrow"):
+            aura_manager.partition(s["guild"])
+    stale[:] = [s for s in saved if s.get("escrow") in escrow.interrupted]
+    _dirty = bool(saved)
+    if stale:
+        log(f"{len(stale)} games were interrupted by the last restart", "WARNING")
+
+
+def flush() -> None:
+    """Queue the open sessions for writing if they changed."""
+    global _dirty
+    if not _dirty:
+        return
+    _dirty = False
+    saved = [s.to_dict() for s in _sessions.values()] + stale
+    file_io.write_json(SESSIONS_FILE, {"sessions": saved})
+
+
+async def resolve_stale(bot: commands.Bot) -> None:
+    """Tell the channels of interrupted games what happened to their bets."""
+    global _dirty
+    if not stale:
+        return
+    outcome = "kept by the house" if escrow.ON_RESTART == "forfeit" else "refunded"
+    for saved in stale:
+        channel = bot.get_channel(saved["channel"])
+        if channel is None or saved.get("message") is None:
+            continue
+        try:
+            await channel.get_partial_message(saved["message"]).edit(
+                content=f"This {saved['game']} game was interrupted by a restart. Bets were {outcome}.",
+                embed=None,
+                view=None,
+            )
+        except discord.HTTPException as e:
+            log(f"Couldn't update interrupted game message {saved['message']}: {e}", "WARNING")
+    log(f"Resolved {len(stale)} interrupted games", "SUCCESS")
+    stale.clear()
+    _dirty = True
@@ -0,0 +1,33 @@
+# modules/shards.py
+import os
+
+# Set by launcher.py for each bot process; unset means one process with every shard
+# SHARD_COUNT -> gateway shards across all processes
+# SHARD_IDS   -> the shards this process connects
+SHARD_COUNT: int | None = int(os.getenv("AURA_SHARD_COUNT")) if os.getenv("AURA_SHARD_COUNT") else None
+SHARD_IDS: list[int] | None = (
+    [int(x) for x in os.getenv("AURA_SHARD_IDS", "").split(",") if x.strip()] or None
+    if SHARD_COUNT
+    else None
+)
+
+
+def shard_of(guild_id: int) -> int:
+    """The shard Discord sends a guild's events to."""
+    return (int(guild_id) >> 22) % (SHARD_COUNT or 1)
+
+
+def owns(guild_id: int) -> bool:
+    """Whether this process handles a guild."""
+    return SHARD_IDS is None or shard_of(guild_id) in SHARD_IDS
+
+
+def process_file(path: str) -> str:
+    """
+    A per-process version of a data file (caches only ever filled from this
+    process's own events), e.g. data/userNames.shard0-2.json.
+    """
+    if SHARD_IDS is None:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard{'-'.join(map(str, SHARD_IDS))}{ext}"
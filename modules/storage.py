@@ -0,0 +1,371 @@
+# modules/storage.py
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, Any, Iterable
+
+from modules import metrics
+from modules.utils import log
+
+# Durability of every write made through this module
+# "fast"   : plain overwrite / sqlite synchronous=OFF
+# "normal" : atomic temp file + rename / sqlite synchronous=NORMAL
+# "strict" : atomic + fsync / sqlite synchronous=FULL
+DURABILITY: str = os.getenv("AURA_DURABILITY", "normal").lower()
+
+# Table names shared by every backend
+AURA_TABLE: str = "aura"
+COUNT_TABLE: str = "auraCount"
+WINSTREAK_TABLE: str = "winstreaks"
+ESCROW_TABLE: str = "escrows"
+TABLES: tuple[str, ...] = (AURA_TABLE, COUNT_TABLE, WINSTREAK_TABLE, ESCROW_TABLE)
+
+
+SAVE_SECONDS = metrics.Histogram("aura_json_save_seconds", "Time to write a JSON data file", ("file",))
+
+
+# ---- JSON helpers ----
+def load_json(file: str) -> Dict[str, Any]:
+    """Load JSON from file and return a dict (empty if missing or empty)."""
+    if os.path.exists(file):
+        with open(file, "r", encoding="utf-8") as f:
+            content: str = f.read().strip()
+            if content:
+                try:
+                    return json.loads(content)
+                except json.JSONDecodeError:
+                    log(f"{file} exists but contains invalid JSON. Returning empty dict.", "ERROR")
+                    return {}
+    return {}
+
+
+def save_json(file: str, data: Dict[str, Any]) -> None:
+    """Write JSON to disk with indentation."""
+    start = time.perf_counter()
+    if DURABILITY == "fast":
+        with open(file, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+    else:
+        tmp: str = f"{file}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+            if DURABILITY == "strict":
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, file)
+    SAVE_SECONDS.observe(time.perf_counter() - start, os.path.basename(file))
+    log(f"{file} saved", "SUCCESS")
+
+
+# ---- JSON backend ----
+class JsonBackend:
+    """
+    The original flat-file layout: one JSON dict per table, rewritten whole
+    on every save. History lives in daily segments (see modules/history.py).
+    """
+
+    name = "json"
+
+    def __init__(self, files: Dict[str, str], history_dir: str, legacy_history_file: str):
+        self.files = files
+        self.history_dir = history_dir
+        self.legacy_history_file = legacy_history_file
+        self._history = None
+
+    @property
+    def history(self):
+        # Opened lazily so the legacy history migration only runs when needed
+        if self._history is None:
+            from modules.history import SegmentedHistory
+
+            self._history = SegmentedHistory(self.history_dir, self.legacy_history_file)
+        return self._history
+
+    def load(self, table: str) -> Dict[str, Any]:
+        return load_json(self.files[table])
+
+    def save(self, table: str, data: Dict[str, Any], keys: Iterable[str]) -> None:
+        # Flat files can't be patched in place, so changed keys are ignored
+        save_json(self.files[table], data)
+
+    def top(self, table: str, limit: int, offset: int = 0) -> list[tuple[str, int]]:
+        rows = sorted(_scores(table, self.load(table)), key=lambda x: x[1], reverse=True)
+        return rows[offset:offset + limit]
+
+    def rank(self, table: str, user_id: str) -> int | None:
+        data = dict(_scores(table, self.load(table)))
+        if user_id not in data:
+            return None
+        return 1 + sum(1 for v in data.values() if v > data[user_id])
+
+    def history_days(self, snapshots_only: bool = False) -> list[str]:
+        return self.history.days(snapshots_only)
+
+    def load_history_day(self, day: str) -> Dict[str, Any]:
+        return self.history.load_day(day)
+
+    def save_history_day(self, day: str, snapshot: Dict[str, Any]) -> None:
+        self.history.save_day(day, snapshot)
+
+    def close(self) -> None:
+        pass
+
+
+def _scores(table: str, data: Dict[str, Any]) -> Iterable[tuple[str, int]]:
+    """(user_id, score) pairs for a table; auraCount ranks by POS."""
+    if table == COUNT_TABLE:
+        return ((k, int(v.get("POS", 0))) for k, v in data.items())
+    return ((k, int(v)) for k, v in data.items())
+
+
+# ---- SQLite backend ----
+_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS aura (
+    user_id TEXT PRIMARY KEY,
+    aura    INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS aura_rank ON aura (aura DESC);
+
+CREATE TABLE IF NOT EXISTS aura_count (
+    user_id TEXT PRIMARY KEY,
+    pos     INTEGER NOT NULL DEFAULT 0,
+    neg     INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS aura_count_pos ON aura_count (pos DESC);
+CREATE INDEX IF NOT EXISTS aura_count_neg ON aura_count (neg DESC);
+
+CREATE TABLE IF NOT EXISTS winstreaks (
+    user_id TEXT PRIMARY KEY,
+    streak  INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS winstreaks_rank ON winstreaks (streak DESC);
+
+CREATE TABLE IF NOT EXISTS escrows (
+    escrow_id TEXT PRIMARY KEY,
+    data      TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS history_days (
+    day  TEXT PRIMARY KEY,
+    time TEXT
+);
+
+CREATE TABLE IF NOT EXISTS history (
+    day     TEXT    NOT NULL,
+    user_id TEXT    NOT NULL,
+    aura    INTEGER NOT NULL,
+    PRIMARY KEY (day, user_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS history_user_day ON history (user_id, day);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# table -> (sql table, score column)
+_SQL_TABLES: Dict[str, tuple[str, str]] = {
+    AURA_TABLE: ("aura", "aura"),
+    COUNT_TABLE: ("aura_count", "pos"),
+    WINSTREAK_TABLE: ("winstreaks", "streak"),
+}
+
+
+class SqliteBackend:
+    """
+    SQLite (WAL mode) storage. Saves only upsert/delete the rows whose keys
+    changed and rank queries use the score indexes. History only gets a row
+    when a user's aura differs from their previous snapshot; a day's full
+    state is each user's latest row at or before that day.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        # Writes come from the single I/O thread; startup reads from the main thread
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        synchronous = {"fast": "OFF", "strict": "FULL"}.get(DURABILITY, "NORMAL")
+        self.db.execute(f"PRAGMA synchronous={synchronous}")
+        self.db.executescript(_SCHEMA)
+
+    def load(self, table: str) -> Dict[str, Any]:
+        if table == COUNT_TABLE:
+            rows = self.db.execute("SELECT user_id, pos, neg FROM aura_count")
+            return {uid: {"POS": pos, "NEG": neg} for uid, pos, neg in rows}
+        if table == ESCROW_TABLE:
+            rows = self.db.execute("SELECT escrow_id, data FROM escrows")
+            return {eid: json.loads(data) for eid, data in rows}
+        sql_table, column = _SQL_TABLES[table]
+        return dict(self.db.execute(f"SELECT user_id, {column} FROM {sql_table}"))
+
+    def save(self, table: str, data: Dict[str, Any], keys: Iterable[str]) -> None:
+        if table == ESCROW_TABLE:
+            self._save_escrows(data, keys)
+            return
+        sql_table, column = _SQL_TABLES[table]
+        upserts: list[tuple] = []
+        deletes: list[tuple] = []
+        for key in keys:
+            if key not in data:
+                deletes.append((key,))
+            elif table == COUNT_TABLE:
+                upserts.append((key, data[key]["POS"], data[key]["NEG"]))
+            else:
+                upserts.append((key, data[key]))
+
+        with self.db:
+            if table == COUNT_TABLE:
+                self.db.executemany(
+                    "INSERT INTO aura_count (user_id, pos, neg) VALUES (?, ?, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET pos = excluded.pos, neg = excluded.neg",
+                    upserts,
+                )
+            else:
+                self.db.executemany(
+                    f"INSERT INTO {sql_table} (user_id, {column}) VALUES (?, ?) "
+                    f"ON CONFLICT(user_id) DO UPDATE SET {column} = excluded.{column}",
+                    upserts,
+                )
+            self.db.executemany(f"DELETE FROM {sql_table} WHERE user_id = ?", deletes)
+
+    def _save_escrows(self, data: Dict[str, Any], keys: Iterable[str]) -> None:
+        keys = list(keys)
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO escrows (escrow_id, data) VALUES (?, ?) "
+                "ON CONFLICT(escrow_id) DO UPDATE SET data = excluded.data",
+                [(k, json.dumps(data[k])) for k in keys if k in data],
+            )
+            self.db.executemany(
+                "DELETE FROM escrows WHERE escrow_id = ?", [(k,) for k in keys if k not in data]
+            )
+
+    def top(self, table: str, limit: int, offset: int = 0) -> list[tuple[str, int]]:
+        sql_table, column = _SQL_TABLES[table]
+        return self.db.execute(
+            f"SELECT user_id, {column} FROM {sql_table} ORDER BY {column} DESC LIMIT ? OFFSET ?",
+            (limit, offset),
+        ).fetchall()
+
+    def rank(self, table: str, user_id: str) -> int | None:
+        sql_table, column = _SQL_TABLES[table]
+        row = self.db.execute(
+            f"SELECT {column} FROM {sql_table} WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        (above,) = self.db.execute(
+            f"SELECT COUNT(*) FROM {sql_table} WHERE {column} > ?", row
+        ).fetchone()
+        return above + 1
+
+    def history_days(self, snapshots_only: bool = False) -> list[str]:
+        sql = "SELECT day FROM history_days"
+        if snapshots_only:
+            sql += " WHERE time IS NOT NULL"
+        return [day for (day,) in self.db.execute(sql + " ORDER BY day")]
+
+    def _history_state(self, day: str) -> Dict[str, int]:
+        return dict(self.db.execute(
+            "SELECT h.user_id, h.aura FROM history h "
+            "JOIN (SELECT user_id, MAX(day) AS day FROM history WHERE day <= ? GROUP BY user_id) latest "
+            "ON h.user_id = latest.user_id AND h.day = latest.day",
+            (day,),
+        ))
+
+    def load_history_day(self, day: str) -> Dict[str, Any]:
+        row = self.db.execute("SELECT time FROM history_days WHERE day = ?", (day,)).fetchone()
+        if row is None or row[0] is None:
+            return {}
+        return {"time": row[0], "aura": self._history_state(day)}
+
+    def save_history_day(self, day: str, snapshot: Dict[str, Any]) -> None:
+        with self.db:
+            if not snapshot:
+                self.db.execute(
+                    "INSERT OR IGNORE INTO history_days (day, time) VALUES (?, NULL)", (day,)
+                )
+                return
+            self.db.execute(
+                "INSERT INTO history_days (day, time) VALUES (?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET time = excluded.time",
+                (day, snapshot["time"]),
+            )
+            self.db.execute("DELETE FROM history WHERE day = ?", (day,))
+            (previous_day,) = self.db.execute(
+                "SELECT MAX(day) FROM history_days WHERE day < ? AND time IS NOT NULL", (day,)
+            ).fetchone()
+            previous = self._history_state(previous_day) if previous_day else {}
+            self.db.executemany(
+                "INSERT INTO history (day, user_id, aura) VALUES (?, ?, ?)",
+                (
+                    (day, uid, int(v))
+                    for uid, v in snapshot["aura"].items()
+                    if previous.get(uid) != int(v)
+                ),
+            )
+
+    def is_empty(self) -> bool:
+        for sql_table in ("aura", "aura_count", "winstreaks", "escrows", "history_days"):
+            if self.db.execute(f"SELECT 1 FROM {sql_table} LIMIT 1").fetchone():
+                return False
+        return True
+
+    def migrated(self) -> bool:
+        return self.db.execute(
+            "SELECT 1 FROM meta WHERE key = 'migrated_from_json'"
+        ).fetchone() is not None
+
+    def close(self) -> None:
+        self.db.close()
+
+
+# ---- Migration ----
+def migrate_json_to_sqlite(source: JsonBackend, target: SqliteBackend) -> bool:
+    """
+    One-shot copy of the JSON files into an empty SQLite database.
+    Returns True if anything was migrated. The JSON files are left in place.
+    """
+    if target.migrated() or not target.is_empty():
+        return False
+
+    for table in TABLES:
+        data = source.load(table)
+        if table == COUNT_TABLE:
+            data = {
+                k: {"POS": int(v.get("POS", 0)), "NEG": int(v.get("NEG", 0))}
+                for k, v in data.items()
+            }
+        elif table != ESCROW_TABLE:  # open bets are copied as they are
+            data = {k: int(v) for k, v in data.items()}
+        target.save(table, data, data.keys())
+        log(f"Migrated {len(data)} rows from {source.files[table]}", "SUCCESS")
+
+    days = source.history_days()
+    for day in days:
+        target.save_history_day(day, source.load_history_day(day))
+    log(f"Migrated {len(days)} history days from {source.history_dir}", "SUCCESS")
+
+    with target.db:
+        target.db.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from_json', '1')"
+        )
+    return True
+
+
+if __name__ == "__main__":
+    # python -m modules.storage migrate <guild_id>
+    if len(sys.argv) != 3 or sys.argv[1] != "migrate" or not sys.argv[2].isdigit():
+        print("Usage: python -m modules.storage migrate <guild_id>")
+        sys.exit(1)
+    from modules import aura_manager, guild_store
+
+    directory = os.path.join(aura_manager.GUILDS_DIR, sys.argv[2])
+    target = SqliteBackend(os.path.join(directory, guild_store.DB_FILE))
+    if not migrate_json_to_sqlite(guild_store.json_backend(directory), target):
+        log("SQLite database already has data. Nothing migrated.", "WARNING")
@@ -0,0 +1,185 @@
+# modules/tracing.py
+# Wall time of every command and button press, split into disk I/O (file_io
+# and ledger calls), Discord REST calls and the rest ("compute": our own code
+# plus time spent waiting on locks), kept in rolling histograms for ?perf.
+# Time a game spends waiting for its players to press a button is left out.
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict
+
+import discord
+from discord.webhook.async_ import AsyncWebhookAdapter
+
+from modules import metrics
+
+# WINDOW -> seconds of history ?perf reports on; older runs age out
+#           a sixth of the window at a time
+WINDOW: float = float(os.getenv("AURA_PERF_WINDOW", "3600"))
+SLOTS: int = 6
+
+PHASES: tuple[str, ...] = ("total", "compute", "io", "rest")
+
+PHASE_SECONDS = metrics.Histogram(
+    "aura_trace_seconds", "Command and button run time by phase", ("name", "phase")
+)
+
+
+class RollingHistogram:
+    """
+    Latencies in log-linear buckets, HDR style: 16 buckets per power of two
+    of microseconds, so any percentile is within ~6% of the true value.
+    Counts are kept per time slot and slots older than WINDOW are dropped.
+    """
+
+    SUB_BITS: int = 4
+
+    def __init__(self):
+        # (slot number, {bucket: count}), oldest first
+        self.slots: list[tuple[int, Dict[int, int]]] = []
+
+    @classmethod
+    def bucket(cls, micros: int) -> int:
+        shift = micros.bit_length() - cls.SUB_BITS - 1
+        if shift <= 0:
+            return micros
+        return (shift << cls.SUB_BITS) + (micros >> shift)
+
+    @classmethod
+    def value(cls, bucket: int) -> float:
+        """Middle of a bucket, in microseconds."""
+        shift = (bucket >> cls.SUB_BITS) - 1
+        if shift <= 0:
+            return float(bucket)
+        low = (bucket - (shift << cls.SUB_BITS)) << shift
+        return low + ((1 << shift) - 1) / 2
+
+    def record(self, seconds: float, now: float | None = None) -> None:
+        slot = int((time.time() if now is None else now) // (WINDOW / SLOTS))
+        if not self.slots or self.slots[-1][0] != slot:
+            self.slots = [s for s in self.slots if s[0] > slot - SLOTS] + [(slot, {})]
+        counts = self.slots[-1][1]
+        key = self.bucket(max(0, int(seconds * 1_000_000)))
+        counts[key] = counts.get(key, 0) + 1
+
+    def merged(self, now: float | None = None) -> Dict[int, int]:
+        oldest = int((time.time() if now is None else now) // (WINDOW / SLOTS)) - SLOTS + 1
+        total: Dict[int, int] = {}
+        for slot, counts in self.slots:
+            if slot >= oldest:
+                for key, count in counts.items():
+                    total[key] = total.get(key, 0) + count
+        return total
+
+    def percentiles(self, *quantiles: float, now: float | None = None) -> tuple[int, list[float]]:
+        """(runs in the window, [seconds at each quantile])."""
+        counts = self.merged(now)
+        runs = sum(counts.values())
+        if not runs:
+            return 0, [0.0] * len(quantiles)
+        ordered = sorted(counts.items())
+        results = []
+        for q in quantiles:
+            rank, seen = max(1, round(q * runs)), 0
+            for key, count in ordered:
+                seen += count
+                if seen >= rank:
+                    results.append(self.value(key) / 1_000_000)
+                    break
+        return runs, results
+
+
+class Trace:
+    __slots__ = ("name", "started", "io", "rest", "wait")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.io = 0.0
+        self.rest = 0.0
+        self.wait = 0.0
+
+
+# name ("?lb", "leaderboardEmbed: Next Page") -> phase -> histogram
+histograms: Dict[str, Dict[str, RollingHistogram]] = {}
+
+# The command or button the running task works for; tasks it starts share it
+_current: ContextVar[Trace | None] = ContextVar("trace", default=None)
+
+
+def start(name: str) -> None:
+    _current.set(Trace(name))
+
+
+def finish() -> None:
+    """Record the running trace, if any."""
+    trace = _current.get()
+    if trace is None:
+        return
+    _current.set(None)
+    total = time.perf_counter() - trace.started - trace.wait
+    # Concurrent calls (gathered lookups) can overlap; never report negative compute
+    phases = {
+        "total": total,
+        "compute": max(0.0, total - trace.io - trace.rest),
+        "io": trace.io,
+        "rest": trace.rest,
+    }
+    per_phase = histograms.setdefault(trace.name, {phase: RollingHistogram() for phase in PHASES})
+    now = time.time()
+    for phase, seconds in phases.items():
+        per_phase[phase].record(seconds, now)
+        PHASE_SECONDS.observe(seconds, trace.name, phase)
+
+
+@contextmanager
+def span(kind: str):
+    """Count the with-block towards the running trace's "io", "rest" or "wait" time."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(trace, kind, getattr(trace, kind) + time.perf_counter() - started)
+
+
+def report(limit: int = 25) -> list[Dict[str, object]]:
+    """Per traced name: runs and p50/p95/p99 of every phase, slowest p99 first."""
+    rows = []
+    now = time.time()
+    for name, per_phase in histograms.items():
+        runs, total = per_phase["total"].percentiles(0.5, 0.95, 0.99, now=now)
+        if not runs:
+            continue
+        rows.append({
+            "name": name,
+            "runs": runs,
+            **{phase: per_phase[phase].percentiles(0.5, 0.95, 0.99, now=now)[1] for phase in PHASES[1:]},
+            "total": total,
+        })
+    rows.sort(key=lambda row: row["total"][2], reverse=True)
+    return rows[:limit]
+
+
+# ---- Discord REST ----
+def _timed_rest(request):
+    async def traced(*args, **kwargs):
+        with span("rest"):
+            return await request(*args, **kwargs)
+
+    traced.__wrapped__ = request
+    return traced
+
+
+def install() -> None:
+    """
+    Time every Discord REST call: the bot's HTTP client, and the webhook
+    adapter that interaction responses and followups go through.
+    """
+    for cls in (discord.http.HTTPClient, AsyncWebhookAdapter):
+        if not hasattr(cls.request, "__wrapped__"):
+            cls.request = _timed_rest(cls.request)
@@ -2,27 +2,65 @@ import discord
 import json
 import os
 import random
-from modules import bot_setup
-from modules.utils import log
-from modules.aura_manager import isBusy, lockUser, unlockUser, update_aura, aura_data
+import time
+from modules import bot_setup, metrics, tracing
+from modules.utils import log, log_enabled
+from modules.pages import StaticPages
+from modules.aura_manager import isBusy, update_aura, balance, preload, use
+
+# Load gain/loss messages once at import, before the event loop starts
+baseDir = os.path.dirname(os.path.abspath(__file__)) # auraTracker/
+with open(os.path.join(baseDir, "..", "data", "randomMessages.json"), "r") as f:
+    RANDOM_MESSAGES: dict[str, list[str]] = json.load(f)
+
+
+INTERACTIONS = metrics.Counter(
+    "aura_view_interactions", "Button presses handled, by view, button and status", ("view", "item", "status")
+)
+INTERACTION_SECONDS = metrics.Histogram("aura_view_seconds", "Button callback run time", ("view", "item"))
+
+
+class TrackedView(discord.ui.View):
+    """View whose button callbacks are counted, timed and traced (see modules/metrics.py, modules/tracing.py)."""
+
+    def __init__(self, *, timeout: float | None = 180):
+        super().__init__(timeout=timeout)
+        for item in self.children:
+            item.callback = self._tracked(item, item.callback)
+
+    def _tracked(self, item, callback):
+        view, name = type(self).__name__, getattr(item, "label", None) or type(item).__name__
+
+        async def run(interaction: discord.Interaction):
+            started = time.perf_counter()
+            status = "error"
+            tracing.start(f"{view}: {name}")
+            try:
+                await callback(interaction)
+                status = "ok"
+            finally:
+                tracing.finish()
+                INTERACTIONS.inc(view, name, status)
+                INTERACTION_SECONDS.observe(time.perf_counter() - started, view, name)
+
+        return run
 
 
 # Leaderboard embed with pageturn
-class leaderboardEmbed(discord.ui.View):
+class leaderboardEmbed(TrackedView):
     def __init__(self, data, title="Leaderboard", description="", color=0x6dab18):
         super().__init__(timeout=120)
-        self.data = data
+        # data is a page provider (StaticPages / LeaderboardSnapshot) or a list of lines.
+        # Snapshots are shared between views, so the view itself only holds a page number.
+        self.pages = StaticPages(data) if isinstance(data, list) else data
         self.title_text = title      # Store the title
         self.desc_text = description # Store the intro text
         self.color = color           # Store the color hex
         self.currentPage = 0
-        self.perPage = 10
-        self.end = (len(data) - 1) // self.perPage
+        self.end = self.pages.pageCount - 1
 
     def createEmbed(self):
-        start = self.currentPage * self.perPage
-        end = start + self.perPage
-        chunk = self.data[start:end]
+        chunk = self.pages.page(self.currentPage)
 
         chunk_desc = "---------------------------\n".join(chunk)
         
@@ -48,21 +86,25 @@ class leaderboardEmbed(discord.ui.View):
         if self.currentPage > 0:
             self.currentPage -= 1
             await interaction.response.edit_message(embed=self.createEmbed(), view=self)
-            log(f"{interaction.user.name.capitalize()} turned to page {self.currentPage + 1}", "INFO")
+            if log_enabled("INFO"):
+                log(f"{interaction.user.name.capitalize()} turned to page {self.currentPage + 1}", "INFO")
         else:
             await interaction.response.send_message("You're on the first page!", ephemeral=True)
 
     @discord.ui.button(label="Next Page", style=discord.ButtonStyle.green)
     async def nextButton(self, interaction: discord.Interaction, button: discord.ui.Button):
         # FIX: Check against self.end before incrementing
+        # (a snapshot's page count follows the live index)
+        self.end = self.pages.pageCount - 1
         if self.currentPage < self.end:
             self.currentPage += 1
             await interaction.response.edit_message(embed=self.createEmbed(), view=self)
-            log(f"{interaction.user.name.capitalize()} turned to page {self.currentPage + 1}", "INFO")
+            if log_enabled("INFO"):
+                log(f"{interaction.user.name.capitalize()} turned to page {self.currentPage + 1}", "INFO")
         else:
             await interaction.response.send_message("You're on the last page!", ephemeral=True)
     
-class coinFlipEmbed(discord.ui.View):
+class coinFlipEmbed(TrackedView):
     def __init__(self, user, amount): 
         super().__init__(timeout=60)
         self.user = user
@@ -87,7 +129,7 @@ class coinFlipEmbed(discord.ui.View):
         await interaction.response.defer()
         self.stop()
 
-class blackJackEmbed(discord.ui.View):
+class blackJackEmbed(TrackedView):
     def __init__(self, user, amount):
         super().__init__(timeout=60)
         self.user = user
@@ -111,22 +153,19 @@ class blackJackEmbed(discord.ui.View):
         self.stop()
 
 
-class randomButton(discord.ui.View):
+class randomButton(TrackedView):
     def __init__(self):
         super().__init__(timeout=300)
         self.clicked = False
-
-        # Load gain/loss messages
-        baseDir = os.path.dirname(os.path.abspath(__file__)) # auraTracker/
-        filePath = os.path.join(baseDir,"..","data","randomMessages.json") 
-        with open(filePath, "r") as f:
-            self.messages = json.load(f)
+        self.messages = RANDOM_MESSAGES
 
     @discord.ui.button(label="Click Me", style=discord.ButtonStyle.blurple)
     async def clickedButton(self, interaction: discord.Interaction, button: discord.ui.Button):
         if self.clicked:
             return
         self.clicked = True
+        await preload(interaction.guild_id)
+        use(interaction.guild_id)
 
         # Randomly decide gain or loss
         roll = random.randint(1,100)
@@ -147,10 +186,10 @@ class randomButton(discord.ui.View):
         msg = msg_template.format(mention=interaction.user.mention, amount=auraChange)
 
         # Update aura
-        update_aura(interaction.user.id, auraChange, user_obj=interaction.user)
+        update_aura(interaction.user.id, auraChange, user_obj=interaction.user, reason="button")
 
         # Get new balance
-        new_balance = aura_data.get(str(interaction.user.id), 0)
+        new_balance = balance(interaction.user.id)
 
         # Edit original message
         if hasattr(self, 'message') and self.message:
@@ -173,7 +212,7 @@ class randomButton(discord.ui.View):
             except discord.NotFound:
                 pass
 
-class goldenButtonEmbed(discord.ui.View):
+class goldenButtonEmbed(TrackedView):
     def __init__(self):
         super().__init__(timeout=30)
         self.clicked = False
@@ -184,14 +223,16 @@ class goldenButtonEmbed(discord.ui.View):
         if self.clicked:
             return
         self.clicked = True
+        await preload(interaction.guild_id)
+        use(interaction.guild_id)
         interaction.client.userClicked = interaction.user.display_name
 
         #Update aura
         amount = 40
-        update_aura(interaction.user.id, amount, user_obj=interaction.user)
+        update_aura(interaction.user.id, amount, user_obj=interaction.user, reason="golden_button")
 
         # Get new balance
-        new_balance = aura_data.get(str(interaction.user.id), 0)
+        new_balance = balance(interaction.user.id)
 
 
         # Edit original message
@@ -216,7 +257,7 @@ class goldenButtonEmbed(discord.ui.View):
             except Exception as e:
                 log(f"Error deleting timed out button: {e}", "ERROR")
 
-class higherLowerEmbed(discord.ui.View):
+class higherLowerEmbed(TrackedView):
     def __init__(self, user):
         super().__init__(timeout=60)
         self.user = user
@@ -247,7 +288,7 @@ class higherLowerEmbed(discord.ui.View):
         self.stop()
 
 # RPS vs Bot Embed 
-class rockPaperScissorsEmbed(discord.ui.View):
+class rockPaperScissorsEmbed(TrackedView):
     def __init__(self, author, amount):
         super().__init__(timeout=60)
         self.author = author
@@ -275,7 +316,7 @@ class rockPaperScissorsEmbed(discord.ui.View):
         await self.process_selection(interaction, "scissors")
 
 # Embed for RPS Request
-class rpsChallengeEmbed(discord.ui.View):
+class rpsChallengeEmbed(TrackedView):
     def __init__(self, author, opponent, amount):
         super().__init__(timeout=60)
         self.author = author 
@@ -302,7 +343,7 @@ class rpsChallengeEmbed(discord.ui.View):
         self.stop()
 
 # RPS PvP Embed
-class rpsPvPEmbed(discord.ui.View):
+class rpsPvPEmbed(TrackedView):
     def __init__(self, p1, p2, amount):
         super().__init__(timeout=60)
         self.p1 = p1
@@ -0,0 +1,119 @@
+# modules/user_directory.py
+import asyncio
+import os
+import time
+from typing import Iterable
+
+import discord
+
+from modules import file_io, shards
+from modules.storage import load_json
+from modules.utils import log
+
+NAMES_FILE: str = shards.process_file(os.path.join("data", "userNames.json"))
+
+# NAME_TTL          -> seconds a cached name is trusted before it is fetched again
+# FETCH_CONCURRENCY -> REST fetch_user calls allowed in flight at once
+# FETCH_DEADLINE    -> seconds resolve_many() waits before falling back to "User(id)"
+NAME_TTL: float = float(os.getenv("AURA_NAME_TTL", str(7 * 24 * 3600)))
+FETCH_CONCURRENCY: int = int(os.getenv("AURA_FETCH_CONCURRENCY", "8"))
+FETCH_DEADLINE: float = float(os.getenv("AURA_FETCH_DEADLINE", "30"))
+
+# user_id -> [name, unix time it was seen]
+_names: dict[str, list] = {}
+_dirty: bool = False
+
+
+def load() -> None:
+    """Load the persisted name cache."""
+    global _names
+    _names = {k: list(v) for k, v in load_json(NAMES_FILE).items()}
+    log(f"Loaded {len(_names)} cached user names", "SUCCESS" if _names else "WARNING")
+
+
+def flush() -> None:
+    """Queue the name cache for writing if it changed."""
+    global _dirty
+    if _dirty:
+        _dirty = False
+        file_io.write_json(NAMES_FILE, dict(_names))
+
+
+def remember(user: discord.abc.User) -> None:
+    """
+    Record a user's current name (called from gateway events). The cache is
+    only saved again for a new name, or once the saved timestamp is half a
+    NAME_TTL old, so a reconnect re-announcing every user writes nothing.
+    """
+    global _dirty
+    uid = str(user.id)
+    now = time.time()
+    entry = _names.get(uid)
+    if entry is None or entry[0] != user.name or now - entry[1] >= NAME_TTL / 2:
+        _names[uid] = [user.name, now]
+        _dirty = True
+
+
+def remember_many(users: Iterable[discord.abc.User]) -> None:
+    for user in users:
+        remember(user)
+
+
+def cached_name(user_id: str) -> str | None:
+    """Cached name if it is still within NAME_TTL."""
+    entry = _names.get(str(user_id))
+    if entry and time.time() - entry[1] < NAME_TTL:
+        return entry[0]
+    return None
+
+
+async def resolve_many(bot, user_ids: Iterable[str]) -> dict[str, str]:
+    """
+    Return {user_id: name} for every id. Names come from the persistent
+    cache, then discord.py's user cache, then REST fetches limited to
+    FETCH_CONCURRENCY at a time. Anything still missing after
+    FETCH_DEADLINE seconds falls back to "User(id)" (or a stale cached name).
+    """
+    names: dict[str, str] = {}
+    missing: list[str] = []
+    for uid in user_ids:
+        uid = str(uid)
+        name = cached_name(uid)
+        if name is None:
+            user = bot.get_user(int(uid))
+            if user:
+                remember(user)
+                name = user.name
+        if name is None:
+            missing.append(uid)
+        else:
+            names[uid] = name
+
+    if missing:
+        semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+        async def fetch(uid: str) -> None:
+            async with semaphore:
+                try:
+                    user = await bot.fetch_user(int(uid))
+                except discord.HTTPException:
+                    return
+                remember(user)
+                names[uid] = user.name
+
+        tasks = [asyncio.create_task(fetch(uid)) for uid in missing]
+        _, pending = await asyncio.wait(tasks, timeout=FETCH_DEADLINE)
+        for task in pending:
+            task.cancel()
+        log(
+            f"Fetched {len(missing) - len(pending)}/{len(missing)} uncached user names",
+            "WARNING" if pending else "INFO",
+        )
+
+    for uid in missing:
+        if uid not in names:
+            stale = _names.get(uid)
+            names[uid] = stale[0] if stale else f"User({uid})"
+
+    flush()
+    return names
@@ -1,37 +1,167 @@
 # modules/utils.py
+import asyncio
+import atexit
 import datetime
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any
+
 from colorama import init, Fore
+from dotenv import load_dotenv
+
+from modules import shards
 
 init(autoreset=True)
 
 
-def log(message: str, level: str = "INFO") -> None:
+# ---- Logging ----
+# log() only checks the level and queues the message; a background thread
+# formats it, prints it and appends it as JSON to a rotating file, so the
+# event loop never waits on the terminal or the disk.
+#
+# LOG_LEVEL     -> lowest severity logged: "debug" (everything), "info",
+#                  "warning" or "error". Messages below it are dropped before
+#                  they are queued.
+# LOG_CONSOLE   -> "0" to stop printing (the file still gets everything)
+# LOG_FILE      -> JSON lines file, one object per message; empty for none.
+#                  Each bot process of launcher.py writes its own (see shards.process_file())
+# LOG_MAX_BYTES -> size at which the file is rotated to .1, .2, ...
+# LOG_BACKUPS   -> rotated files kept
+load_dotenv()
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+SEVERITY_NAMES: dict[int, str] = {DEBUG: "debug", INFO: "info", WARNING: "warning", ERROR: "error"}
+
+LOG_LEVEL: int = {v: k for k, v in SEVERITY_NAMES.items()}.get(os.getenv("AURA_LOG_LEVEL", "debug").lower(), DEBUG)
+LOG_CONSOLE: bool = os.getenv("AURA_LOG_CONSOLE", "1") != "0"
+LOG_FILE: str = shards.process_file(os.getenv("AURA_LOG_FILE", os.path.join("data", "logs", "aura.jsonl")))
+LOG_MAX_BYTES: int = int(os.getenv("AURA_LOG_MAX_BYTES", str(10 * 2**20)))
+LOG_BACKUPS: int = int(os.getenv("AURA_LOG_BACKUPS", "5"))
+
+# Level (category) -> (console color, severity)
+LEVELS: dict[str, tuple[str, int]] = {
+    "INFO":        (Fore.CYAN, INFO),        # Informational messages
+    "CF_INFO":     (Fore.CYAN, DEBUG),       # Coinflip Messages
+    "BJ_INFO":     (Fore.CYAN, DEBUG),       # Blackjack Messages
+    "HL_INFO":     (Fore.CYAN, DEBUG),       # Higher/Lower start messages
+    "BUTTON_INFO": (Fore.CYAN, DEBUG),       # Random Button Messages
+    "ERROR":       (Fore.RED, ERROR),        # Errors
+    "SUCCESS":     (Fore.GREEN, INFO),       # Successful operations
+    "WARNING":     (Fore.YELLOW, WARNING),   # Warnings
+    "SNAPSHOT":    (Fore.BLUE, INFO),        # Snapshot-related messages
+    "SCHEDULER":   (Fore.BLUE, INFO),        # Background job schedule
+    "LEADERBOARD": (Fore.BLUE, INFO),        # Leaderboard messages
+    "COINFLIP":    (Fore.MAGENTA, INFO),     # Coinflip Messages
+    "BLACKJACK":   (Fore.MAGENTA, INFO),     # Blackjack Messages
+    "BUTTON":      (Fore.MAGENTA, INFO),     # Random Button Messages
+    "HIGHERLOWER": (Fore.MAGENTA, INFO),     # Higher/Lower outcome messages
+    "GOLD_BUTTON": (Fore.YELLOW, INFO),      # Golden Button Messages
+    "RPS":         (Fore.MAGENTA, INFO),     # Rock Paper Scissors against bot
+    "RPS_DUEL":    (Fore.MAGENTA, INFO),     # Rock Paper Scissors PvP
+}
+
+# (time, level, message, fields) or a threading.Event to set once reached
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+
+def log_enabled(level: str) -> bool:
+    """Whether log(..., level) would be written; check before building costly messages."""
+    return LEVELS.get(level, ("", INFO))[1] >= LOG_LEVEL
+
+
+def log(message: str, level: str = "INFO", **fields: Any) -> None:
     """
-    Simple timestamped logger using colorama.
+    Timestamped log message under one of the LEVELS categories. Extra
+    keyword fields are added to the JSON record. On hot paths, check
+    log_enabled() before building the message so a disabled level costs nothing.
     """
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %I:%M:%S %p")
-    colors = {
-        "INFO":        Fore.CYAN,       # Informational messages
-        "CF_INFO":     Fore.CYAN,       # Coinflip Messages
-        "BJ_INFO":     Fore.CYAN,       # Blackjack Messages
-        "HL_INFO":     Fore.CYAN,       # Higher/Lower start messages
-        "BUTTON_INFO": Fore.CYAN,       # Random Button Messages 
-        "ERROR":       Fore.RED,        # Errors
-        "SUCCESS":     Fore.GREEN,      # Successful operations
-        "WARNING":     Fore.YELLOW,     # Warnings
-        "SNAPSHOT":    Fore.BLUE,       # Snapshot-related messages
-        "LEADERBOARD": Fore.BLUE,       # Leaderboard messages
-        "COINFLIP":    Fore.MAGENTA,    # Coinflip Messages
-        "BLACKJACK":   Fore.MAGENTA,    # Blackjack Messages
-        "BUTTON":      Fore.MAGENTA,    # Random Button Messages 
-        "HIGHERLOWER": Fore.MAGENTA,    # Higher/Lower outcome messages
-        "GOLD_BUTTON": Fore.YELLOW,     # Golden Button Messages
-        "RPS":         Fore.MAGENTA,       # Rock Paper Scissors against bot
-        "RPS_DUEL":    Fore.MAGENTA        # Rock Paper Scissors PvP
-
-    }    
-    color = colors.get(level, "")
-    print(color + f"[{timestamp}] [{level}] {message}")
+    if LEVELS.get(level, ("", INFO))[1] < LOG_LEVEL:
+        return
+    _log_queue.put((time.time(), level, message, fields))
+
+
+def flush_log(timeout: float = 5.0) -> None:
+    """Wait until everything logged so far is written."""
+    done = threading.Event()
+    _log_queue.put(done)
+    done.wait(timeout)
+
+
+class _LogWriter:
+    """Runs on the log thread: prints and appends to the rotating JSON file."""
+
+    def __init__(self):
+        self.file = None
+        self.size = 0
+        self.failed = False
+
+    def run(self) -> None:
+        while True:
+            item = _log_queue.get()
+            if isinstance(item, threading.Event):
+                if self.file is not None:
+                    self.file.flush()
+                item.set()
+                continue
+            try:
+                self.write(*item)
+            except Exception as e:  # never let one bad message stop logging
+                print(f"Logging failed: {e}", file=sys.stderr)
+
+    def write(self, stamp: float, level: str, message: str, fields: dict[str, Any]) -> None:
+        color, severity = LEVELS.get(level, ("", INFO))
+        when = datetime.datetime.fromtimestamp(stamp)
+        if LOG_CONSOLE:
+            # One write per line, so lines from other threads don't cut in
+            print(color + f"[{when.strftime('%Y-%m-%d %I:%M:%S %p')}] [{level}] {message}\n", end="")
+        if not LOG_FILE or self.failed:
+            return
+        record = {
+            "time": when.isoformat(timespec="milliseconds"),
+            "level": level,
+            "severity": SEVERITY_NAMES[severity],
+            "message": str(message),
+            "pid": os.getpid(),
+            **fields,
+        }
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        try:
+            if self.file is None:
+                self.open()
+            elif self.size + len(line) > LOG_MAX_BYTES:
+                self.rotate()
+            self.file.write(line)
+            self.size += len(line)
+            if _log_queue.empty():
+                self.file.flush()
+        except OSError as e:
+            # Keep printing; the file stays off until restart
+            self.failed = True
+            print(f"Can't write log file {LOG_FILE}: {e}", file=sys.stderr)
+
+    def open(self) -> None:
+        os.makedirs(os.path.dirname(LOG_FILE) or ".", exist_ok=True)
+        self.file = open(LOG_FILE, "a", encoding="utf-8")
+        self.size = self.file.tell()
+
+    def rotate(self) -> None:
+        self.file.close()
+        for i in range(LOG_BACKUPS - 1, 0, -1):
+            if os.path.exists(f"{LOG_FILE}.{i}"):
+                os.replace(f"{LOG_FILE}.{i}", f"{LOG_FILE}.{i + 1}")
+        if LOG_BACKUPS > 0:
+            os.replace(LOG_FILE, f"{LOG_FILE}.1")
+        else:
+            os.remove(LOG_FILE)
+        self.open()
+
+
+threading.Thread(target=_LogWriter().run, name="log-writer", daemon=True).start()
+atexit.register(flush_log)
 
 
 def seconds_until(hour: int, minute: int, second: int = 0) -> float:
@@ -44,3 +174,26 @@ def seconds_until(hour: int, minute: int, second: int = 0) -> float:
     if now >= target:
         target += datetime.timedelta(days=1)
     return (target - now).total_seconds()
+
+
+# ---- Event loop lag ----
+# Seconds the loop woke up late, sampled every LAG_INTERVAL seconds.
+# Anything blocking the loop (disk I/O, heavy sorting) shows up here.
+LAG_INTERVAL: float = 0.5
+loop_lag: dict[str, float] = {"last": 0.0, "avg": 0.0, "max": 0.0, "samples": 0}
+
+
+async def monitor_loop_lag() -> None:
+    """Background task that measures how late asyncio.sleep() wakes up."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        lag = max(0.0, loop.time() - start - LAG_INTERVAL)
+
+        loop_lag["last"] = lag
+        loop_lag["max"] = max(loop_lag["max"], lag)
+        loop_lag["avg"] = lag if not loop_lag["samples"] else loop_lag["avg"] * 0.95 + lag * 0.05
+        loop_lag["samples"] += 1
+        if lag > 0.25:
+            log(f"Event loop blocked for {lag * 1000:.0f} ms", "WARNING")